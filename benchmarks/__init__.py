@@ -0,0 +1,3 @@
+"""
+Benchmark suite for the hedge fund portfolio simulation pipeline.
+"""
@@ -0,0 +1,443 @@
+"""
+Benchmarks for the simulation pipeline.
+Times each stage on synthetic price panels of configurable size, records
+throughput and peak memory, and compares the results against stored
+baselines to catch performance regressions. Runs entirely offline.
+
+Usage:
+    python -m benchmarks.pipeline                        # default panel sizes
+    python -m benchmarks.pipeline --size 2000x252        # tickers x days
+    python -m benchmarks.pipeline --save-baseline        # record baselines
+    python -m benchmarks.pipeline --check                # fail on regressions or missing baselines
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import timeit
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.monte_carlo import generate_scenarios, simulate_paths
+from src.performance import calculate_daily_returns, simulate_portfolio
+from src.portfolio import (
+    PortfolioState,
+    compute_beta,
+    compute_betas,
+    initialize_portfolio,
+    rebalance_portfolio,
+)
+from src.risk_metrics import calculate_portfolio_metrics, compute_risk_metrics
+
+logger = logging.getLogger(__name__)
+
+MARKET_INDEX = "^GSPC"
+DEFAULT_SIZES = [(50, 252), (500, 252)]
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+# Allowed slowdown / memory growth relative to the baseline before a stage is flagged
+TIME_TOLERANCE = 1.5
+MEMORY_TOLERANCE = 1.25
+
+
+def make_price_panel(n_tickers: int, n_days: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Build a synthetic price panel with a market index column.
+
+    Prices follow geometric random walks whose returns load on a common market
+    factor, so betas are realistic and positive, in the spirit of the
+    tests/conftest.py fixtures.
+
+    Args:
+        n_tickers (int): Number of stock columns
+        n_days (int): Number of business days
+        seed (int): Random seed
+
+    Returns:
+        pd.DataFrame: Prices indexed by business day, one column per ticker
+                    followed by the market index
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2020-01-01", periods=n_days)
+    market = rng.normal(0.0003, 0.01, n_days)
+    betas = rng.uniform(0.5, 1.8, n_tickers)
+    noise = rng.normal(0.0, 0.015, (n_days, n_tickers))
+    returns = market[:, None] * betas + noise
+    returns[0] = 0.0
+    market[0] = 0.0
+
+    start = rng.uniform(20, 500, n_tickers)
+    prices = start * np.exp(np.cumsum(returns, axis=0))
+    columns = [f"T{i:04d}" for i in range(n_tickers)]
+    panel = pd.DataFrame(prices, index=dates, columns=columns)
+    panel[MARKET_INDEX] = 4800 * np.exp(np.cumsum(market))
+    return panel
+
+
+def make_exchange_rates(dates: pd.Index, seed: int = 42) -> pd.Series:
+    """Synthetic USD/CAD rates for the given dates."""
+    rng = np.random.default_rng(seed)
+    return pd.Series(1.35 + rng.normal(0, 0.005, len(dates)), index=dates)
+
+
+class _Inputs:
+    """Inputs derived from one panel, built lazily and shared between stages."""
+
+    def __init__(self, panel: pd.DataFrame):
+        self.panel = panel
+        self.tickers = [ticker for ticker in panel.columns if ticker != MARKET_INDEX]
+        self.prices = panel[self.tickers]
+        self._cache: Dict[str, Any] = {}
+
+    def get(self, name: str, build: Callable[[], Any]) -> Any:
+        if name not in self._cache:
+            self._cache[name] = build()
+        return self._cache[name]
+
+    @property
+    def returns(self) -> pd.DataFrame:
+        return self.get("returns", lambda: calculate_daily_returns(self.panel))
+
+    @property
+    def betas(self) -> Dict[str, float]:
+        return self.get(
+            "betas", lambda: compute_betas(self.returns, MARKET_INDEX)["beta"].to_dict()
+        )
+
+    @property
+    def portfolio(self) -> Dict[str, float]:
+        def build():
+            half = len(self.tickers) // 2
+            portfolio, _, _ = initialize_portfolio(
+                10_000_000, self.prices.iloc[0].to_dict(), self.tickers[:half],
+                self.tickers[half:], self.betas, self.prices.index[0],
+            )
+            return portfolio
+        return self.get("portfolio", build)
+
+    @property
+    def exchange_rates(self) -> pd.Series:
+        return self.get("exchange_rates", lambda: make_exchange_rates(self.panel.index))
+
+    @property
+    def simulation_results(self) -> pd.DataFrame:
+        return self.get("simulation_results", lambda: simulate_portfolio(
+            self.prices, self.portfolio, self.betas, self.exchange_rates, 0.02, 0.0,
+            engine="numpy",
+        )[0])
+
+
+def _daily_returns(inputs: _Inputs) -> Tuple[Callable[[], Any], int]:
+    return lambda: calculate_daily_returns(inputs.panel), inputs.panel.size
+
+
+def _compute_beta(inputs: _Inputs) -> Tuple[Callable[[], Any], int]:
+    # One statsmodels regression per ticker, as the pipeline used to run. The
+    # lazy statsmodels import happens here so that it is not timed.
+    import statsmodels.api  # noqa: F401
+
+    returns = inputs.returns
+    market = returns[MARKET_INDEX]
+    return (
+        lambda: [compute_beta(returns[ticker], market) for ticker in inputs.tickers],
+        len(inputs.tickers),
+    )
+
+
+def _compute_betas(inputs: _Inputs) -> Tuple[Callable[[], Any], int]:
+    returns = inputs.returns
+    return lambda: compute_betas(returns, MARKET_INDEX), len(inputs.tickers)
+
+
+def _rebalance(method: str, as_state: bool = False):
+    def stage(inputs: _Inputs) -> Tuple[Callable[[], Any], int]:
+        prices = inputs.prices.iloc[-1]
+        # Tilt the betas so that the book is off target and actually trades
+        betas = {
+            ticker: inputs.betas[ticker] * (1.3 if inputs.portfolio[ticker] > 0 else 1.0)
+            for ticker in inputs.tickers
+        }
+        portfolio = inputs.portfolio
+        if as_state:
+            portfolio = PortfolioState.from_dict(portfolio)
+            prices = prices.to_numpy()
+            betas = np.array([betas[ticker] for ticker in portfolio.tickers])
+        return (
+            lambda: rebalance_portfolio(portfolio, prices, betas, 0.0, None, method=method),
+            len(inputs.tickers),
+        )
+    return stage
+
+
+def _simulate(engine: str, as_state: bool = False):
+    def stage(inputs: _Inputs) -> Tuple[Callable[[], Any], int]:
+        portfolio = inputs.portfolio
+        if as_state:
+            portfolio = PortfolioState.from_dict(portfolio)
+        return (
+            lambda: simulate_portfolio(
+                inputs.prices, portfolio, inputs.betas, inputs.exchange_rates, 0.02, 0.0,
+                engine=engine,
+            ),
+            inputs.prices.size,
+        )
+    return stage
+
+
+def _portfolio_metrics(inputs: _Inputs) -> Tuple[Callable[[], Any], int]:
+    results = inputs.simulation_results
+    return lambda: calculate_portfolio_metrics(results, inputs.prices), len(results)
+
+
+def _rolling_risk_metrics(inputs: _Inputs) -> Tuple[Callable[[], Any], int]:
+    results = inputs.simulation_results
+    return lambda: compute_risk_metrics(results, window=63), len(results)
+
+
+def _monte_carlo_paths(inputs: _Inputs) -> Tuple[Callable[[], Any], int]:
+    # 1,000 bootstrapped quarters simulated as one batch
+    history = inputs.returns[inputs.tickers].to_numpy()[1:]
+    paths = generate_scenarios(history, 1_000, 63, rng=np.random.default_rng(0))
+    holdings = np.array([inputs.portfolio[ticker] for ticker in inputs.tickers])
+    betas = np.array([inputs.betas[ticker] for ticker in inputs.tickers])
+    start_prices = inputs.prices.iloc[-1].to_numpy()
+    return (
+        lambda: simulate_paths(start_prices, paths, holdings, betas, 0.02, 0.0),
+        paths.size,
+    )
+
+
+# Stage name -> setup function returning (callable to time, items processed per call)
+STAGES: Dict[str, Callable[[_Inputs], Tuple[Callable[[], Any], int]]] = {
+    "calculate_daily_returns": _daily_returns,
+    "compute_beta": _compute_beta,
+    "compute_betas": _compute_betas,
+    "rebalance_portfolio[heuristic]": _rebalance("heuristic"),
+    "rebalance_portfolio[optimize]": _rebalance("optimize"),
+    "rebalance_portfolio[optimize,state]": _rebalance("optimize", as_state=True),
+    "simulate_portfolio[pandas]": _simulate("pandas"),
+    "simulate_portfolio[numpy]": _simulate("numpy"),
+    "simulate_portfolio[numpy,state]": _simulate("numpy", as_state=True),
+    "calculate_portfolio_metrics": _portfolio_metrics,
+    "compute_risk_metrics[rolling]": _rolling_risk_metrics,
+    "simulate_paths[monte_carlo]": _monte_carlo_paths,
+}
+
+
+def measure(func: Callable[[], Any], repeat: int = 3) -> Dict[str, float]:
+    """
+    Time a callable and record its peak traced memory.
+
+    The time is the best of repeat runs, each looping the callable enough
+    times to last at least 0.2 seconds. Peak memory is measured in a separate
+    run under tracemalloc, so tracing does not distort the timings.
+
+    Args:
+        func: Callable to benchmark
+        repeat (int): Number of timed runs
+
+    Returns:
+        Dict[str, float]: seconds per call and peak_memory_mb
+    """
+    timer = timeit.Timer(func)
+    # The calibration run already counts as one sample, which matters for slow stages
+    number, elapsed = timer.autorange()
+    samples = [elapsed] + timer.repeat(repeat=max(repeat - 1, 0), number=number)
+    seconds = min(samples) / number
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": seconds, "peak_memory_mb": peak / 2**20}
+
+
+def run_benchmarks(
+    sizes: Sequence[Tuple[int, int]] = DEFAULT_SIZES,
+    stages: Optional[Sequence[str]] = None,
+    repeat: int = 3,
+) -> List[Dict[str, Any]]:
+    """
+    Benchmark pipeline stages on synthetic panels.
+
+    Args:
+        sizes: (tickers, days) panel sizes to run
+        stages: Stage names from STAGES, all stages by default
+        repeat (int): Number of timed runs per stage
+
+    Returns:
+        List[Dict[str, Any]]: One record per stage and size with seconds,
+            throughput (items per second) and peak_memory_mb. Stages that
+            cannot run here (e.g. a missing optional dependency) are recorded
+            with an error instead.
+    """
+    stages = list(stages) if stages is not None else list(STAGES)
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        raise ValueError(f"Unknown benchmark stages: {', '.join(unknown)}")
+
+    records = []
+    # The simulation logs every rebalance at INFO level, which would dominate the timings
+    previous_disable = logging.root.manager.disable
+    logging.disable(logging.INFO)
+    try:
+        for n_tickers, n_days in sizes:
+            inputs = _Inputs(make_price_panel(n_tickers, n_days))
+            for stage in stages:
+                record = {"stage": stage, "tickers": n_tickers, "days": n_days}
+                try:
+                    func, items = STAGES[stage](inputs)
+                    record.update(measure(func, repeat=repeat))
+                    record["throughput"] = items / record["seconds"]
+                except (ImportError, OSError) as e:
+                    record["error"] = str(e)
+                records.append(record)
+    finally:
+        logging.disable(previous_disable)
+    return records
+
+
+def _key(record: Dict[str, Any]) -> str:
+    return f"{record['stage']}@{record['tickers']}x{record['days']}"
+
+
+def load_baselines(path: str = BASELINE_PATH) -> Dict[str, Dict[str, float]]:
+    """Load stored baselines keyed by stage@tickersxdays, or an empty dict."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def save_baselines(records: List[Dict[str, Any]], path: str = BASELINE_PATH) -> None:
+    """Merge benchmark records into the baseline file."""
+    baselines = load_baselines(path)
+    for record in records:
+        if "error" not in record:
+            baselines[_key(record)] = {
+                "seconds": record["seconds"], "peak_memory_mb": record["peak_memory_mb"]
+            }
+    payload = {
+        "machine": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "processor": platform.machine(),
+        },
+        "results": dict(sorted(baselines.items())),
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+        f.write("\n")
+
+
+def compare_to_baselines(
+    records: List[Dict[str, Any]],
+    baselines: Dict[str, Dict[str, float]],
+    time_tolerance: float = TIME_TOLERANCE,
+    memory_tolerance: float = MEMORY_TOLERANCE,
+) -> List[str]:
+    """
+    Find stages that got slower or use more memory than their baseline.
+
+    Args:
+        records: Results from run_benchmarks
+        baselines: Baselines from load_baselines
+        time_tolerance (float): Allowed ratio of seconds to the baseline
+        memory_tolerance (float): Allowed ratio of peak memory to the baseline
+
+    Returns:
+        List[str]: One message per regression, empty if there are none. Stages
+            without a baseline are not compared, see missing_baselines.
+    """
+    regressions = []
+    for record in records:
+        baseline = baselines.get(_key(record))
+        if baseline is None or "error" in record:
+            continue
+        time_ratio = record["seconds"] / baseline["seconds"]
+        if time_ratio > time_tolerance:
+            regressions.append(
+                f"{_key(record)}: {record['seconds'] * 1000:.2f} ms vs baseline "
+                f"{baseline['seconds'] * 1000:.2f} ms ({time_ratio:.2f}x)"
+            )
+        # Tiny allocations are dominated by noise, so allow at least 1 MB of slack
+        memory_limit = max(baseline["peak_memory_mb"] * memory_tolerance, baseline["peak_memory_mb"] + 1)
+        if record["peak_memory_mb"] > memory_limit:
+            regressions.append(
+                f"{_key(record)}: peak memory {record['peak_memory_mb']:.1f} MB vs baseline "
+                f"{baseline['peak_memory_mb']:.1f} MB"
+            )
+    return regressions
+
+
+def missing_baselines(
+    records: List[Dict[str, Any]], baselines: Dict[str, Dict[str, float]]
+) -> List[str]:
+    """Keys (stage@tickersxdays) of the benchmarked stages that have no baseline to compare with."""
+    return [_key(record) for record in records if "error" not in record and _key(record) not in baselines]
+
+
+def format_results(records: List[Dict[str, Any]]) -> str:
+    """Render benchmark records as a text table."""
+    frame = pd.DataFrame(records)
+    if "seconds" in frame:
+        frame["ms"] = frame.pop("seconds") * 1000
+    if "error" in frame:
+        frame["error"] = frame["error"].fillna("").str.slice(0, 60)
+    columns = [c for c in ("stage", "tickers", "days", "ms", "throughput", "peak_memory_mb", "error") if c in frame]
+    return frame[columns].to_string(index=False, float_format=lambda value: f"{value:,.2f}")
+
+
+def _parse_size(value: str) -> Tuple[int, int]:
+    try:
+        tickers, days = value.lower().split("x")
+        return int(tickers), int(days)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Size must look like 500x252, got {value}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the simulation pipeline")
+    parser.add_argument("--size", type=_parse_size, action="append",
+                        help="Panel size as TICKERSxDAYS, may be repeated")
+    parser.add_argument("--stage", action="append", choices=list(STAGES),
+                        help="Stage to run, may be repeated (default: all)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Record these results as the new baseline")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit with an error if any stage regressed against the baseline "
+                             "or has no baseline")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.size or DEFAULT_SIZES, args.stage, args.repeat)
+    print(format_results(results))
+
+    if args.save_baseline:
+        save_baselines(results, args.baseline)
+        print(f"\nBaselines saved to {args.baseline}")
+    if args.check:
+        baselines = load_baselines(args.baseline)
+        missing = missing_baselines(results, baselines)
+        if missing:
+            print(f"\nNo baseline in {args.baseline} for:")
+            for key in missing:
+                print(f"  {key}")
+        found = compare_to_baselines(results, baselines)
+        if found:
+            print("\nPerformance regressions:")
+            for message in found:
+                print(f"  {message}")
+        if missing or found:
+            sys.exit(1)
+        print("\nNo performance regressions")
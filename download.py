@@ -2,106 +2,95 @@ import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
 
-def download_stock_data(symbols, start_date, end_date):
+from src.excel_export import write_formatted_workbook
+from src.providers import MarketDataProvider, NoDataError, fetch_many
+
+# Width and number format of each column (None leaves the cells unformatted)
+COLUMN_FORMATS = {
+    'Date': (12, 'yyyy-mm-dd'),
+    'Open': (10, '#,##0.00'),
+    'High': (10, '#,##0.00'),
+    'Low': (10, '#,##0.00'),
+    'Close': (10, '#,##0.00'),
+    'Volume': (12, '#,##0'),
+    'Dividends': (10, None),
+    'Stock Splits': (10, None),
+}
+NUMERIC_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+class HistoryProvider(MarketDataProvider):
+    """Full daily OHLCV history per symbol (fetch_many passes the frames through as is)"""
+
+    def fetch_history(self, ticker, start_date, end_date):
+        hist_data = yf.Ticker(ticker).history(start=start_date, end=end_date)
+        if hist_data.empty:
+            raise NoDataError(f"No data found for {ticker}")
+        return hist_data
+
+
+def download_stock_data(symbols, start_date, end_date, max_workers=16):
     """
     Download historical data for multiple stock symbols
+    Symbols are downloaded concurrently and failed downloads are retried
     Returns a dictionary with symbol as key and historical data as value
     """
+    requests = [(symbol, start_date, end_date) for symbol in symbols]
+    results, errors = fetch_many(requests, HistoryProvider(), max_workers=max_workers)
+
+    # Keep the order of the symbols
     stock_data = {}
-    for symbol in symbols:
-        # Create a Ticker object
-        ticker = yf.Ticker(symbol)
-        
-        # Download historical data
-        hist_data = ticker.history(start=start_date, end=end_date)
-        stock_data[symbol] = hist_data
-        
-        print(f"Downloaded data for {symbol}")
-    
+    for request in requests:
+        if request in results:
+            stock_data[request[0]] = results[request]
+            print(f"Downloaded data for {request[0]}")
+        else:
+            print(f"Failed to download data for {request[0]}: {errors[request]}")
+
     return stock_data
 
+
 def save_stock_data(data, output_file='stock_data.xlsx'):
     """
     Save stock data to Excel with one tab per ticker
     Each tab will be named after the stock symbol
+    Widths and number formats are applied per column
     """
-    # Create Excel writer object
-    with pd.ExcelWriter(output_file, engine='openpyxl', 
-                       datetime_format='YYYY-MM-DD',  # This is just the default
-                       mode='w') as writer:
-        for symbol, df in data.items():
-            # Convert timezone-aware timestamps to timezone-naive
-            df_copy = df.copy()
-            df_copy.index = df_copy.index.tz_localize(None)
-            
-            # Reset index to make the date a column
-            df_copy = df_copy.reset_index()
-            
-            # Rename the index column to 'Date'
-            df_copy = df_copy.rename(columns={'index': 'Date'})
-            
-            # Ensure numeric columns are float
-            numeric_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
-            for col in numeric_columns:
-                df_copy[col] = df_copy[col].astype(float)
-            
-            # Save each dataframe to a separate worksheet
-            df_copy.to_excel(writer, sheet_name=symbol, index=False)
-            
-            # Get the worksheet
-            worksheet = writer.sheets[symbol]
-            
-            # Set column widths
-            worksheet.column_dimensions['A'].width = 12  # Date
-            worksheet.column_dimensions['B'].width = 10  # Open
-            worksheet.column_dimensions['C'].width = 10  # High
-            worksheet.column_dimensions['D'].width = 10  # Low
-            worksheet.column_dimensions['E'].width = 10  # Close
-            worksheet.column_dimensions['F'].width = 12  # Volume
-            worksheet.column_dimensions['G'].width = 10  # Dividends
-            worksheet.column_dimensions['H'].width = 10  # Stock Splits
-            
-            # Set date format for the date column
-            for row in range(2, len(df_copy) + 2):  # Skip header row
-                cell = worksheet[f"A{row}"]
-                cell.number_format = 'yyyy-mm-dd'
-            
-            # Set number format for price columns (2 decimal places)
-            for col in ['B', 'C', 'D', 'E']:  # Open, High, Low, Close columns
-                for row in range(2, len(df_copy) + 2):  # Skip header row
-                    cell = worksheet[f"{col}{row}"]
-                    cell.number_format = '#,##0.00'
-            
-            # Set number format for volume column (whole numbers)
-            for row in range(2, len(df_copy) + 2):  # Skip header row
-                cell = worksheet[f"F{row}"]
-                cell.number_format = '#,##0'
-
-# Example usage
-symbols = {
-    'AAPL': 'Apple',
-    'MSFT': 'Microsoft',
-    'AMZN': 'Amazon',
-    'JNJ': 'Johnson and Johnson',
-    'WMT': 'Walmart',
-    'TSLA': 'Tesla',
-    'META': 'Meta',
-    'SHOP': 'Shopify',
-    'NVDA': 'Nvidia',
-    'BA': 'Boeing',
-    '^GSPC': 'S&P 500'
-}
+    # The index becomes the Date column (time zones are dropped on export)
+    # and the numeric columns are written as floats
+    sheets = {
+        symbol: df.astype({col: float for col in NUMERIC_COLUMNS if col in df.columns}).rename_axis('Date')
+        for symbol, df in data.items()
+    }
+    write_formatted_workbook(output_file, sheets, COLUMN_FORMATS)
+
+
+if __name__ == "__main__":
+    # Example usage
+    symbols = {
+        'AAPL': 'Apple',
+        'MSFT': 'Microsoft',
+        'AMZN': 'Amazon',
+        'JNJ': 'Johnson and Johnson',
+        'WMT': 'Walmart',
+        'TSLA': 'Tesla',
+        'META': 'Meta',
+        'SHOP': 'Shopify',
+        'NVDA': 'Nvidia',
+        'BA': 'Boeing',
+        '^GSPC': 'S&P 500'
+    }
 
-start_date = '2024-01-01'
-end_date = '2025-02-07'
+    start_date = '2024-01-01'
+    end_date = '2025-02-07'
 
-# Download data for all symbols
-data = download_stock_data(symbols.keys(), start_date, end_date)
+    # Download data for all symbols
+    data = download_stock_data(symbols.keys(), start_date, end_date)
 
-# Save data to Excel (change file extension)
-save_stock_data(data, 'tech_stocks.xlsx')
+    # Save data to Excel (change file extension)
+    save_stock_data(data, 'tech_stocks.xlsx')
 
-# Print first few rows of each stock's data
-for symbol in symbols:
-    print(f"\n{symbols[symbol]} ({symbol}) Data:")
-    print(data[symbol].head())
+    # Print first few rows of each downloaded stock's data (failed downloads are skipped)
+    for symbol, df in data.items():
+        print(f"\n{symbols[symbol]} ({symbol}) Data:")
+        print(df.head())
@@ -0,0 +1,288 @@
+"""
+Backtest module for the hedge fund portfolio project.
+Runs the strategy over many months by streaming the history one month at a
+time, carrying positions forward and writing results as it goes.
+"""
+
+import argparse
+import logging
+import os
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import BETA_TOLERANCE, SIMULATION_ENGINE, TRANSACTION_FEE_PER_SHARE, load_config
+from .data_acquisition import (
+    download_market_data,
+    get_exchange_rates,
+    get_month_window,
+    validate_market_data,
+)
+from .excel_export import DailyResultsWriter, append_csv
+from .performance import calculate_daily_returns, simulate_portfolio
+from .portfolio import compute_betas, initialize_portfolio
+from .providers import provider_from_config
+from .trading_calendar import DEFAULT_CALENDAR, offset_sessions
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Trading days of history used to estimate betas at the start of each month
+BETA_LOOKBACK_DAYS = 60
+
+
+def iter_months(start_year: int, start_month: int, end_year: int, end_month: int) -> Iterator[Tuple[int, int]]:
+    """
+    Iterate over (year, month) pairs from the start month to the end month inclusive.
+
+    Args:
+        start_year (int): First year
+        start_month (int): First month (1-12)
+        end_year (int): Last year
+        end_month (int): Last month (1-12)
+
+    Yields:
+        Tuple[int, int]: Year and month
+    """
+    if not (1 <= start_month <= 12 and 1 <= end_month <= 12):
+        raise ValueError("Months must be between 1 and 12")
+    if (start_year, start_month) > (end_year, end_month):
+        raise ValueError("Backtest start must not be after its end")
+
+    year, month = start_year, start_month
+    while (year, month) <= (end_year, end_month):
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def run_backtest(
+    start_year: int,
+    start_month: int,
+    end_year: int,
+    end_month: int,
+    config: Optional[Dict[str, Any]] = None,
+    output_dir: str = "docs/backtest",
+    beta_lookback: int = BETA_LOOKBACK_DAYS,
+    excel_file: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Run the strategy over a multi-month period.
+
+    Each month is downloaded, simulated and appended to CSV files before the
+    next one is loaded, so memory depends on the number of tickers and the
+    beta lookback, not on the length of the history. Positions at the end of
+    one month are the starting positions of the next. Betas for a month are
+    estimated from the trailing beta_lookback trading days before it, so no
+    future data is used.
+
+    Args:
+        start_year (int): First year of the backtest
+        start_month (int): First month of the backtest
+        end_year (int): Last year of the backtest
+        end_month (int): Last month of the backtest
+        config (Dict[str, Any], optional): Configuration, defaults to load_config()
+        output_dir (str): Directory for backtest_daily.csv and backtest_transactions.csv
+        beta_lookback (int): Trading days of history used for beta estimation
+        excel_file (str, optional): Also stream the daily results, rebalancing
+            events and summary statistics to this Excel workbook
+
+    Returns:
+        Dict[str, Any]: Summary statistics accumulated over the whole backtest
+    """
+    excel_writer = None
+    try:
+        config = config if config is not None else load_config()
+        months = list(iter_months(start_year, start_month, end_year, end_month))
+        tickers = config["tickers_long"] + config["tickers_short"]
+        market_index = config["market_index"]
+        all_tickers = tickers + [market_index]
+        transaction_fee = config.get("transaction_fee", TRANSACTION_FEE_PER_SHARE)
+        beta_tolerance = config.get("beta_tolerance", BETA_TOLERANCE)
+
+        os.makedirs(output_dir, exist_ok=True)
+        results_path = os.path.join(output_dir, "backtest_daily.csv")
+        transactions_path = os.path.join(output_dir, "backtest_transactions.csv")
+        for path in (results_path, transactions_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+        # Warm-up history so the first month also has out-of-sample betas
+        calendar = config.get("trading_calendar", DEFAULT_CALENDAR)
+        first_start, _ = get_month_window(start_year, start_month, calendar)
+        warmup_start = offset_sessions(first_start, -(beta_lookback + 1), calendar)
+        provider = provider_from_config(config)
+        history = download_market_data(
+            all_tickers, warmup_start.strftime("%Y-%m-%d"), first_start, provider=provider, calendar=calendar
+        )
+
+        summary = _BacktestSummary()
+        if excel_file:
+            excel_writer = DailyResultsWriter(excel_file)
+        portfolio = None
+        previous_prices = None
+
+        for year, month in months:
+            start_date, end_date = get_month_window(year, month, calendar)
+            logger.info(f"Backtesting {year}-{month:02d}...")
+            try:
+                prices = download_market_data(
+                    all_tickers, start_date, end_date, provider=provider, calendar=calendar
+                )
+            except ValueError as e:
+                logger.warning(f"Skipping {year}-{month:02d}: {str(e)}")
+                continue
+            if not validate_market_data(prices):
+                raise ValueError(f"Market data validation failed for {year}-{month:02d}")
+
+            trailing_returns = calculate_daily_returns(history).iloc[1:]
+            betas = compute_betas(trailing_returns[all_tickers], market_index)["beta"].to_dict()
+
+            if portfolio is None:
+                portfolio, _, initial_logs = initialize_portfolio(
+                    config["initial_capital"],
+                    prices.iloc[0].to_dict(),
+                    config["tickers_long"],
+                    config["tickers_short"],
+                    betas,
+                    prices.index[0],
+                    transaction_fee=transaction_fee,
+                )
+                summary.add_initial_costs(initial_logs)
+                append_csv(initial_logs.to_frame(), transactions_path)
+
+            results, transaction_logs, portfolio = simulate_portfolio(
+                prices[tickers],
+                portfolio,
+                betas,
+                get_exchange_rates(
+                    start_date,
+                    end_date,
+                    simulation=config.get("exchange_rates", "simulated") != "market",
+                    provider=provider,
+                    dates=prices.index,
+                    calendar=calendar,
+                ),
+                config.get("management_fee", 0.02),
+                config["target_portfolio_beta"],
+                engine=config.get("simulation_engine", SIMULATION_ENGINE),
+                beta_tolerance=beta_tolerance,
+                transaction_fee=transaction_fee,
+                return_portfolio=True,
+                rebalance_method=config.get("rebalance_method", "heuristic"),
+                # The first day of a month is measured from the previous month's close
+                previous_prices=previous_prices,
+            )
+            previous_prices = prices[tickers].iloc[-1]
+
+            append_csv(results, results_path, index_label="Date")
+            if transaction_logs:
+                append_csv(transaction_logs.to_frame(), transactions_path)
+            summary.update(results)
+            if excel_writer is not None:
+                excel_writer.write(results)
+
+            history = pd.concat([history, prices]).iloc[-(beta_lookback + 1):]
+
+        if summary.days == 0:
+            raise ValueError("No market data available for the backtest period")
+
+        result = summary.to_dict()
+        result["final_portfolio"] = portfolio
+        result["results_path"] = results_path
+        result["transactions_path"] = transactions_path
+        if excel_writer is not None:
+            excel_writer, writer = None, excel_writer
+            writer.close()
+            result["excel_path"] = excel_file
+        logger.info(f"Backtest completed: {result['days']} trading days written to {results_path}")
+        return result
+
+    except Exception as e:
+        logger.error(f"Error running backtest: {str(e)}")
+        if excel_writer is not None:
+            excel_writer.discard()
+        raise
+
+
+class _BacktestSummary:
+    """Running statistics over the streamed daily results."""
+
+    def __init__(self):
+        self.days = 0
+        self.months = 0
+        self.rebalances = 0
+        self.management_fees = 0.0
+        self.transaction_costs = 0.0
+        self.initial_gross_exposure = None
+        self.final_gross_exposure = None
+        self.final_value_usd = None
+        self.peak_gross_exposure = 0.0
+        self.max_drawdown = 0.0
+        self.return_sum = 0.0
+        self.return_sq_sum = 0.0
+
+    def add_initial_costs(self, transaction_logs) -> None:
+        self.transaction_costs += float(transaction_logs.column("transaction_cost").sum())
+
+    def update(self, results: pd.DataFrame) -> None:
+        gross = results["gross_exposure_usd"].to_numpy()
+        returns = results["daily_return"].to_numpy()
+        if self.initial_gross_exposure is None:
+            self.initial_gross_exposure = float(gross[0])
+
+        peaks = np.maximum.accumulate(np.maximum(gross, self.peak_gross_exposure))
+        self.max_drawdown = min(self.max_drawdown, float(np.min(gross / peaks - 1)))
+        self.peak_gross_exposure = float(peaks[-1])
+
+        self.days += len(results)
+        self.months += 1
+        self.rebalances += int(results["rebalanced"].sum())
+        self.management_fees += float(results["management_fee"].sum())
+        self.transaction_costs += float(results["transaction_costs"].sum())
+        self.final_gross_exposure = float(gross[-1])
+        self.final_value_usd = float(results["portfolio_value_usd"].iloc[-1])
+        self.return_sum += float(returns.sum())
+        self.return_sq_sum += float((returns ** 2).sum())
+
+    def to_dict(self) -> Dict[str, Any]:
+        mean = self.return_sum / self.days
+        variance = max(self.return_sq_sum / self.days - mean ** 2, 0.0) * self.days / max(self.days - 1, 1)
+        total_return = self.final_gross_exposure / self.initial_gross_exposure - 1
+        return {
+            "months": self.months,
+            "days": self.days,
+            "initial_gross_exposure_usd": self.initial_gross_exposure,
+            "final_gross_exposure_usd": self.final_gross_exposure,
+            "final_value_usd": self.final_value_usd,
+            "total_return": total_return,
+            "annualized_return": (1 + total_return) ** (252 / self.days) - 1,
+            "annualized_volatility": float(np.sqrt(variance * 252)),
+            "max_drawdown": self.max_drawdown,
+            "rebalances": self.rebalances,
+            "total_management_fees": self.management_fees,
+            "total_transaction_costs": self.transaction_costs,
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a multi-period backtest")
+    parser.add_argument("start", help="First month, YYYY-MM")
+    parser.add_argument("end", help="Last month, YYYY-MM")
+    parser.add_argument("--output-dir", default="docs/backtest")
+    parser.add_argument("--beta-lookback", type=int, default=BETA_LOOKBACK_DAYS)
+    parser.add_argument("--excel", help="Also stream the daily results to this Excel workbook")
+    args = parser.parse_args()
+
+    first_year, first_month = (int(part) for part in args.start.split("-"))
+    last_year, last_month = (int(part) for part in args.end.split("-"))
+    backtest_summary = run_backtest(
+        first_year, first_month, last_year, last_month,
+        output_dir=args.output_dir, beta_lookback=args.beta_lookback, excel_file=args.excel,
+    )
+    for key, value in backtest_summary.items():
+        if key != "final_portfolio":
+            print(f"{key}: {value}")
@@ -0,0 +1,183 @@
+"""
+Checkpoint module for the hedge fund portfolio project.
+Persists the progress of long simulations so that a failed run can resume
+from its last checkpoint instead of starting over.
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .trade_ledger import TradeLedger
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Period between checkpoints, as a pandas period alias ("W", "M", "Q", "Y")
+CHECKPOINT_FREQUENCY = "M"
+
+# Version of the checkpoint layout
+CHECKPOINT_VERSION = 1
+
+CHECKPOINT_FILE = "checkpoint.json"
+RESULTS_FILE = "results.csv"
+TRANSACTIONS_FILE = "transactions.csv"
+
+
+class SimulationCheckpoint:
+    """
+    Checkpoints of one simulate_portfolio run, kept in a directory.
+
+    Daily results and transaction logs are appended to CSV files as the
+    simulation goes, and checkpoint.json records the holdings, the date
+    cursor, the cumulative fees and how many result rows and transaction
+    logs belong to the checkpoint. A checkpoint therefore only writes the
+    rows simulated since the previous one and a small JSON file, replaced
+    atomically, so it is cheap enough to take every month of simulated time.
+    Rows appended after the last checkpoint by a run that then failed are
+    discarded on resume.
+    """
+
+    def __init__(self, directory: str, frequency: str = CHECKPOINT_FREQUENCY):
+        """
+        Args:
+            directory (str): Directory of the checkpoint files
+            frequency (str): Period between checkpoints, as a pandas period alias
+        """
+        self.directory = directory
+        self.frequency = frequency
+        self.state: Optional[Dict[str, Any]] = None
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, CHECKPOINT_FILE)
+
+    @classmethod
+    def load(cls, directory: str) -> "SimulationCheckpoint":
+        """Open the checkpoints of an earlier run."""
+        checkpoint = cls(directory)
+        if not os.path.exists(checkpoint.path):
+            raise FileNotFoundError(f"No checkpoint found in {directory}")
+        with open(checkpoint.path) as f:
+            state = json.load(f)
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version: {state.get('version')}")
+        checkpoint.frequency = state["frequency"]
+        checkpoint.state = state
+        return checkpoint
+
+    def start(self, parameters: Dict[str, Any]) -> None:
+        """
+        Clear the directory for a new run with the given simulation parameters.
+
+        The initial state is written straight away, so a run that fails before
+        its first checkpoint resumes from the first day.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        for name in (CHECKPOINT_FILE, RESULTS_FILE, TRANSACTIONS_FILE):
+            path = os.path.join(self.directory, name)
+            if os.path.exists(path):
+                os.remove(path)
+        self.state = {
+            "version": CHECKPOINT_VERSION,
+            "frequency": self.frequency,
+            "parameters": parameters,
+            "cursor": 0,
+            "last_date": None,
+            "shares": None,
+            "result_rows": 0,
+            "transaction_log_offset": 0,
+            "management_fees": 0.0,
+            "transaction_costs": 0.0,
+            "rebalances": 0,
+        }
+        self._write_state()
+
+    def boundaries(self, dates: pd.DatetimeIndex) -> np.ndarray:
+        """Positions of the last day of each period, where checkpoints are taken."""
+        periods = pd.DatetimeIndex(dates).to_period(self.frequency)
+        return np.flatnonzero(periods[1:] != periods[:-1])
+
+    def save(
+        self,
+        cursor: int,
+        date,
+        shares: np.ndarray,
+        results: pd.DataFrame,
+        transactions: pd.DataFrame,
+    ) -> None:
+        """
+        Record the progress up to and including one day.
+
+        Args:
+            cursor (int): Position of the next day to simulate
+            date: Last simulated date
+            shares (np.ndarray): Holdings at the end of that day
+            results (pd.DataFrame): Daily results since the previous checkpoint
+            transactions (pd.DataFrame): Trades since the previous checkpoint, from TradeLedger.to_frame
+        """
+        results.to_csv(
+            os.path.join(self.directory, RESULTS_FILE),
+            mode="a", header=self.state["result_rows"] == 0, index_label="Date",
+        )
+        if len(transactions):
+            transactions.to_csv(
+                os.path.join(self.directory, TRANSACTIONS_FILE),
+                mode="a", header=self.state["transaction_log_offset"] == 0, index=False,
+            )
+
+        state = self.state
+        state["cursor"] = int(cursor)
+        state["last_date"] = pd.Timestamp(date).isoformat()
+        state["shares"] = np.asarray(shares, dtype=np.float64).tolist()
+        state["result_rows"] += len(results)
+        state["transaction_log_offset"] += len(transactions)
+        state["management_fees"] += float(results["management_fee"].sum())
+        state["transaction_costs"] += float(results["transaction_costs"].sum())
+        state["rebalances"] += int(results["rebalanced"].sum())
+
+        self._write_state()
+        logger.debug(f"Checkpoint saved at {state['last_date']} ({state['result_rows']} days)")
+
+    def _write_state(self) -> None:
+        """Replace checkpoint.json atomically with the current state."""
+        # json.dumps uses the C encoder, json.dump does not
+        with open(f"{self.path}.tmp", "w") as f:
+            f.write(json.dumps(self.state))
+        os.replace(f"{self.path}.tmp", self.path)
+
+    def completed_results(self) -> pd.DataFrame:
+        """Daily results covered by the last checkpoint."""
+        path = os.path.join(self.directory, RESULTS_FILE)
+        rows = self.state["result_rows"]
+        if rows == 0:
+            if os.path.exists(path):
+                os.remove(path)
+            return pd.DataFrame()
+        results = pd.read_csv(path, index_col="Date", parse_dates=["Date"], float_precision="round_trip")
+        if len(results) > rows:
+            # Drop rows appended after the last checkpoint
+            results = results.iloc[:rows]
+            results.to_csv(path, index_label="Date")
+        return results
+
+    def completed_transaction_logs(self) -> TradeLedger:
+        """Transaction logs covered by the last checkpoint."""
+        path = os.path.join(self.directory, TRANSACTIONS_FILE)
+        offset = self.state["transaction_log_offset"]
+        if offset == 0:
+            if os.path.exists(path):
+                os.remove(path)
+            return TradeLedger()
+        logs = pd.read_csv(path, parse_dates=["date"], float_precision="round_trip")
+        if len(logs) > offset:
+            logs = logs.iloc[:offset]
+            logs.to_csv(path, index=False)
+        return TradeLedger.from_frame(logs)
@@ -4,7 +4,7 @@ Contains all global parameters and settings used throughout the application.
 """
 
 import os
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
 import yaml
 
@@ -26,6 +26,27 @@ ANALYSIS_YEAR = 2025
 ANALYSIS_MONTH = 1  # January
 BETA_TOLERANCE = 0.05
 
+# Simulation engine used when the configuration does not choose one
+SIMULATION_ENGINE = "numpy"
+
+# Keys every configuration must define
+REQUIRED_KEYS = [
+    "tickers_long",
+    "tickers_short",
+    "market_index",
+    "initial_capital",
+    "gross_exposure",
+    "target_portfolio_beta",
+]
+
+# Accepted values of the options that select an implementation
+CONFIG_CHOICES = {
+    "trading_calendar": ("NYSE", "TSX"),
+    "exchange_rates": ("simulated", "market"),
+    "simulation_engine": ("pandas", "numpy"),
+    "rebalance_method": ("heuristic", "optimize"),
+}
+
 
 def load_config() -> Dict[str, Any]:
     """Load configuration from config.yaml file."""
@@ -68,3 +89,54 @@ def load_config() -> Dict[str, Any]:
     except Exception as e:
         print(f"Error loading config: {str(e)}")
         return default_config
+
+
+def resolve_data_path(config: Dict[str, Any]) -> Optional[str]:
+    """Path of the configured local market data, relative paths being taken from the project root."""
+    data_path = config.get("data_path")
+    if not data_path:
+        return None
+    if not os.path.isabs(data_path):
+        data_path = os.path.join(os.path.dirname(__file__), "..", data_path)
+    return data_path
+
+
+def check_config(config: Dict[str, Any]) -> List[str]:
+    """
+    Check a configuration without loading any market data.
+
+    Args:
+        config (Dict[str, Any]): Configuration to check
+
+    Returns:
+        List[str]: Problems found, empty if the configuration is usable
+    """
+    problems = [f"Missing required configuration key: {key}" for key in REQUIRED_KEYS if key not in config]
+
+    for key in ("tickers_long", "tickers_short"):
+        tickers = config.get(key)
+        if key in config and (not isinstance(tickers, list) or not tickers):
+            problems.append(f"{key} must be a non-empty list of tickers")
+    if isinstance(config.get("tickers_long"), list) and isinstance(config.get("tickers_short"), list):
+        overlap = sorted(set(config["tickers_long"]) & set(config["tickers_short"]))
+        if overlap:
+            problems.append(f"Tickers both long and short: {', '.join(overlap)}")
+
+    for key in ("initial_capital", "gross_exposure"):
+        value = config.get(key)
+        if key in config and (not isinstance(value, (int, float)) or value <= 0):
+            problems.append(f"{key} must be a positive number")
+
+    month = config.get("analysis_month", 1)
+    if not isinstance(month, int) or not 1 <= month <= 12:
+        problems.append(f"analysis_month must be between 1 and 12, got {month}")
+
+    for key, choices in CONFIG_CHOICES.items():
+        if key in config and config[key] not in choices:
+            problems.append(f"{key} must be one of {', '.join(choices)}, got {config[key]}")
+
+    data_path = resolve_data_path(config)
+    if data_path and not os.path.exists(data_path):
+        problems.append(f"data_path does not exist: {config['data_path']}")
+
+    return problems
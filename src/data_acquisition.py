@@ -3,17 +3,29 @@ Data acquisition module for the hedge fund portfolio project.
 Handles downloading market data and exchange rates.
 """
 
-import calendar
+import json
 import logging
-from typing import List, Tuple
+from calendar import monthrange
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
 import os
 
+import numpy as np
 import pandas as pd
-import yfinance as yf
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.progress import BarColumn, Progress, SpinnerColumn, TextColumn
 import urllib3
 
+from .providers import (
+    DEFAULT_MAX_WORKERS,
+    FetchRequest,
+    MarketDataProvider,
+    fetch_many,
+    get_default_provider,
+)
+from .trading_calendar import DEFAULT_CALENDAR, session_window, trading_sessions
+from .validation import MIN_TRADING_DAYS, check_market_data
+
 # Suppress urllib3 warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -24,20 +36,28 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 console = Console()
 
-# Set connection pool size
-http = urllib3.PoolManager(maxsize=3)
+# Yahoo Finance symbol of the USD/CAD rate (Canadian dollars per US dollar)
+FX_TICKER = "CAD=X"
+# Calendar days read before the start so the first trading day has a rate
+FX_LOOKBACK_DAYS = 7
 
+# Set connection pool size; concurrent price fetches are bounded by it
+http = urllib3.PoolManager(maxsize=DEFAULT_MAX_WORKERS)
 
-def get_date_range(year: int, month: int) -> Tuple[str, str]:
+
+def get_date_range(year: int, month: int, calendar: Optional[str] = None) -> Tuple[str, str]:
     """
     Calculate the start and end dates for a given month and year.
 
     Args:
         year (int): The year for analysis
         month (int): The month for analysis (1-12)
+        calendar (str, optional): Trading calendar, "NYSE" or "TSX", whose first
+            and last sessions of the month are returned; None returns the first
+            and last calendar days
 
     Returns:
-        Tuple[str, str]: Start date and end date in 'YYYY-MM-DD' format
+        Tuple[str, str]: Start date and end date (inclusive) in 'YYYY-MM-DD' format
     """
     try:
         # Validate inputs
@@ -45,12 +65,18 @@ def get_date_range(year: int, month: int) -> Tuple[str, str]:
             raise ValueError(f"Month must be between 1 and 12, got {month}")
 
         # Get the last day of the month
-        _, last_day = calendar.monthrange(year, month)
+        _, last_day = monthrange(year, month)
 
         # Create date strings
         start_date = f"{year}-{month:02d}-01"
         end_date = f"{year}-{month:02d}-{last_day}"
 
+        if calendar is not None:
+            sessions = trading_sessions(start_date, end_date, calendar)
+            if sessions.empty:
+                raise ValueError(f"No {calendar} trading sessions in {year}-{month:02d}")
+            start_date, end_date = (day.strftime("%Y-%m-%d") for day in sessions[[0, -1]])
+
         logger.info(f"Generated date range: {start_date} to {end_date}")
         return start_date, end_date
 
@@ -59,52 +85,70 @@ def get_date_range(year: int, month: int) -> Tuple[str, str]:
         raise
 
 
-def download_market_data(tickers: List[str], start_date: str, end_date: str) -> pd.DataFrame:
+def get_month_window(year: int, month: int, calendar: Optional[str] = None) -> Tuple[str, str]:
+    """
+    The dates of get_date_range with an exclusive end date.
+
+    The exclusive end is the convention of download_market_data and
+    get_exchange_rates: the day after the month's last trading session, or
+    the first day of the next month without a calendar.
+
+    Args:
+        year (int): The year for analysis
+        month (int): The month for analysis (1-12)
+        calendar (str, optional): Trading calendar, see get_date_range
+
+    Returns:
+        Tuple[str, str]: Start date and exclusive end date in 'YYYY-MM-DD' format
+    """
+    start_date, last_date = get_date_range(year, month, calendar)
+    end_date = pd.Timestamp(last_date) + pd.Timedelta(days=1)
+    return start_date, end_date.strftime("%Y-%m-%d")
+
+
+def download_market_data(
+    tickers: List[str],
+    start_date: str,
+    end_date: str,
+    use_store: bool = True,
+    store_dir: Optional[str] = None,
+    provider: Optional[MarketDataProvider] = None,
+    max_workers: Optional[int] = None,
+    calendar: Optional[str] = DEFAULT_CALENDAR,
+) -> pd.DataFrame:
     """
     Download historical adjusted close prices for given tickers and save to CSV.
 
+    When use_store is True and the provider is worth caching (local files are
+    not), the local price store is queried first and only the date ranges it
+    does not cover yet are fetched; the new rows are added to the store before
+    the requested range is read back. Requests are trimmed to the trading
+    sessions of the calendar, ranges without sessions are not requested at all,
+    and rows on non-trading days are dropped. Tickers are fetched
+    concurrently, each with its own retries, and tickers that still fail are
+    returned as all-NaN columns with a warning, so that validate_market_data
+    reports them instead of the whole download failing.
+
     Args:
         tickers (List[str]): List of stock tickers
         start_date (str): Start date in 'YYYY-MM-DD' format
-        end_date (str): End date in 'YYYY-MM-DD' format
+        end_date (str): End date in 'YYYY-MM-DD' format (exclusive, as in yfinance)
+        use_store (bool): If True, read from and update the local price store
+        store_dir (str, optional): Price store location, see get_price_store_dir
+        provider (MarketDataProvider, optional): Price source, defaults to
+            Yahoo Finance (see src.providers.set_default_provider). Use a
+            LocalFileProvider to run offline.
+        max_workers (int, optional): Concurrent requests, defaults to the size
+            of the module's connection pool
+        calendar (str, optional): Trading calendar, "NYSE" or "TSX"; None
+            requests and keeps every day
 
     Returns:
         pd.DataFrame: DataFrame with daily adjusted close prices indexed by date.
                     The columns will be named after the tickers.
     """
     try:
-        with Progress(
-            SpinnerColumn(), TextColumn("[progress.description]{task.description}"), console=console
-        ) as progress:
-            task = progress.add_task(
-                f"[green]Downloading data for {len(tickers)} tickers...", total=None
-            )
-            df = yf.download(
-                tickers, start=start_date, end=end_date, progress=False, group_by="ticker"
-            )
-            progress.update(task, completed=True)
-
-        if df.empty:
-            raise ValueError("No market data downloaded for given tickers and date range")
-
-        # Handle single ticker case
-        if not isinstance(df.columns, pd.MultiIndex):
-            if "Adj Close" in df.columns:
-                prices = pd.DataFrame(df["Adj Close"])
-            elif "Close" in df.columns:
-                prices = pd.DataFrame(df["Close"])
-            else:
-                raise KeyError("Neither 'Close' nor 'Adj Close' found in DataFrame columns")
-        else:
-            # Handle multiple tickers case
-            prices = pd.DataFrame()
-            for ticker in tickers:
-                if "Adj Close" in df[ticker].columns:
-                    prices[ticker] = df[ticker]["Adj Close"]
-                elif "Close" in df[ticker].columns:
-                    prices[ticker] = df[ticker]["Close"]
-                else:
-                    logger.warning(f"No price data found for {ticker}")
+        prices = _load_prices(tickers, start_date, end_date, use_store, store_dir, provider, max_workers, calendar)
 
         if prices.empty:
             raise ValueError("No valid price data found for any ticker")
@@ -112,7 +156,7 @@ def download_market_data(tickers: List[str], start_date: str, end_date: str) ->
         # Handle any missing values
         if prices.isnull().any().any():
             logger.warning("Missing values detected in downloaded data")
-            prices = prices.fillna(method="ffill").fillna(method="bfill")
+            prices = prices.ffill().bfill()
 
         # Save the data to a CSV file in the data directory
         data_dir = os.path.join(os.path.dirname(__file__), "..", "data")
@@ -129,14 +173,353 @@ def download_market_data(tickers: List[str], start_date: str, end_date: str) ->
         raise
 
 
-def get_exchange_rates(start_date: str, end_date: str, simulation: bool = True) -> pd.Series:
+def _load_prices(
+    tickers: List[str],
+    start_date: str,
+    end_date: str,
+    use_store: bool,
+    store_dir: Optional[str],
+    provider: Optional[MarketDataProvider],
+    max_workers: Optional[int],
+    calendar: Optional[str],
+) -> pd.DataFrame:
+    """Read prices through the price store, fetching what it is missing (see download_market_data)."""
+    provider = provider or get_default_provider()
+    max_workers = max_workers or http.connection_pool_kw.get("maxsize", DEFAULT_MAX_WORKERS)
+
+    def window(range_start: str, range_end: str) -> Optional[Tuple[str, str]]:
+        if calendar is None:
+            return range_start, range_end
+        return session_window(range_start, range_end, calendar)
+
+    if use_store and provider.cacheable:
+        store_dir = get_price_store_dir(store_dir)
+        coverage = _load_store_coverage(store_dir)
+        # Requests are trimmed to sessions, but the store records the whole missing range
+        requests: Dict[FetchRequest, Tuple[str, str]] = {}
+        for ticker in tickers:
+            for missing in _missing_ranges(coverage.get(ticker, []), start_date, end_date):
+                sessions = window(*missing)
+                if sessions is not None:
+                    requests[(ticker, *sessions)] = missing
+
+        if requests:
+            fetched = _fetch_prices(list(requests), provider, max_workers)
+
+            # Write each requested range to the store in one go
+            by_range: Dict[Tuple[str, str], Dict[str, pd.Series]] = {}
+            for request, series in fetched.items():
+                by_range.setdefault(requests[request], {})[request[0]] = series
+            for (range_start, range_end), columns in by_range.items():
+                save_to_price_store(pd.DataFrame(columns), range_start, range_end, store_dir)
+        else:
+            logger.info(f"Price store covers all {len(tickers)} tickers, skipping download")
+
+        prices = load_price_store(tickers, start_date, end_date, store_dir)
+    else:
+        sessions = window(start_date, end_date)
+        requests = [(ticker, *sessions) for ticker in tickers] if sessions else []
+        fetched = _fetch_prices(requests, provider, max_workers) if requests else {}
+        prices = pd.DataFrame({request[0]: fetched[request] for request in requests if request in fetched})
+        prices.index.name = "Date"
+
+    if calendar is not None and not prices.empty:
+        last_day = pd.Timestamp(end_date) - pd.Timedelta(days=1)
+        prices = prices[prices.index.isin(trading_sessions(start_date, last_day, calendar))]
+
+    # Keep a column for every requested ticker so that validation reports the gaps
+    failed = [ticker for ticker in tickers if ticker not in prices.columns]
+    if failed and not prices.empty:
+        logger.warning(f"No price data for {', '.join(failed)}")
+    return prices.reindex(columns=tickers)
+
+
+def _fetch_prices(
+    requests: List[FetchRequest], provider: MarketDataProvider, max_workers: int
+) -> Dict[FetchRequest, pd.Series]:
+    """Fetch price requests concurrently with a progress bar, dropping the ones that fail."""
+    tickers = {ticker for ticker, _, _ in requests}
+    with Progress(
+        SpinnerColumn(), TextColumn("[progress.description]{task.description}"), BarColumn(),
+        console=console,
+    ) as progress:
+        task = progress.add_task(
+            f"[green]Downloading data for {len(tickers)} tickers...", total=len(requests)
+        )
+        fetched, errors = fetch_many(
+            requests, provider, max_workers=max_workers,
+            on_complete=lambda request: progress.advance(task),
+        )
+
+    for ticker, range_start, range_end in errors:
+        logger.warning(f"No price data found for {ticker} from {range_start} to {range_end}")
+    return fetched
+
+
+def get_price_store_dir(store_dir: Optional[str] = None) -> str:
+    """
+    Resolve the location of the local price store.
+
+    Args:
+        store_dir (str, optional): Explicit store directory
+
+    Returns:
+        str: store_dir if given, else the PRICE_STORE_DIR environment variable,
+            else data/price_store in the project root
+    """
+    if store_dir:
+        return store_dir
+    return os.getenv(
+        "PRICE_STORE_DIR", os.path.join(os.path.dirname(__file__), "..", "data", "price_store")
+    )
+
+
+def load_price_store(
+    tickers: List[str], start_date: str, end_date: str, store_dir: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Read prices for the given tickers and date range from the local price store.
+
+    The store holds one Parquet file per ticker and calendar year, so only the
+    partitions overlapping the requested range are read.
+
+    Args:
+        tickers (List[str]): List of stock tickers
+        start_date (str): Start date in 'YYYY-MM-DD' format
+        end_date (str): End date in 'YYYY-MM-DD' format (exclusive)
+        store_dir (str, optional): Price store location
+
+    Returns:
+        pd.DataFrame: Prices indexed by date, one column per ticker, all NaN for
+                    tickers missing from the store; empty if none is stored
+    """
+    store_dir = get_price_store_dir(store_dir)
+    start = pd.Timestamp(start_date)
+    end = pd.Timestamp(end_date)
+
+    columns = {}
+    for ticker in tickers:
+        partitions = []
+        for year in range(start.year, end.year + 1):
+            path = _partition_path(store_dir, ticker, year)
+            if os.path.exists(path):
+                partitions.append(pd.read_parquet(path)["price"])
+        if partitions:
+            series = pd.concat(partitions).sort_index()
+            columns[ticker] = series[(series.index >= start) & (series.index < end)]
+        else:
+            logger.warning(f"No stored price data found for {ticker}")
+
+    if not columns:
+        return pd.DataFrame()
+
+    prices = pd.DataFrame(columns).reindex(columns=tickers)
+    prices.index.name = "Date"
+    return prices
+
+
+def save_to_price_store(
+    prices: pd.DataFrame, start_date: str, end_date: str, store_dir: Optional[str] = None
+) -> None:
+    """
+    Merge downloaded prices into the local price store and record their coverage.
+
+    Args:
+        prices (pd.DataFrame): Prices indexed by date, one column per ticker
+        start_date (str): Start of the range that was requested, 'YYYY-MM-DD'
+        end_date (str): Exclusive end of the range that was requested, 'YYYY-MM-DD'
+        store_dir (str, optional): Price store location
+    """
+    store_dir = get_price_store_dir(store_dir)
+    coverage = _load_store_coverage(store_dir)
+
+    # Days from today onwards may still change, so never mark them as covered
+    covered_end = min(pd.Timestamp(end_date), pd.Timestamp.today().normalize())
+
+    for ticker in prices.columns:
+        series = prices[ticker].dropna()
+        if series.empty:
+            continue
+        series.index = pd.DatetimeIndex(series.index).tz_localize(None)
+
+        for year, values in series.groupby(series.index.year):
+            path = _partition_path(store_dir, ticker, year)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            partition = values.rename("price").to_frame()
+            if os.path.exists(path):
+                existing = pd.read_parquet(path)
+                partition = partition.combine_first(existing).sort_index()
+            partition.index.name = "Date"
+            partition.to_parquet(path)
+
+        if pd.Timestamp(start_date) < covered_end:
+            coverage[ticker] = _merge_ranges(
+                coverage.get(ticker, []) + [(start_date, covered_end.strftime("%Y-%m-%d"))]
+            )
+
+    with open(os.path.join(store_dir, "coverage.json"), "w") as f:
+        json.dump(coverage, f, indent=2, sort_keys=True)
+    logger.info(f"Stored prices for {len(prices.columns)} tickers in {store_dir}")
+
+
+def _partition_path(store_dir: str, ticker: str, year: int) -> str:
+    """Path of the Parquet partition holding one ticker's prices for one year."""
+    return os.path.join(store_dir, quote(ticker, safe=""), f"{year}.parquet")
+
+
+def _load_store_coverage(store_dir: str) -> Dict[str, List[Tuple[str, str]]]:
+    """Load the date ranges already downloaded into the store, per ticker."""
+    path = os.path.join(store_dir, "coverage.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return {ticker: [tuple(r) for r in ranges] for ticker, ranges in json.load(f).items()}
+
+
+def _merge_ranges(ranges: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Merge overlapping or adjacent half-open date ranges."""
+    merged: List[Tuple[str, str]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _missing_ranges(
+    covered: List[Tuple[str, str]], start_date: str, end_date: str
+) -> List[Tuple[str, str]]:
+    """Parts of the half-open range [start_date, end_date) not in the covered ranges."""
+    start = pd.Timestamp(start_date).strftime("%Y-%m-%d")
+    end = pd.Timestamp(end_date).strftime("%Y-%m-%d")
+    missing = []
+    cursor = start
+    for range_start, range_end in _merge_ranges(covered):
+        if range_end <= cursor:
+            continue
+        if range_start >= end:
+            break
+        if range_start > cursor:
+            missing.append((cursor, range_start))
+        cursor = max(cursor, range_end)
+    if cursor < end:
+        missing.append((cursor, end))
+    return missing
+
+
+def export_price_matrix(prices: pd.DataFrame, path: Optional[str] = None) -> str:
+    """
+    Export a cleaned price panel as a float64 matrix that can be memory-mapped.
+
+    Writes the values to '<path>.npy' (row-major, one row per date) and the
+    dates and tickers to the side-car '<path>.index.npz'. Both files are
+    written to temporary names first and then moved into place, so readers
+    never see a partially written matrix.
+
+    Args:
+        prices (pd.DataFrame): Prices indexed by date, one column per ticker
+        path (str, optional): Base path without extension. Defaults to
+            data/market_data next to the CSV export.
+
+    Returns:
+        str: The base path the matrix was written to
+    """
+    try:
+        if path is None:
+            path = os.path.join(os.path.dirname(__file__), "..", "data", "market_data")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        values = np.ascontiguousarray(prices.to_numpy(dtype=np.float64))
+        dates = pd.DatetimeIndex(prices.index).tz_localize(None).to_numpy(dtype="datetime64[ns]")
+        tickers = np.array([str(ticker) for ticker in prices.columns])
+
+        with open(f"{path}.npy.tmp", "wb") as f:
+            np.save(f, values)
+        with open(f"{path}.index.npz.tmp", "wb") as f:
+            np.savez(f, dates=dates, tickers=tickers)
+        os.replace(f"{path}.npy.tmp", f"{path}.npy")
+        os.replace(f"{path}.index.npz.tmp", f"{path}.index.npz")
+
+        logger.info(f"Price matrix {values.shape} exported to {path}.npy")
+        return path
+
+    except Exception as e:
+        logger.error(f"Error exporting price matrix: {str(e)}")
+        raise
+
+
+def open_price_matrix(path: Optional[str] = None, as_frame: bool = True):
+    """
+    Open a price matrix written by export_price_matrix as a read-only memory map.
+
+    The operating system shares the mapped pages between processes, so any
+    number of workers can read the same panel without parsing or copying it.
+
+    Args:
+        path (str, optional): Base path passed to export_price_matrix
+        as_frame (bool): If True, wrap the map in a DataFrame without copying
+
+    Returns:
+        pd.DataFrame or Tuple[np.memmap, pd.DatetimeIndex, List[str]]: The price
+            panel, or the raw matrix with its dates and tickers
+    """
+    try:
+        if path is None:
+            path = os.path.join(os.path.dirname(__file__), "..", "data", "market_data")
+
+        values = np.load(f"{path}.npy", mmap_mode="r")
+        with np.load(f"{path}.index.npz") as index:
+            dates = pd.DatetimeIndex(index["dates"], name="Date")
+            tickers = index["tickers"].tolist()
+
+        if values.shape != (len(dates), len(tickers)):
+            raise ValueError(
+                f"Price matrix shape {values.shape} does not match its index "
+                f"({len(dates)} dates, {len(tickers)} tickers)"
+            )
+
+        if not as_frame:
+            return values, dates, tickers
+        return pd.DataFrame(values, index=dates, columns=tickers, copy=False)
+
+    except Exception as e:
+        logger.error(f"Error opening price matrix: {str(e)}")
+        raise
+
+
+def get_exchange_rates(
+    start_date: str,
+    end_date: str,
+    simulation: bool = True,
+    provider: Optional[MarketDataProvider] = None,
+    dates: Optional[pd.DatetimeIndex] = None,
+    use_store: bool = True,
+    store_dir: Optional[str] = None,
+    calendar: Optional[str] = DEFAULT_CALENDAR,
+) -> pd.Series:
     """
     Get or simulate USD/CAD exchange rates for the given period.
 
+    Real rates (ticker CAD=X) go through the local price store like equity
+    prices, so each session is only downloaded once across runs. A few extra
+    days before start_date are read so the first trading day always has a rate.
+    The period is [start_date, end_date), as for download_market_data, so the
+    same dates give one rate per price row.
+
     Args:
         start_date (str): Start date in 'YYYY-MM-DD' format
-        end_date (str): End date in 'YYYY-MM-DD' format
+        end_date (str): End date in 'YYYY-MM-DD' format (exclusive, as in download_market_data)
         simulation (bool): If True, use simulated constant rate
+        provider (MarketDataProvider, optional): Source of the real rates,
+            defaults to the default provider
+        dates (pd.DatetimeIndex, optional): Trading days to align the rates to,
+            usually the index of the price data. Defaults to the sessions of
+            the calendar in the period.
+        use_store (bool): If True, read real rates from and update the price store
+        store_dir (str, optional): Price store location
+        calendar (str, optional): Trading calendar, "NYSE" or "TSX"; None
+            uses every business day
 
     Returns:
         pd.Series: Exchange rates indexed by date
@@ -144,16 +527,28 @@ def get_exchange_rates(start_date: str, end_date: str, simulation: bool = True)
     try:
         if simulation:
             # Create a date range
-            date_range = pd.date_range(start=start_date, end=end_date, freq="B")
+            if dates is None:
+                dates = _period_days(start_date, end_date, calendar)
+            date_range = dates
             # Use a constant rate for simulation
             SIMULATED_RATE = 1.35  # Example USD/CAD rate
             rates = pd.Series(SIMULATED_RATE, index=date_range, name="USD/CAD")
             logger.info(f"Generated simulated exchange rates using constant rate: {SIMULATED_RATE}")
-        else:
-            # For real exchange rate data, you would implement API calls here
-            # Example: rates = download_exchange_rates_from_api(start_date, end_date)
-            raise NotImplementedError("Real exchange rate download not implemented")
+            return rates
+
+        fetch_start = pd.Timestamp(start_date) - pd.Timedelta(days=FX_LOOKBACK_DAYS)
+        prices = _load_prices(
+            [FX_TICKER], fetch_start.strftime("%Y-%m-%d"), end_date,
+            use_store, store_dir, provider, None, calendar,
+        )
+        if prices.empty:
+            raise ValueError(f"No exchange rates found from {start_date} to {end_date}")
+        rates = prices[FX_TICKER].dropna().rename("USD/CAD")
 
+        if dates is None:
+            dates = _period_days(start_date, end_date, calendar)
+        rates = align_exchange_rates(rates, dates)
+        logger.info(f"Loaded {len(rates)} USD/CAD exchange rates")
         return rates
 
     except Exception as e:
@@ -161,10 +556,48 @@ def get_exchange_rates(start_date: str, end_date: str, simulation: bool = True)
         raise
 
 
+def _period_days(start_date: str, end_date: str, calendar: Optional[str]) -> pd.DatetimeIndex:
+    """Sessions of the calendar in [start_date, end_date), or business days without a calendar."""
+    last_day = pd.Timestamp(end_date) - pd.Timedelta(days=1)
+    if calendar is None:
+        return pd.date_range(start=start_date, end=last_day, freq="B")
+    return trading_sessions(start_date, last_day.strftime("%Y-%m-%d"), calendar)
+
+
+def align_exchange_rates(rates: pd.Series, dates: pd.DatetimeIndex) -> pd.Series:
+    """
+    Align exchange rates to the equity trading calendar.
+
+    FX and equity markets close on different holidays, so each trading day
+    takes the latest rate known on it (a single forward-filling reindex).
+    Days before the first rate take the first rate.
+
+    Args:
+        rates (pd.Series): Exchange rates indexed by date
+        dates (pd.DatetimeIndex): Trading days of the price data
+
+    Returns:
+        pd.Series: One rate per trading day, indexed by dates
+    """
+    if rates.empty:
+        raise ValueError("No exchange rates to align")
+    if not rates.index.is_monotonic_increasing or rates.index.has_duplicates:
+        rates = rates[~rates.index.duplicated(keep="last")].sort_index()
+    aligned = rates.reindex(dates, method="ffill")
+    if aligned.isna().any():
+        aligned = aligned.fillna(rates.iloc[0])
+    return aligned
+
+
 def validate_market_data(market_data: pd.DataFrame) -> bool:
     """
     Validate market data quality.
 
+    All checks run in one pass over the price matrix (see
+    src.validation.check_market_data for the detailed per-ticker report).
+    Errors are logged and fail validation; warnings such as stale prices or
+    price jumps are only logged.
+
     Args:
         market_data (pd.DataFrame): Market data to validate
 
@@ -172,35 +605,18 @@ def validate_market_data(market_data: pd.DataFrame) -> bool:
         bool: True if data passes validation, False otherwise
     """
     try:
-        # Check for empty data
-        if market_data.empty:
-            logger.error("Market data is empty")
-            return False
-
-        # Check for missing values
-        if market_data.isnull().any().any():
-            logger.error("Market data contains missing values")
-            return False
-
-        # Check for zero or negative prices
-        if (market_data <= 0).any().any():
-            logger.error("Market data contains zero or negative prices")
-            return False
-
-        # Check for sufficient trading days (only in production)
-        if not os.getenv("TESTING"):
-            min_trading_days = 15
-            if len(market_data) < min_trading_days:
-                logger.error(f"Insufficient trading days: {len(market_data)} < {min_trading_days}")
-                return False
-
-        # Check for monotonic dates
-        if not market_data.index.is_monotonic_increasing:
-            logger.error("Market data dates are not monotonically increasing")
-            return False
-
-        logger.info("Market data validation passed")
-        return True
+        # Only require enough trading days in production
+        min_trading_days = 0 if os.getenv("TESTING") else MIN_TRADING_DAYS
+        report = check_market_data(market_data, min_trading_days=min_trading_days)
+
+        for message in report.errors:
+            logger.error(message)
+        for message in report.warnings:
+            logger.warning(message)
+
+        if report.passed:
+            logger.info("Market data validation passed")
+        return report.passed
 
     except Exception as e:
         logger.error(f"Error validating market data: {str(e)}")
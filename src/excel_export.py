@@ -0,0 +1,400 @@
+"""
+Excel export module for the hedge fund portfolio project.
+Streams daily results into write-only workbooks, so memory stays flat
+however long the exported history is, and writes formatted workbooks
+with per-column widths and number formats. Also appends streamed rows to
+CSV files.
+"""
+
+import logging
+import os
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.styles import Alignment, Border, Font, Side
+from openpyxl.utils import get_column_letter
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Rows converted and written per chunk
+EXPORT_CHUNK_SIZE = 10_000
+
+# Decimals kept for float values (the "%.4f" float_format of the pandas export)
+FLOAT_DECIMALS = 4
+
+SUMMARY_METRICS = [
+    "Total Return (%)",
+    "Average Daily Return (%)",
+    "Return Volatility (%)",
+    "Average Beta",
+    "Beta Volatility",
+    "Number of Rebalances",
+    "Total Management Fees",
+    "Total Transaction Costs",
+]
+
+
+def append_csv(frame: pd.DataFrame, path: str, **kwargs) -> None:
+    """Append rows to a CSV file, writing the header only when the file is new or empty."""
+    frame.to_csv(path, mode="a", header=not os.path.exists(path) or os.path.getsize(path) == 0, **kwargs)
+
+
+def iter_chunks(frame: pd.DataFrame, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Split a DataFrame into consecutive row chunks without copying it."""
+    for start in range(0, len(frame), chunk_size):
+        yield frame.iloc[start:start + chunk_size]
+
+
+def append_frame(
+    sheet,
+    frame: pd.DataFrame,
+    header: bool = True,
+    index: bool = True,
+    decimals: Optional[int] = FLOAT_DECIMALS,
+) -> None:
+    """
+    Append a DataFrame to a write-only worksheet, one column at a time.
+
+    Args:
+        sheet: openpyxl write-only worksheet
+        frame (pd.DataFrame): Rows to append
+        header (bool): If True, write a bold header row first
+        index (bool): If True, write the index as the first column
+        decimals (int, optional): Round float columns to this many decimals
+    """
+    if header:
+        labels = ([frame.index.name or ""] if index else []) + [str(column) for column in frame.columns]
+        cells = [WriteOnlyCell(sheet, value=label) for label in labels]
+        for cell in cells:
+            cell.font = Font(bold=True)
+        sheet.append(cells)
+
+    columns: List[List[Any]] = []
+    if index:
+        keys = frame.index
+        columns.append(keys.to_pydatetime().tolist() if isinstance(keys, pd.DatetimeIndex) else keys.tolist())
+    for column in frame.columns:
+        values = frame[column]
+        if pd.api.types.is_float_dtype(values):
+            if decimals is not None:
+                values = values.round(decimals)
+            if values.hasnans:
+                # Missing values become empty cells, as in the pandas export
+                values = values.astype(object).where(values.notna(), None)
+        columns.append(values.tolist())
+    for row in zip(*columns):
+        sheet.append(row)
+
+
+def write_sheets(
+    filename: str, sheets: Dict[str, pd.DataFrame], chunk_size: int = EXPORT_CHUNK_SIZE
+) -> None:
+    """
+    Write DataFrames to a write-only workbook, one sheet each, in chunks.
+
+    Args:
+        filename (str): Path of the workbook to write
+        sheets (Dict[str, pd.DataFrame]): Frames keyed by sheet name
+        chunk_size (int): Rows converted and written at a time
+    """
+    workbook = Workbook(write_only=True)
+    for name, frame in sheets.items():
+        sheet = workbook.create_sheet(name)
+        if frame.empty:
+            append_frame(sheet, frame)
+        for number, chunk in enumerate(iter_chunks(frame, chunk_size)):
+            append_frame(sheet, chunk, header=number == 0, decimals=None)
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    workbook.save(filename)
+
+
+class _RunningMoments:
+    """Count, mean and sum of squared deviations, merged chunk by chunk."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values: np.ndarray) -> None:
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        count = len(values)
+        mean = float(values.mean())
+        m2 = float(((values - mean) ** 2).sum())
+        total = self.count + count
+        delta = mean - self.mean
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.mean += delta * count / total
+        self.count = total
+
+    def std(self) -> float:
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else float("nan")
+
+
+class DailyResultsWriter:
+    """
+    Stream daily simulation results into an Excel workbook.
+
+    Produces the sheets of export_to_excel (Daily Performance, Rebalancing
+    Events and Summary Statistics) with write-only worksheets. Each chunk is
+    written straight through, its rebalancing days copied to the events sheet
+    and its statistics folded into running totals in the same pass, so only
+    one chunk is ever held in memory.
+
+    Args:
+        filename (str): Path of the workbook to write
+
+    Example:
+        with DailyResultsWriter("docs/backtest.xlsx") as writer:
+            for results in monthly_results:
+                writer.write(results)
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.rows = 0
+        self._workbook = Workbook(write_only=True)
+        self._daily = self._workbook.create_sheet("Daily Performance")
+        self._events = self._workbook.create_sheet("Rebalancing Events")
+        self._summary = self._workbook.create_sheet("Summary Statistics")
+        self._columns: Optional[List[str]] = None
+        self._initial_value: Optional[float] = None
+        self._final_value: Optional[float] = None
+        self._returns = _RunningMoments()
+        self._betas = _RunningMoments()
+        self._rebalances = 0
+        self._management_fees = 0.0
+        self._transaction_costs = 0.0
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        """
+        Append a chunk of daily results, in date order.
+
+        Args:
+            chunk (pd.DataFrame): Daily results as returned by simulate_portfolio
+        """
+        if chunk.empty:
+            return
+        first = self._columns is None
+        if first:
+            self._columns = list(chunk.columns)
+        elif list(chunk.columns) != self._columns:
+            raise ValueError("All chunks must have the same columns")
+
+        rebalanced = chunk["rebalanced"].to_numpy(dtype=bool)
+        append_frame(self._daily, chunk, header=first)
+        append_frame(self._events, chunk[rebalanced], header=first)
+
+        values = chunk["portfolio_value_usd"]
+        if self._initial_value is None:
+            self._initial_value = float(values.iloc[0])
+        self._final_value = float(values.iloc[-1])
+        self._returns.update(chunk["daily_return"].to_numpy(dtype=np.float64))
+        self._betas.update(chunk["portfolio_beta"].to_numpy(dtype=np.float64))
+        self._rebalances += int(rebalanced.sum())
+        self._management_fees += float(chunk["management_fee"].sum())
+        self._transaction_costs += float(chunk["transaction_costs"].sum())
+        self.rows += len(chunk)
+
+    def summary(self) -> pd.DataFrame:
+        """Summary statistics of the rows written so far."""
+        if self._initial_value is None:
+            raise ValueError("No daily results have been written")
+        total_return = ((self._final_value / self._initial_value) - 1) * 100
+        return pd.DataFrame(
+            {
+                "Metric": SUMMARY_METRICS,
+                "Value": [
+                    total_return,
+                    self._returns.mean * 100,
+                    self._returns.std() * 100,
+                    self._betas.mean,
+                    self._betas.std(),
+                    self._rebalances,
+                    self._management_fees,
+                    self._transaction_costs,
+                ],
+            }
+        )
+
+    def close(self) -> pd.DataFrame:
+        """
+        Write the summary sheet and save the workbook.
+
+        Returns:
+            pd.DataFrame: The summary statistics written
+        """
+        summary = self.summary()
+        append_frame(self._summary, summary, index=False)
+        directory = os.path.dirname(self.filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._workbook.save(self.filename)
+        logger.info(f"Streamed {self.rows} daily rows to {self.filename}")
+        return summary
+
+    def discard(self) -> None:
+        """Drop the rows written so far without saving the workbook."""
+        # Write-only sheets buffer their rows in temporary files that only
+        # saving releases, so save to a scratch file and delete it
+        handle, scratch = tempfile.mkstemp(suffix=".xlsx")
+        os.close(handle)
+        try:
+            self._workbook.save(scratch)
+        finally:
+            os.remove(scratch)
+
+    def __enter__(self) -> "DailyResultsWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        # Leave no half-written workbook behind on errors
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+def stream_daily_results(
+    chunks: Iterable[pd.DataFrame], filename: str, on_chunk=None
+) -> pd.DataFrame:
+    """
+    Write daily results, given as a sequence of chunks, to an Excel workbook.
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): Daily results in date order, e.g. one
+            frame per simulated month or iter_chunks(results)
+        filename (str): Path of the workbook to write
+        on_chunk (Callable, optional): Called with each chunk after it is written
+
+    Returns:
+        pd.DataFrame: The summary statistics written
+    """
+    with DailyResultsWriter(filename) as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+            if on_chunk is not None:
+                on_chunk(chunk)
+    return writer.summary()
+
+
+# Characters not allowed in sheet names
+_INVALID_TITLE_CHARS = set("[]:*?/\\")
+
+# Header row style: bold, thin borders, centered at the top
+_HEADER_FONT = Font(bold=True)
+_HEADER_BORDER = Border(*(Side(style="thin") for _ in range(4)))
+_HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="top")
+
+
+def write_formatted_workbook(
+    filename: str,
+    sheets: Dict[str, pd.DataFrame],
+    column_formats: Optional[Dict[str, Tuple[Optional[float], Optional[str]]]] = None,
+    index: bool = True,
+) -> None:
+    """
+    Write DataFrames to a workbook with per-column widths and number formats.
+
+    Sheets are written row by row to write-only worksheets, with a bold,
+    bordered header row. Each column is converted as a whole, and the cells of
+    a formatted column share one number format. Control characters that Excel
+    cannot store are dropped from text cells.
+
+    Args:
+        filename (str): Path of the workbook to write
+        sheets (Dict[str, pd.DataFrame]): Frames keyed by sheet name
+        column_formats (Dict[str, Tuple[float, str]], optional): Width and
+            number format per column name; either may be None
+        index (bool): If True, write the index as the first column
+
+    Example:
+        write_formatted_workbook(
+            "prices.xlsx", {"AAPL": aapl}, {"Date": (12, "yyyy-mm-dd"), "Close": (10, "#,##0.00")}
+        )
+    """
+    column_formats = column_formats or {}
+    for title in sheets:
+        _check_title(title)
+
+    workbook = Workbook(write_only=True)
+    for title, frame in sheets.items():
+        if index:
+            frame = frame.reset_index()
+        sheet = workbook.create_sheet(title)
+        formats = [column_formats.get(str(column), (None, None)) for column in frame.columns]
+        for position, (width, _) in enumerate(formats, start=1):
+            if width:
+                sheet.column_dimensions[get_column_letter(position)].width = width
+
+        header = [WriteOnlyCell(sheet, value=_clean_text(str(column))) for column in frame.columns]
+        for cell in header:
+            cell.font = _HEADER_FONT
+            cell.border = _HEADER_BORDER
+            cell.alignment = _HEADER_ALIGNMENT
+        sheet.append(header)
+
+        columns = [
+            _column_values(frame.iloc[:, position], sheet, number_format)
+            for position, (_, number_format) in enumerate(formats)
+        ]
+        for row in zip(*columns):
+            sheet.append(row)
+
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    workbook.save(filename)
+    logger.info(f"Wrote {len(sheets)} sheets to {filename}")
+
+
+def _check_title(title: str) -> None:
+    if not title or len(title) > 31 or _INVALID_TITLE_CHARS & set(title):
+        raise ValueError(f"Invalid sheet name: {title!r}")
+
+
+def _clean_text(value: str) -> str:
+    return ILLEGAL_CHARACTERS_RE.sub("", value)
+
+
+def _column_values(values: pd.Series, sheet, number_format: Optional[str]) -> List[Any]:
+    """Cell values of one column, missing values as empty cells."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        stamps = pd.DatetimeIndex(values)
+        if stamps.tz is not None:
+            # Wall-clock dates, as Excel has no time zones
+            stamps = stamps.tz_localize(None)
+        cells = [None if stamp is pd.NaT else stamp for stamp in stamps.to_pydatetime().tolist()]
+    elif pd.api.types.is_bool_dtype(values):
+        cells = values.tolist()
+    elif pd.api.types.is_numeric_dtype(values):
+        missing = ~np.isfinite(values.to_numpy(dtype=np.float64, na_value=np.nan))
+        cells = [None if skip else value for value, skip in zip(values.tolist(), missing.tolist())]
+    else:
+        cells = [
+            None if value is None or value is pd.NaT or value != value
+            else _clean_text(value) if isinstance(value, str) else value
+            for value in values.tolist()
+        ]
+
+    if not number_format:
+        return cells
+    formatted = []
+    for value in cells:
+        cell = WriteOnlyCell(sheet, value=value)
+        cell.number_format = number_format
+        formatted.append(cell)
+    return formatted
@@ -0,0 +1,548 @@
+"""
+Live book module for the hedge fund portfolio project.
+Updates the simulated book one trading day at a time from a persisted state,
+instead of re-running the whole pipeline from the start of the period.
+"""
+
+import argparse
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import BETA_TOLERANCE, TRANSACTION_FEE_PER_SHARE, load_config
+from .data_acquisition import download_market_data, get_exchange_rates
+from .excel_export import append_csv
+from .portfolio import PortfolioState, initialize_portfolio, rebalance_portfolio
+from .providers import provider_from_config
+from .trade_ledger import TradeLedger
+from .trading_calendar import DEFAULT_CALENDAR, offset_sessions
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+LIVE_DIR = os.path.join("docs", "live")
+LIVE_STATE_FILE = "live_state.json"
+
+# Trading days of history used to seed the betas when the book is started
+BETA_LOOKBACK_DAYS = 60
+
+# Observations needed before a running beta is used (as in compute_rolling_betas)
+MIN_BETA_PERIODS = 2
+
+# Version of the persisted state layout
+STATE_VERSION = 1
+
+LIVE_RESULT_COLUMNS = [
+    "portfolio_value_usd",
+    "gross_exposure_usd",
+    "portfolio_value_cad",
+    "portfolio_beta",
+    "daily_return",
+    "management_fee",
+    "transaction_costs",
+    "rebalanced",
+    "exchange_rate",
+]
+
+
+class LiveBook:
+    """
+    Simulator state of the live book, updated one trading day at a time.
+
+    The state holds everything simulate_portfolio would otherwise rebuild
+    from the first day: the holdings, the last prices, running moments of
+    the ticker and market returns for the betas, the peak gross exposure for
+    the drawdown, and the fee and return accumulators. Each update only
+    touches vectors of one value per ticker, so a day costs O(tickers)
+    whatever the length of the history, and the state round-trips through a
+    small JSON file between runs.
+
+    Betas are expanding-window estimates, or exponentially weighted ones
+    when beta_halflife is set, and match compute_rolling_betas on the same
+    returns.
+    """
+
+    def __init__(
+        self,
+        tickers: List[str],
+        market_index: str,
+        shares,
+        management_fee_rate: float,
+        target_beta: float,
+        beta_tolerance: float = BETA_TOLERANCE,
+        transaction_fee: float = TRANSACTION_FEE_PER_SHARE,
+        rebalance_method: str = "heuristic",
+        beta_halflife: Optional[float] = None,
+    ):
+        """
+        Args:
+            tickers (List[str]): Portfolio tickers
+            market_index (str): Market index the betas are measured against
+            shares: Shares per ticker, as a mapping or a sequence aligned with tickers
+            management_fee_rate (float): Annual management fee rate
+            target_beta (float): Target portfolio beta
+            beta_tolerance (float): Allowed deviation from the target beta before rebalancing
+            transaction_fee (float): Transaction fee per share traded when rebalancing
+            rebalance_method (str): Rebalancing method passed to rebalance_portfolio
+            beta_halflife (float, optional): Halflife in trading days for EWMA betas
+        """
+        if beta_halflife is not None and beta_halflife <= 0:
+            raise ValueError(f"Halflife must be positive, got {beta_halflife}")
+        self.tickers = list(tickers)
+        self.market_index = market_index
+        self.shares = PortfolioState(self.tickers, shares).shares
+        self.management_fee_rate = management_fee_rate
+        self.target_beta = target_beta
+        self.beta_tolerance = beta_tolerance
+        self.transaction_fee = transaction_fee
+        self.rebalance_method = rebalance_method
+        self.beta_halflife = beta_halflife
+
+        n_tickers = len(self.tickers)
+        self.last_date: Optional[pd.Timestamp] = None
+        self.last_prices: Optional[np.ndarray] = None
+        # Running means of x (market), y (ticker), x*x and x*y returns
+        self.beta_count = np.zeros(n_tickers)
+        self.mean_x = np.zeros(n_tickers)
+        self.mean_y = np.zeros(n_tickers)
+        self.mean_xx = np.zeros(n_tickers)
+        self.mean_xy = np.zeros(n_tickers)
+
+        self.days = 0
+        self.rebalances = 0
+        self.initial_gross_exposure: Optional[float] = None
+        self.peak_gross_exposure = 0.0
+        self.max_drawdown = 0.0
+        self.management_fees = 0.0
+        self.transaction_costs = 0.0
+        self.return_count = 0
+        self.return_sum = 0.0
+        self.return_sq_sum = 0.0
+        # Sizes in bytes of the output files when the state was saved, see run_live_update
+        self.output_sizes: Optional[Dict[str, int]] = None
+
+    def observe_returns(self, stock_returns: np.ndarray, market_return: float) -> None:
+        """Blend one day of ticker and market returns into the beta moments."""
+        stock_returns = np.asarray(stock_returns, dtype=np.float64)
+        valid = ~np.isnan(stock_returns) & ~np.isnan(market_return)
+        if self.beta_halflife is None:
+            # Running means weight every observation equally
+            weight = np.where(valid, 1.0 / (self.beta_count + 1), 0.0)
+        else:
+            alpha = 1.0 - np.exp(np.log(0.5) / self.beta_halflife)
+            # The first observation seeds the averages, later ones are blended in
+            weight = np.where(valid, np.where(self.beta_count > 0, alpha, 1.0), 0.0)
+        x = np.where(valid, market_return, 0.0)
+        y = np.where(valid, stock_returns, 0.0)
+
+        self.mean_x += weight * (x - self.mean_x)
+        self.mean_y += weight * (y - self.mean_y)
+        self.mean_xx += weight * (x * x - self.mean_xx)
+        self.mean_xy += weight * (x * y - self.mean_xy)
+        self.beta_count += valid
+
+    def betas(self) -> np.ndarray:
+        """Current beta per ticker; zero until MIN_BETA_PERIODS returns are seen."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            betas = (self.mean_xy - self.mean_x * self.mean_y) / (self.mean_xx - self.mean_x * self.mean_x)
+        betas[(self.beta_count < MIN_BETA_PERIODS) | ~np.isfinite(betas)] = 0.0
+        return betas
+
+    def update(
+        self, date, prices, exchange_rate: float = 1.35
+    ) -> Tuple[Dict[str, Any], TradeLedger]:
+        """
+        Process the closing prices of one trading day.
+
+        The day's returns update the betas, the book is valued with the
+        holdings carried from the previous day and rebalanced if its beta is
+        outside the tolerance, as in simulate_portfolio.
+
+        Args:
+            date: Trading date, after the last processed one
+            prices: Closing prices for the tickers and the market index, as a
+                mapping or pd.Series
+            exchange_rate (float): USD/CAD rate of the day
+
+        Returns:
+            Tuple[Dict[str, Any], TradeLedger]: The day's row of
+                simulation results (LIVE_RESULT_COLUMNS plus Date) and its
+                transaction logs
+        """
+        date = pd.Timestamp(date)
+        if self.last_date is not None and date <= self.last_date:
+            raise ValueError(f"{date.date()} is not after the last processed day {self.last_date.date()}")
+        day_prices = self._price_vector(prices)
+        stock_prices = day_prices[:-1]
+
+        if self.last_prices is not None:
+            day_returns = day_prices / self.last_prices - 1
+            self.observe_returns(day_returns[:-1], day_returns[-1])
+        betas = self.betas()
+
+        positions = stock_prices * self.shares
+        gross_exposure = float(np.abs(positions).sum())
+        if gross_exposure == 0:
+            raise ValueError("Total portfolio exposure cannot be zero")
+        net_value = float(positions.sum())
+        portfolio_beta = float(positions @ betas) / gross_exposure
+
+        rebalanced = abs(portfolio_beta - self.target_beta) > self.beta_tolerance
+        rebalance_cost, transaction_logs = 0.0, TradeLedger()
+        if rebalanced:
+            rebalance_cost, transaction_logs = self._rebalance(date, stock_prices, betas)
+
+        # Returns are measured against the holdings after any rebalance, as in simulate_portfolio
+        daily_return = 0.0
+        if self.last_prices is not None:
+            previous_gross = float(np.abs(self.last_prices[:-1]) @ np.abs(self.shares))
+            if previous_gross > 0:
+                daily_return = gross_exposure / previous_gross - 1
+            self.return_count += 1
+            self.return_sum += daily_return
+            self.return_sq_sum += daily_return ** 2
+
+        management_fee = gross_exposure * (self.management_fee_rate / 252)
+        self.days += 1
+        self.management_fees += management_fee
+        self.transaction_costs += rebalance_cost
+        self._track_exposure(gross_exposure)
+        self.last_prices = day_prices
+        self.last_date = date
+
+        row = {
+            "Date": date,
+            "portfolio_value_usd": net_value,
+            "gross_exposure_usd": gross_exposure,
+            "portfolio_value_cad": net_value * exchange_rate,
+            "portfolio_beta": portfolio_beta,
+            "daily_return": daily_return,
+            "management_fee": management_fee,
+            "transaction_costs": rebalance_cost,
+            "rebalanced": rebalanced,
+            "exchange_rate": exchange_rate,
+        }
+        return row, transaction_logs
+
+    def summary(self) -> Dict[str, Any]:
+        """Statistics accumulated since the book was started."""
+        gross_exposure = float(np.abs(self.last_prices[:-1]) @ np.abs(self.shares))
+        total_return = gross_exposure / self.initial_gross_exposure - 1
+        count = max(self.return_count, 1)
+        mean = self.return_sum / count
+        variance = max(self.return_sq_sum / count - mean ** 2, 0.0) * count / max(count - 1, 1)
+        return {
+            "last_date": self.last_date,
+            "days": self.days,
+            "initial_gross_exposure_usd": self.initial_gross_exposure,
+            "gross_exposure_usd": gross_exposure,
+            "portfolio_value_usd": float(self.last_prices[:-1] @ self.shares),
+            "total_return": total_return,
+            "annualized_volatility": float(np.sqrt(variance * 252)),
+            "max_drawdown": self.max_drawdown,
+            "rebalances": self.rebalances,
+            "total_management_fees": self.management_fees,
+            "total_transaction_costs": self.transaction_costs,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable state."""
+        state = {
+            "version": STATE_VERSION,
+            "tickers": self.tickers,
+            "market_index": self.market_index,
+            "shares": self.shares.tolist(),
+            "management_fee_rate": self.management_fee_rate,
+            "target_beta": self.target_beta,
+            "beta_tolerance": self.beta_tolerance,
+            "transaction_fee": self.transaction_fee,
+            "rebalance_method": self.rebalance_method,
+            "beta_halflife": self.beta_halflife,
+            "last_date": None if self.last_date is None else self.last_date.isoformat(),
+            "last_prices": None if self.last_prices is None else self.last_prices.tolist(),
+        }
+        for name in ("beta_count", "mean_x", "mean_y", "mean_xx", "mean_xy"):
+            state[name] = getattr(self, name).tolist()
+        for name in (
+            "days", "rebalances", "initial_gross_exposure", "peak_gross_exposure", "max_drawdown",
+            "management_fees", "transaction_costs", "return_count", "return_sum", "return_sq_sum",
+        ):
+            state[name] = getattr(self, name)
+        state["output_sizes"] = self.output_sizes
+        return state
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "LiveBook":
+        """Rebuild a book from to_dict output."""
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported live state version: {state.get('version')}")
+        book = cls(
+            state["tickers"],
+            state["market_index"],
+            state["shares"],
+            state["management_fee_rate"],
+            state["target_beta"],
+            beta_tolerance=state["beta_tolerance"],
+            transaction_fee=state["transaction_fee"],
+            rebalance_method=state["rebalance_method"],
+            beta_halflife=state["beta_halflife"],
+        )
+        if state["last_date"] is not None:
+            book.last_date = pd.Timestamp(state["last_date"])
+            book.last_prices = np.array(state["last_prices"], dtype=np.float64)
+        for name in ("beta_count", "mean_x", "mean_y", "mean_xx", "mean_xy"):
+            setattr(book, name, np.array(state[name], dtype=np.float64))
+        for name in (
+            "days", "rebalances", "initial_gross_exposure", "peak_gross_exposure", "max_drawdown",
+            "management_fees", "transaction_costs", "return_count", "return_sum", "return_sq_sum",
+        ):
+            setattr(book, name, state[name])
+        book.output_sizes = state.get("output_sizes")
+        return book
+
+    def save(self, path: str) -> None:
+        """Write the state atomically, so an interrupted run keeps the previous one."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(f"{path}.tmp", path)
+
+    @classmethod
+    def load(cls, path: str) -> "LiveBook":
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def _price_vector(self, prices) -> np.ndarray:
+        """Prices of the tickers followed by the market index, checked for gaps."""
+        columns = self.tickers + [self.market_index]
+        if isinstance(prices, pd.Series):
+            prices = prices.to_dict()
+        missing = [ticker for ticker in columns if prices.get(ticker) is None or np.isnan(prices[ticker])]
+        if missing:
+            raise ValueError(f"Missing prices for {', '.join(missing)}")
+        return np.array([prices[ticker] for ticker in columns], dtype=np.float64)
+
+    def _rebalance(self, date, stock_prices: np.ndarray, betas: np.ndarray) -> Tuple[float, TradeLedger]:
+        """Rebalance the holdings with rebalance_portfolio, returning its cost and trades."""
+        state, rebalance_cost, transaction_logs = rebalance_portfolio(
+            PortfolioState(self.tickers, self.shares),
+            stock_prices,
+            betas,
+            self.target_beta,
+            date,
+            beta_tolerance=self.beta_tolerance,
+            transaction_fee=self.transaction_fee,
+            method=self.rebalance_method,
+        )
+        self.shares = state.shares.copy()
+        self.rebalances += 1
+        logger.info(f"Rebalanced live book on {date.date()}, {len(transaction_logs)} trades")
+        return rebalance_cost, transaction_logs
+
+    def _track_exposure(self, gross_exposure: float) -> None:
+        if self.initial_gross_exposure is None:
+            self.initial_gross_exposure = gross_exposure
+        self.peak_gross_exposure = max(self.peak_gross_exposure, gross_exposure)
+        self.max_drawdown = min(self.max_drawdown, gross_exposure / self.peak_gross_exposure - 1)
+
+
+def start_live_book(history: pd.DataFrame, config: Dict[str, Any]) -> Tuple[LiveBook, TradeLedger]:
+    """
+    Open the live book at the last day of a price history.
+
+    The returns of the history seed the betas, and the portfolio is built
+    with initialize_portfolio at the last day's prices. Later days are then
+    added with LiveBook.update.
+
+    Args:
+        history (pd.DataFrame): Daily prices of the tickers and the market index
+        config (Dict[str, Any]): Configuration with the tickers, capital and fees
+
+    Returns:
+        Tuple[LiveBook, TradeLedger]: The book and the initial trades
+    """
+    try:
+        tickers = config["tickers_long"] + config["tickers_short"]
+        market_index = config["market_index"]
+        transaction_fee = config.get("transaction_fee", TRANSACTION_FEE_PER_SHARE)
+        book = LiveBook(
+            tickers,
+            market_index,
+            None,
+            config.get("management_fee", 0.02),
+            config["target_portfolio_beta"],
+            beta_tolerance=config.get("beta_tolerance", BETA_TOLERANCE),
+            transaction_fee=transaction_fee,
+            rebalance_method=config.get("rebalance_method", "heuristic"),
+            beta_halflife=config.get("beta_halflife"),
+        )
+
+        prices = history[tickers + [market_index]].to_numpy(dtype=np.float64)
+        for day_returns in prices[1:] / prices[:-1] - 1:
+            book.observe_returns(day_returns[:-1], day_returns[-1])
+
+        start_date = history.index[-1]
+        portfolio, initial_cost, transaction_logs = initialize_portfolio(
+            config["initial_capital"],
+            history[tickers].iloc[-1].to_dict(),
+            config["tickers_long"],
+            config["tickers_short"],
+            dict(zip(tickers, book.betas())),
+            start_date,
+            transaction_fee=transaction_fee,
+        )
+        book.shares = PortfolioState(tickers, portfolio).shares
+        book.last_prices = prices[-1]
+        book.last_date = pd.Timestamp(start_date)
+        book.transaction_costs += initial_cost
+
+        # Whole-share rounding can leave the new book outside the tolerance,
+        # which simulate_portfolio would correct on its first day
+        positions = book.last_prices[:-1] * book.shares
+        betas = book.betas()
+        if abs(positions @ betas / np.abs(positions).sum() - book.target_beta) > book.beta_tolerance:
+            rebalance_cost, rebalance_logs = book._rebalance(book.last_date, book.last_prices[:-1], betas)
+            book.transaction_costs += rebalance_cost
+            transaction_logs.extend(rebalance_logs)
+        book._track_exposure(float(np.abs(book.last_prices[:-1]) @ np.abs(book.shares)))
+        logger.info(f"Started live book on {book.last_date.date()} with {len(tickers)} tickers")
+        return book, transaction_logs
+
+    except Exception as e:
+        logger.error(f"Error starting live book: {str(e)}")
+        raise
+
+
+def run_live_update(
+    config: Optional[Dict[str, Any]] = None,
+    output_dir: str = LIVE_DIR,
+    as_of=None,
+    beta_lookback: int = BETA_LOOKBACK_DAYS,
+) -> Dict[str, Any]:
+    """
+    Bring the live book up to date.
+
+    The first run downloads beta_lookback trading days of history and starts
+    the book on the last of them. Later runs load the saved state and only
+    download and process the days after its last date, appending one row per
+    day to live_daily.csv and the trades to live_transactions.csv. The state
+    is saved after every day with the sizes of both files, and rows that a
+    run which stopped before saving had already appended are dropped when
+    the next run starts, so each day is written exactly once.
+
+    Args:
+        config (Dict[str, Any], optional): Configuration, defaults to load_config()
+        output_dir (str): Directory of the state file and the CSV outputs
+        as_of: Last date to process, defaults to today
+        beta_lookback (int): Trading days of history used to start the book
+
+    Returns:
+        Dict[str, Any]: LiveBook.summary() after the update, with the number
+            of days processed by this run
+    """
+    try:
+        config = config if config is not None else load_config()
+        state_path = os.path.join(output_dir, LIVE_STATE_FILE)
+        results_path = os.path.join(output_dir, "live_daily.csv")
+        transactions_path = os.path.join(output_dir, "live_transactions.csv")
+        output_paths = (results_path, transactions_path)
+        os.makedirs(output_dir, exist_ok=True)
+
+        as_of = pd.Timestamp(as_of if as_of is not None else pd.Timestamp.today()).normalize()
+        end_date = (as_of + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+        provider = provider_from_config(config)
+        calendar = config.get("trading_calendar", DEFAULT_CALENDAR)
+        all_tickers = config["tickers_long"] + config["tickers_short"] + [config["market_index"]]
+
+        if not os.path.exists(state_path):
+            start_date = offset_sessions(as_of, -beta_lookback, calendar)
+            history = download_market_data(
+                all_tickers, start_date.strftime("%Y-%m-%d"), end_date, provider=provider, calendar=calendar
+            )
+            book, transaction_logs = start_live_book(history, config)
+            if transaction_logs:
+                append_csv(transaction_logs.to_frame(), transactions_path)
+            _save_with_outputs(book, state_path, output_paths)
+            return {**book.summary(), "new_days": 0}
+
+        book = LiveBook.load(state_path)
+        _truncate_outputs(book, output_paths)
+        start_date = (book.last_date + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+        if start_date >= end_date:
+            logger.info(f"Live book is up to date as of {book.last_date.date()}")
+            return {**book.summary(), "new_days": 0}
+        try:
+            prices = download_market_data(all_tickers, start_date, end_date, provider=provider, calendar=calendar)
+        except ValueError:
+            logger.info(f"No new trading days since {book.last_date.date()}")
+            return {**book.summary(), "new_days": 0}
+        prices = prices[prices.index > book.last_date]
+
+        rates = get_exchange_rates(
+            start_date,
+            end_date,
+            simulation=config.get("exchange_rates", "simulated") != "market",
+            provider=provider,
+            dates=prices.index,
+            calendar=calendar,
+        )
+        for date, day_prices in prices.iterrows():
+            row, transaction_logs = book.update(date, day_prices, float(rates.loc[date]))
+            append_csv(pd.DataFrame([row]).set_index("Date"), results_path)
+            if transaction_logs:
+                append_csv(transaction_logs.to_frame(), transactions_path)
+            _save_with_outputs(book, state_path, output_paths)
+
+        logger.info(f"Live book updated with {len(prices)} days to {book.last_date.date()}")
+        return {**book.summary(), "new_days": len(prices)}
+
+    except Exception as e:
+        logger.error(f"Error updating live book: {str(e)}")
+        raise
+
+
+def _save_with_outputs(book: LiveBook, state_path: str, output_paths: Tuple[str, ...]) -> None:
+    """Save the state together with the sizes of the output files that match it."""
+    book.output_sizes = {
+        os.path.basename(path): os.path.getsize(path) for path in output_paths if os.path.exists(path)
+    }
+    book.save(state_path)
+
+
+def _truncate_outputs(book: LiveBook, output_paths: Tuple[str, ...]) -> None:
+    """
+    Drop output rows appended after the state was last saved.
+
+    Rows are appended before the state is saved, so a run that stopped in
+    between leaves rows for a day the state does not include yet. They are
+    removed here and written again when that day is processed.
+    """
+    if book.output_sizes is None:
+        return
+    for path in output_paths:
+        size = book.output_sizes.get(os.path.basename(path), 0)
+        if os.path.exists(path) and os.path.getsize(path) > size:
+            logger.warning(f"Dropping rows of {path} written after the last saved state")
+            if size:
+                os.truncate(path, size)
+            else:
+                os.remove(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update the live book with the latest trading days")
+    parser.add_argument("--as-of", help="Last date to process, YYYY-MM-DD (default: today)")
+    parser.add_argument("--output-dir", default=LIVE_DIR)
+    parser.add_argument("--beta-lookback", type=int, default=BETA_LOOKBACK_DAYS)
+    args = parser.parse_args()
+
+    live_summary = run_live_update(output_dir=args.output_dir, as_of=args.as_of, beta_lookback=args.beta_lookback)
+    for key, value in live_summary.items():
+        print(f"{key}: {value}")
@@ -1,23 +1,52 @@
 """
 Main application module for the hedge fund portfolio project.
 Integrates all modules to run the complete simulation.
+
+Only the standard library and the configuration are imported up front, so
+--help, --check-config and --dry-run start quickly; pandas, the market data
+sources and the report renderers are imported by the stages that use them.
 """
 
+import argparse
 import atexit
 import glob
+import importlib
 import logging
 import os
-import pandas as pd
-from pathlib import Path
+import sys
+from calendar import monthrange
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from .config import BETA_TOLERANCE, REQUIRED_KEYS, SIMULATION_ENGINE, check_config, load_config, resolve_data_path
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Seconds `import src.main` may take (checked in tests/unit/test_main.py)
+IMPORT_TIME_BUDGET = 0.5
+
+# Dependencies only loaded once a simulation stage needs them
+HEAVY_MODULES = (
+    "pandas", "numpy", "pyarrow", "openpyxl", "yfinance", "statsmodels",
+    "weasyprint", "reportlab", "markdown2", "pygments", "rich",
+)
+
+
+def _lazy(module: str, name: str) -> Callable[..., Any]:
+    """A function that imports module.name on its first call and forwards to it."""
+    def stage(*args, **kwargs):
+        return getattr(importlib.import_module(module, __package__), name)(*args, **kwargs)
 
-from rich.logging import RichHandler
-from rich.progress import Progress, SpinnerColumn, TextColumn
+    stage.__name__ = stage.__qualname__ = name
+    stage.__doc__ = f"{name} from src{module}, imported on first use."
+    return stage
 
-from .config import load_config
-from .data_acquisition import download_market_data, get_date_range, validate_market_data, get_exchange_rates
-from .performance import calculate_daily_returns, simulate_portfolio
-from .portfolio import compute_beta, initialize_portfolio, rebalance_portfolio
-from .reporting import export_to_excel, generate_monthly_report
+
+# Stages with heavy dependencies, kept as module attributes so they can be patched
+download_market_data = _lazy(".data_acquisition", "download_market_data")
+get_exchange_rates = _lazy(".data_acquisition", "get_exchange_rates")
+validate_market_data = _lazy(".data_acquisition", "validate_market_data")
+generate_monthly_report = _lazy(".reporting", "generate_monthly_report")
 
 
 def setup_logging(log_file: str = "hedge_fund_simulation.log") -> logging.Logger:
@@ -62,7 +91,7 @@ def cleanup_temp_files():
                 logging.warning(f"Failed to remove temporary file {file}: {e}")
 
 
-def run_simulation(config_file: str = "config.yaml") -> pd.DataFrame:
+def run_simulation(config_file: str = "config.yaml") -> "pd.DataFrame":
     """Run the hedge fund portfolio simulation.
 
     Args:
@@ -75,6 +104,12 @@ def run_simulation(config_file: str = "config.yaml") -> pd.DataFrame:
         ValueError: If market data validation fails or configuration is invalid
         RuntimeError: If simulation or report generation fails
     """
+    from .data_acquisition import get_month_window
+    from .performance import calculate_daily_returns, simulate_portfolio
+    from .portfolio import compute_betas, compute_rolling_betas, initialize_portfolio
+    from .providers import provider_from_config
+    from .trading_calendar import DEFAULT_CALENDAR
+
     try:
         # Set up logging
         logger = setup_logging()
@@ -84,22 +119,15 @@ def run_simulation(config_file: str = "config.yaml") -> pd.DataFrame:
         config = load_config()
 
         # Validate required config values
-        required_keys = [
-            "tickers_long",
-            "tickers_short",
-            "market_index",
-            "initial_capital",
-            "gross_exposure",
-            "target_portfolio_beta"
-        ]
-        missing_keys = [key for key in required_keys if key not in config]
+        missing_keys = [key for key in REQUIRED_KEYS if key not in config]
         if missing_keys:
             raise ValueError(f"Missing required configuration keys: {', '.join(missing_keys)}")
 
-        # Calculate analysis period
+        # Calculate analysis period from the first to the last trading session of the month
         logger.info("Calculating analysis period...")
-        start_date, end_date = get_date_range(
-            config.get("analysis_year", 2024), config.get("analysis_month", 1)
+        calendar = config.get("trading_calendar", DEFAULT_CALENDAR)
+        start_date, end_date = get_month_window(
+            config.get("analysis_year", 2024), config.get("analysis_month", 1), calendar
         )
 
         # Combine all tickers
@@ -107,8 +135,18 @@ def run_simulation(config_file: str = "config.yaml") -> pd.DataFrame:
 
         # Download market data
         logger.info("Downloading market data...")
-        market_data = download_market_data(all_tickers, start_date, end_date)
-        exchange_rates = get_exchange_rates(start_date, end_date)
+        provider = provider_from_config(config)
+        market_data = download_market_data(
+            all_tickers, start_date, end_date, provider=provider, calendar=calendar
+        )
+        exchange_rates = get_exchange_rates(
+            start_date,
+            end_date,
+            simulation=config.get("exchange_rates", "simulated") != "market",
+            provider=provider,
+            dates=market_data.index,
+            calendar=calendar,
+        )
 
         # Validate market data
         if not validate_market_data(market_data):
@@ -118,12 +156,29 @@ def run_simulation(config_file: str = "config.yaml") -> pd.DataFrame:
         # Calculate daily returns
         logger.info("Calculating daily returns...")
         returns = calculate_daily_returns(market_data)
+        # The first day has no previous price, so its return is not an observation
+        observed_returns = returns[all_tickers].iloc[1:]
 
         # Compute initial betas
         logger.info("Computing initial betas...")
-        betas = {}
-        for ticker in all_tickers[:-1]:  # Exclude market index
-            betas[ticker] = compute_beta(returns[ticker], returns[config["market_index"]])
+        if config.get("beta_window") or config.get("beta_halflife"):
+            # Time-varying betas that only use returns known on each date
+            betas = compute_rolling_betas(
+                observed_returns,
+                config["market_index"],
+                window=config.get("beta_window"),
+                halflife=config.get("beta_halflife"),
+            ).reindex(returns.index)
+            # The first dates have too few observations for a beta
+            complete_betas = betas.dropna()
+            if len(complete_betas):
+                initial_betas = complete_betas.iloc[0].to_dict()
+            else:
+                initial_betas = compute_betas(observed_returns, config["market_index"])["beta"].to_dict()
+        else:
+            beta_stats = compute_betas(observed_returns, config["market_index"])
+            betas = beta_stats["beta"].to_dict()
+            initial_betas = betas
 
         # Initialize portfolio
         logger.info("Initializing portfolio...")
@@ -134,8 +189,9 @@ def run_simulation(config_file: str = "config.yaml") -> pd.DataFrame:
             initial_prices,
             config["tickers_long"],
             config["tickers_short"],
-            betas,
-            initial_date
+            initial_betas,
+            initial_date,
+            transaction_fee=config["transaction_fee"]
         )
 
         # Log initial portfolio value and transaction costs
@@ -150,12 +206,17 @@ def run_simulation(config_file: str = "config.yaml") -> pd.DataFrame:
             portfolio,
             betas,
             exchange_rates,
-            config["transaction_fee"],
-            config["target_portfolio_beta"]
+            config.get("management_fee", 0.02),
+            config["target_portfolio_beta"],
+            engine=config.get("simulation_engine", SIMULATION_ENGINE),
+            beta_tolerance=config.get("beta_tolerance", BETA_TOLERANCE),
+            transaction_fee=config["transaction_fee"],
+            rebalance_method=config.get("rebalance_method", "heuristic"),
+            initial_betas=initial_betas
         )
 
         # Add initial transaction logs to the overall logs
-        transaction_logs = initial_logs + transaction_logs
+        transaction_logs = initial_logs.extend(transaction_logs)
 
         # Generate reports
         logger.info("Generating reports...")
@@ -173,5 +234,84 @@ def run_simulation(config_file: str = "config.yaml") -> pd.DataFrame:
         raise
 
 
+def plan_simulation(config: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Describe what run_simulation would do with a configuration, without
+    importing the simulation stages or loading any data. The analysis period
+    runs from the first to the last session of the trading calendar.
+
+    Args:
+        config (Dict[str, Any]): Configuration, as returned by load_config
+
+    Returns:
+        Dict[str, str]: Settings of each stage, in run order
+    """
+    from .trading_calendar import DEFAULT_CALENDAR, trading_sessions
+
+    year, month = config.get("analysis_year", 2024), config.get("analysis_month", 1)
+    calendar = config.get("trading_calendar", DEFAULT_CALENDAR)
+    sessions = trading_sessions(
+        f"{year}-{month:02d}-01", f"{year}-{month:02d}-{monthrange(year, month)[1]}", calendar
+    )
+    if config.get("beta_window"):
+        betas = f"rolling, {config['beta_window']}-day window"
+    elif config.get("beta_halflife"):
+        betas = f"EWMA, {config['beta_halflife']}-day half-life"
+    else:
+        betas = "single estimate over the period"
+    return {
+        "analysis_period": (
+            f"{sessions[0]:%Y-%m-%d} to {sessions[-1]:%Y-%m-%d} ({len(sessions)} {calendar} sessions)"
+            if len(sessions) else f"{year}-{month:02d}: no {calendar} sessions"
+        ),
+        "tickers_long": ", ".join(config["tickers_long"]),
+        "tickers_short": ", ".join(config["tickers_short"]),
+        "market_index": config["market_index"],
+        "market_data": resolve_data_path(config) or "Yahoo Finance",
+        "trading_calendar": calendar,
+        "exchange_rates": config.get("exchange_rates", "simulated"),
+        "betas": betas,
+        "simulation_engine": config.get("simulation_engine", SIMULATION_ENGINE),
+        "rebalance_method": config.get("rebalance_method", "heuristic"),
+        "reports": "docs/monthly_report.md, docs/monthly_report.pdf",
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line entry point.
+
+    Args:
+        argv (List[str], optional): Arguments, defaults to sys.argv[1:]
+
+    Returns:
+        int: Exit status
+    """
+    parser = argparse.ArgumentParser(description="Run the hedge fund portfolio simulation")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--check-config", action="store_true",
+                      help="check config.yaml and exit")
+    mode.add_argument("--dry-run", action="store_true",
+                      help="check config.yaml and show what a run would do, without loading data")
+    args = parser.parse_args(argv)
+
+    if not (args.check_config or args.dry_run):
+        run_simulation()
+        return 0
+
+    config = load_config()
+    problems = check_config(config)
+    for problem in problems:
+        print(f"error: {problem}", file=sys.stderr)
+    if problems:
+        return 1
+    if args.dry_run:
+        for key, value in plan_simulation(config).items():
+            print(f"{key}: {value}")
+    else:
+        print("Configuration OK")
+    return 0
+
+
 if __name__ == "__main__":
-    run_simulation()
+    sys.exit(main())
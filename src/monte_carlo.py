@@ -0,0 +1,487 @@
+"""
+Monte Carlo module for the hedge fund portfolio project.
+Simulates the beta-neutral rebalancing strategy over thousands of generated
+price paths and reports the distribution of P&L, turnover and fees.
+"""
+
+import logging
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .config import BETA_TOLERANCE, TRANSACTION_FEE_PER_SHARE, load_config
+from .portfolio import PortfolioState, optimize_rebalance_trades
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Ways of generating return paths from the historical returns
+SCENARIO_METHODS = ("bootstrap", "factor")
+
+# Paths simulated together in one batch; bounds memory to about
+# chunk x horizon x tickers float64 values per worker
+MONTE_CARLO_CHUNK_SIZE = 500
+
+# Consecutive days drawn together by the block bootstrap
+DEFAULT_BLOCK_SIZE = 10
+
+# Quantiles reported by summarize_monte_carlo
+MONTE_CARLO_QUANTILES = [0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
+
+SCENARIO_COLUMNS = [
+    "pnl_usd",
+    "net_pnl_usd",
+    "total_return",
+    "max_drawdown",
+    "turnover_usd",
+    "transaction_costs",
+    "management_fees",
+    "rebalances",
+    "final_beta",
+]
+
+# Inputs shared by the chunks run in the current process
+_worker_data: Dict[str, Any] = {}
+
+
+def generate_scenarios(
+    history: np.ndarray,
+    n_paths: int,
+    horizon: int,
+    method: str = "bootstrap",
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
+    """
+    Generate correlated daily return paths from historical returns.
+
+    The "bootstrap" method draws blocks of consecutive historical days for
+    all assets at once (circular block bootstrap), keeping their correlation,
+    fat tails and short-term autocorrelation. The "factor" method fits a
+    one-factor model on the last column, r = alpha + beta * m + e, and draws
+    normal market and idiosyncratic returns, so the paths follow the
+    estimated covariance beta beta' var(m) + diag(var(e)).
+
+    Args:
+        history (np.ndarray): Days x assets daily simple returns. For the
+            "factor" method the last column is the market factor.
+        n_paths (int): Number of paths
+        horizon (int): Trading days per path
+        method (str): "bootstrap" or "factor"
+        block_size (int): Days per bootstrap block
+        rng (np.random.Generator, optional): Random generator
+
+    Returns:
+        np.ndarray: Paths x horizon x assets daily simple returns
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    n_days = len(history)
+    if n_days < 2:
+        raise ValueError("At least two days of returns are needed to generate scenarios")
+
+    if method == "bootstrap":
+        block_size = max(1, min(block_size, n_days))
+        n_blocks = -(-horizon // block_size)
+        starts = rng.integers(0, n_days, size=(n_paths, n_blocks, 1))
+        days = (starts + np.arange(block_size)) % n_days
+        return history[days.reshape(n_paths, -1)[:, :horizon]]
+
+    if method == "factor":
+        market = history[:, -1]
+        market_variance = market.var(ddof=1)
+        if market_variance == 0:
+            raise ValueError("Market returns have zero variance")
+        means = history.mean(axis=0)
+        betas = ((history - means).T @ (market - means[-1])) / ((n_days - 1) * market_variance)
+        alphas = means - betas * means[-1]
+        residual_std = (history - alphas - np.outer(market, betas)).std(axis=0, ddof=2 if n_days > 2 else 1)
+        residual_std[-1] = 0.0
+
+        market_paths = rng.normal(means[-1], np.sqrt(market_variance), size=(n_paths, horizon, 1))
+        noise = rng.standard_normal((n_paths, horizon, history.shape[1]))
+        return alphas + market_paths * betas + noise * residual_std
+
+    raise ValueError(f"Unknown scenario method: {method}")
+
+
+def simulate_paths(
+    start_prices: np.ndarray,
+    path_returns: np.ndarray,
+    holdings: np.ndarray,
+    betas: np.ndarray,
+    management_fee_rate: float,
+    target_beta: float,
+    beta_tolerance: float = BETA_TOLERANCE,
+    transaction_fee: float = TRANSACTION_FEE_PER_SHARE,
+    rebalance_method: str = "heuristic",
+) -> Dict[str, np.ndarray]:
+    """
+    Run the simulate_portfolio rebalancing rules on a batch of price paths.
+
+    Each path starts from start_prices and holdings. Days are evaluated for
+    every path at once: the paths whose beta breaches the tolerance that day
+    are rebalanced together, with the same rules and whole-share rounding
+    as rebalance_portfolio, and hold their new shares from the next day. The
+    "heuristic" 60/40 split is applied to all of them as one array operation;
+    "optimize" solves optimize_rebalance_trades for each of them, falling
+    back to the heuristic for a path whose rounded trades miss the band.
+
+    Args:
+        start_prices (np.ndarray): Prices per ticker on the first day
+        path_returns (np.ndarray): Paths x days x tickers daily simple returns
+            applied after the first day
+        holdings (np.ndarray): Initial shares per ticker
+        betas (np.ndarray): Beta per ticker
+        management_fee_rate (float): Annual management fee rate
+        target_beta (float): Target portfolio beta
+        beta_tolerance (float): Allowed deviation from the target beta before rebalancing
+        transaction_fee (float): Transaction fee per share traded when rebalancing
+        rebalance_method (str): "heuristic" or "optimize"
+
+    Returns:
+        Dict[str, np.ndarray]: SCENARIO_COLUMNS, one value per path
+    """
+    if rebalance_method not in ("heuristic", "optimize"):
+        raise ValueError(f"Unknown rebalancing method: {rebalance_method}")
+    n_paths, horizon, _ = path_returns.shape
+    shares = np.tile(np.asarray(holdings, dtype=np.float64), (n_paths, 1))
+    prices = np.tile(np.asarray(start_prices, dtype=np.float64), (n_paths, 1))
+    betas = np.asarray(betas, dtype=np.float64)
+
+    initial_value = prices @ holdings
+    initial_gross = np.abs(prices) @ np.abs(holdings)
+    if np.any(initial_gross == 0):
+        raise ValueError("Total portfolio exposure cannot be zero")
+
+    peak = np.zeros(n_paths)
+    max_drawdown = np.zeros(n_paths)
+    turnover = np.zeros(n_paths)
+    transaction_costs = np.zeros(n_paths)
+    management_fees = np.zeros(n_paths)
+    rebalances = np.zeros(n_paths, dtype=np.int64)
+
+    for day in range(horizon + 1):
+        if day > 0:
+            prices *= 1 + path_returns[:, day - 1]
+        positions = prices * shares
+        gross = np.abs(positions).sum(axis=1)
+        if np.any(gross == 0):
+            raise ValueError("Total portfolio exposure cannot be zero")
+        beta = (positions @ betas) / gross
+        value = positions.sum(axis=1)
+
+        management_fees += gross * (management_fee_rate / 252)
+        peak = np.maximum(peak, gross)
+        max_drawdown = np.minimum(max_drawdown, gross / peak - 1)
+
+        breached = np.flatnonzero(np.abs(beta - target_beta) > beta_tolerance)
+        if breached.size:
+            if rebalance_method == "heuristic":
+                new_shares = _rebalance_batch(
+                    shares[breached], positions[breached], gross[breached], beta[breached], betas, target_beta
+                )
+            else:
+                new_shares = np.array([
+                    _rebalance_optimized(shares[path], prices[path], positions[path], gross[path],
+                                         beta[path], betas, target_beta, beta_tolerance)
+                    for path in breached
+                ])
+            traded = np.abs(new_shares - shares[breached])
+            turnover[breached] += (traded * np.abs(prices[breached])).sum(axis=1)
+            transaction_costs[breached] += traded.sum(axis=1) * transaction_fee
+            rebalances[breached] += 1
+            shares[breached] = new_shares
+
+    pnl = value - initial_value
+    return {
+        "pnl_usd": pnl,
+        "net_pnl_usd": pnl - transaction_costs - management_fees,
+        "total_return": gross / initial_gross - 1,
+        "max_drawdown": max_drawdown,
+        "turnover_usd": turnover,
+        "transaction_costs": transaction_costs,
+        "management_fees": management_fees,
+        "rebalances": rebalances,
+        "final_beta": beta,
+    }
+
+
+def _rebalance_optimized(
+    shares: np.ndarray,
+    prices: np.ndarray,
+    positions: np.ndarray,
+    gross: float,
+    beta: float,
+    betas: np.ndarray,
+    target_beta: float,
+    beta_tolerance: float,
+) -> np.ndarray:
+    """New shares of one path from optimize_rebalance_trades, or the heuristic if its trades miss the band."""
+    try:
+        return shares + optimize_rebalance_trades(shares, prices, betas, target_beta, beta_tolerance)
+    except ValueError as e:
+        logger.warning(f"{str(e)}; falling back to the heuristic rebalance")
+        return _rebalance_batch(
+            shares[None], positions[None], np.array([gross]), np.array([beta]), betas, target_beta
+        )[0]
+
+
+def _rebalance_batch(
+    shares: np.ndarray,
+    positions: np.ndarray,
+    gross: np.ndarray,
+    beta: np.ndarray,
+    betas: np.ndarray,
+    target_beta: float,
+) -> np.ndarray:
+    """Heuristic rebalance_portfolio applied to every row of a paths x tickers share matrix."""
+    long_mask = shares > 0
+    short_mask = shares < 0
+    contributions = betas * positions / gross[:, None]
+    long_beta = np.where(long_mask, contributions, 0.0).sum(axis=1)
+    short_beta = np.where(short_mask, contributions, 0.0).sum(axis=1)
+    if np.any(long_mask.any(axis=1) & (long_beta == 0)) or np.any(short_mask.any(axis=1) & (short_beta == 0)):
+        raise ZeroDivisionError("Cannot rebalance a side whose beta contribution is zero")
+
+    # Split the beta gap between the sides as in rebalance_portfolio
+    beta_gap = target_beta - beta
+    heavier, lighter = -beta_gap * 0.6, -beta_gap * 0.4
+    long_heavier = np.abs(long_beta) > np.abs(short_beta)
+    long_adjustment = np.where(long_heavier, heavier, lighter)[:, None]
+    short_adjustment = np.where(long_heavier, lighter, heavier)[:, None]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        long_factor = 1.0 + long_adjustment * contributions / long_beta[:, None]
+        short_factor = 1.0 + short_adjustment * contributions / short_beta[:, None]
+    # np.rint rounds half to even like round()
+    new_shares = np.where(long_mask, np.rint(shares * long_factor), shares)
+    return np.where(short_mask, -np.rint(np.abs(shares * short_factor)), new_shares)
+
+
+def run_monte_carlo(
+    price_data: pd.DataFrame,
+    portfolio: Union[Dict[str, float], PortfolioState],
+    betas: Dict[str, float],
+    management_fee_rate: float,
+    target_beta: float,
+    n_paths: int = 10_000,
+    horizon: int = 252,
+    method: str = "bootstrap",
+    market_index: Optional[str] = None,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    beta_tolerance: float = BETA_TOLERANCE,
+    transaction_fee: float = TRANSACTION_FEE_PER_SHARE,
+    rebalance_method: str = "heuristic",
+    chunk_size: int = MONTE_CARLO_CHUNK_SIZE,
+    max_workers: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Simulate the portfolio over Monte Carlo price paths.
+
+    Daily returns of price_data are the history the paths are generated
+    from, see generate_scenarios. Every path starts from the last prices and
+    the given holdings and is rebalanced as simulate_portfolio would with
+    static betas, see simulate_paths. Paths are generated and simulated
+    in chunks of chunk_size, so memory stays bounded however many paths are
+    requested, and the chunks run in a process pool. Each chunk has its own
+    seed spawned from seed, so the results do not depend on max_workers.
+
+    Args:
+        price_data (pd.DataFrame): Daily prices for the portfolio tickers, and
+            for market_index if given
+        portfolio (dict or PortfolioState): Ticker positions (shares)
+        betas (Dict[str, float]): Beta per ticker
+        management_fee_rate (float): Annual management fee rate
+        target_beta (float): Target portfolio beta
+        n_paths (int): Number of paths
+        horizon (int): Trading days per path
+        method (str): Scenario method, see SCENARIO_METHODS
+        market_index (str, optional): Market column of price_data; required by
+            the "factor" method, and adds the market return of each path
+        block_size (int): Days per bootstrap block
+        beta_tolerance (float): Allowed deviation from the target beta before rebalancing
+        transaction_fee (float): Transaction fee per share traded when rebalancing
+        rebalance_method (str): "heuristic" or "optimize"
+        chunk_size (int): Paths generated and simulated together
+        max_workers (int, optional): Number of worker processes. Defaults to the
+            number of CPUs; 1 runs every chunk in the current process.
+        seed (int, optional): Seed for reproducible paths
+
+    Returns:
+        pd.DataFrame: One row per path with SCENARIO_COLUMNS, and market_return
+            if market_index is given
+    """
+    try:
+        if method not in SCENARIO_METHODS:
+            raise ValueError(f"Unknown scenario method: {method}")
+        if method == "factor" and market_index is None:
+            raise ValueError("The factor method needs a market_index")
+        if n_paths < 1 or horizon < 1 or chunk_size < 1:
+            raise ValueError("n_paths, horizon and chunk_size must be positive")
+
+        tickers = list(portfolio.keys())
+        columns = tickers + ([market_index] if market_index is not None else [])
+        prices = price_data[columns].to_numpy(dtype=np.float64)
+        history = prices[1:] / prices[:-1] - 1
+        history = history[~np.isnan(history).any(axis=1)]
+
+        inputs = {
+            "history": history,
+            "start_prices": prices[-1, :len(tickers)],
+            "holdings": np.array([portfolio[ticker] for ticker in tickers], dtype=np.float64),
+            "betas": np.array([betas.get(ticker, 0.0) for ticker in tickers], dtype=np.float64),
+            "has_market": market_index is not None,
+            "horizon": horizon,
+            "method": method,
+            "block_size": block_size,
+            "management_fee_rate": management_fee_rate,
+            "target_beta": target_beta,
+            "beta_tolerance": beta_tolerance,
+            "transaction_fee": transaction_fee,
+            "rebalance_method": rebalance_method,
+        }
+        seeds = np.random.SeedSequence(seed).spawn(math.ceil(n_paths / chunk_size))
+        jobs = [
+            (min(chunk_size, n_paths - i * chunk_size), chunk_seed)
+            for i, chunk_seed in enumerate(seeds)
+        ]
+
+        logger.info(f"Running {n_paths} Monte Carlo paths of {horizon} days in {len(jobs)} chunks...")
+        started = time.perf_counter()
+        if max_workers == 1:
+            _init_worker(inputs)
+            chunks = [_run_chunk(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=max_workers, initializer=_init_worker, initargs=(inputs,)
+            ) as executor:
+                workers = max_workers or os.cpu_count() or 1
+                chunksize = max(1, len(jobs) // (4 * workers))
+                chunks = list(executor.map(_run_chunk, jobs, chunksize=chunksize))
+
+        results = pd.concat(chunks, ignore_index=True)
+        results.index.name = "path"
+        logger.info(f"Monte Carlo completed in {time.perf_counter() - started:.2f}s")
+        return results
+
+    except Exception as e:
+        logger.error(f"Error running Monte Carlo simulation: {str(e)}")
+        raise
+
+
+def summarize_monte_carlo(results: pd.DataFrame, quantiles: Optional[List[float]] = None) -> pd.DataFrame:
+    """
+    Distribution of every Monte Carlo result column.
+
+    Args:
+        results (pd.DataFrame): Output of run_monte_carlo
+        quantiles (List[float], optional): Quantiles to report. Defaults to
+            MONTE_CARLO_QUANTILES.
+
+    Returns:
+        pd.DataFrame: One row per result column with its mean, standard
+            deviation, minimum, quantiles and maximum
+    """
+    quantiles = quantiles if quantiles is not None else MONTE_CARLO_QUANTILES
+    return results.describe(percentiles=quantiles).drop(index="count").T
+
+
+def _init_worker(inputs: Dict[str, Any]) -> None:
+    """Keep the history and portfolio once per worker process."""
+    _worker_data.update(inputs)
+
+
+def _run_chunk(job) -> pd.DataFrame:
+    """Generate and simulate one chunk of paths."""
+    n_paths, chunk_seed = job
+    data = _worker_data
+    path_returns = generate_scenarios(
+        data["history"],
+        n_paths,
+        data["horizon"],
+        method=data["method"],
+        block_size=data["block_size"],
+        rng=np.random.default_rng(chunk_seed),
+    )
+    n_tickers = len(data["holdings"])
+    results = simulate_paths(
+        data["start_prices"],
+        path_returns[:, :, :n_tickers],
+        data["holdings"],
+        data["betas"],
+        data["management_fee_rate"],
+        data["target_beta"],
+        beta_tolerance=data["beta_tolerance"],
+        transaction_fee=data["transaction_fee"],
+        rebalance_method=data["rebalance_method"],
+    )
+    chunk = pd.DataFrame(results, columns=SCENARIO_COLUMNS)
+    if data["has_market"]:
+        chunk["market_return"] = np.prod(1 + path_returns[:, :, -1], axis=1) - 1
+    return chunk
+
+
+if __name__ == "__main__":
+    from .data_acquisition import download_market_data, get_month_window, validate_market_data
+    from .performance import calculate_daily_returns
+    from .portfolio import compute_betas, initialize_portfolio
+    from .providers import provider_from_config
+    from .trading_calendar import DEFAULT_CALENDAR
+
+    config = load_config()
+    settings = config.get("monte_carlo", {})
+    market_index = config["market_index"]
+    tickers = config["tickers_long"] + config["tickers_short"]
+
+    calendar = config.get("trading_calendar", DEFAULT_CALENDAR)
+    start_date, end_date = get_month_window(
+        config.get("analysis_year", 2024), config.get("analysis_month", 1), calendar
+    )
+    market_data = download_market_data(
+        tickers + [market_index],
+        start_date,
+        end_date,
+        provider=provider_from_config(config),
+        calendar=calendar,
+    )
+    if not validate_market_data(market_data):
+        raise SystemExit("Market data validation failed")
+    betas = compute_betas(calculate_daily_returns(market_data).iloc[1:], market_index)["beta"].to_dict()
+    portfolio, _, _ = initialize_portfolio(
+        config["initial_capital"],
+        market_data[tickers].iloc[-1].to_dict(),
+        config["tickers_long"],
+        config["tickers_short"],
+        betas,
+        market_data.index[-1],
+        transaction_fee=config.get("transaction_fee", TRANSACTION_FEE_PER_SHARE),
+    )
+
+    scenario_results = run_monte_carlo(
+        market_data,
+        portfolio,
+        betas,
+        config.get("management_fee", 0.02),
+        config["target_portfolio_beta"],
+        n_paths=settings.get("paths", 10_000),
+        horizon=settings.get("horizon", 252),
+        method=settings.get("method", "bootstrap"),
+        market_index=market_index,
+        block_size=settings.get("block_size", DEFAULT_BLOCK_SIZE),
+        beta_tolerance=config.get("beta_tolerance", BETA_TOLERANCE),
+        transaction_fee=config.get("transaction_fee", TRANSACTION_FEE_PER_SHARE),
+        rebalance_method=config.get("rebalance_method", "heuristic"),
+        seed=settings.get("seed"),
+    )
+    os.makedirs("docs", exist_ok=True)
+    scenario_results.to_csv(os.path.join("docs", "monte_carlo.csv"))
+    print(summarize_monte_carlo(scenario_results).to_string())
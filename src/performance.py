@@ -4,15 +4,21 @@ Handles daily returns calculation and portfolio performance simulation.
 """
 
 import logging
-from typing import Dict, Union, Tuple, List
+from typing import Dict, Optional, Union, Tuple, List
 
 import pandas as pd
 from rich.console import Console
 from rich.progress import BarColumn, Progress, SpinnerColumn, TextColumn
 import numpy as np
 
-from .config import BETA_TOLERANCE
-from .portfolio import compute_portfolio_beta, rebalance_portfolio, initialize_portfolio
+from .config import BETA_TOLERANCE, TRANSACTION_FEE_PER_SHARE
+from .data_acquisition import align_exchange_rates
+from .checkpoints import CHECKPOINT_FREQUENCY, SimulationCheckpoint
+from .portfolio import PortfolioState, compute_portfolio_beta, rebalance_portfolio, initialize_portfolio
+from .trade_ledger import TradeLedger
+
+# Number of trading days evaluated per vectorized block in the NumPy engine
+SIMULATION_BLOCK_SIZE = 64
 
 # Configure logging
 logging.basicConfig(
@@ -50,28 +56,105 @@ def calculate_daily_returns(prices: pd.DataFrame) -> pd.DataFrame:
 
 
 def simulate_portfolio(price_data: pd.DataFrame,
-                       portfolio: dict,
-                       betas: dict,
+                       portfolio: Union[dict, PortfolioState],
+                       betas: Union[dict, pd.DataFrame],
                        exchange_rates: pd.Series,
                        management_fee_rate: float,
-                       target_beta: float) -> Tuple[pd.DataFrame, List[Dict[str, float]]]:
+                       target_beta: float,
+                       engine: str = "pandas",
+                       beta_tolerance: float = BETA_TOLERANCE,
+                       transaction_fee: float = TRANSACTION_FEE_PER_SHARE,
+                       return_portfolio: bool = False,
+                       rebalance_method: str = "heuristic",
+                       checkpoint_dir: Optional[str] = None,
+                       checkpoint_frequency: str = CHECKPOINT_FREQUENCY,
+                       initial_betas: Optional[dict] = None,
+                       previous_prices: Optional[pd.Series] = None
+                       ) -> Union[Tuple[pd.DataFrame, TradeLedger],
+                                  Tuple[pd.DataFrame, TradeLedger, Union[dict, PortfolioState]]]:
     """
     Simulate portfolio performance over the given price data.
     
     Args:
         price_data (pd.DataFrame): Daily price data for all tickers.
-        portfolio (dict): Dictionary of ticker positions (shares).
-        betas (dict): Dictionary of beta values per ticker.
-        exchange_rates (pd.Series): Daily exchange rates.
+        portfolio (dict or PortfolioState): Ticker positions (shares). A PortfolioState
+            is rebalanced with array operations and returned as a PortfolioState.
+        betas (dict or pd.DataFrame): Dictionary of beta values per ticker, or a
+            dates x tickers matrix (see compute_rolling_betas) whose row for each
+            date is used on that date. Missing betas carry the ticker's latest
+            earlier beta forward, starting from initial_betas.
+        exchange_rates (pd.Series): Daily exchange rates. Dates without a rate
+            take the latest earlier one (see align_exchange_rates).
         management_fee_rate (float): Annual management fee rate.
         target_beta (float): Target portfolio beta.
+        engine (str): "pandas" for the day-by-day loop, "numpy" for the
+            vectorized array engine. Both produce identical results.
+        beta_tolerance (float): Allowed deviation from the target beta before rebalancing.
+        transaction_fee (float): Transaction fee per share traded when rebalancing.
+        return_portfolio (bool): If True, also return the holdings at the end of the
+            last day so that a following period can continue from them.
+        rebalance_method (str): Rebalancing method passed to rebalance_portfolio,
+            "heuristic" or "optimize".
+        checkpoint_dir (str, optional): Directory for checkpoints of the run, taken
+            at the last day of every checkpoint_frequency period; see
+            resume_simulation. Needs the numpy engine.
+        checkpoint_frequency (str): Period between checkpoints, as a pandas
+            period alias ("W", "M", "Q" or "Y").
+        initial_betas (dict, optional): Betas used for the warm-up dates of a beta
+            matrix, before a ticker has its first beta (usually the betas the
+            portfolio was sized with). Tickers without any beta are treated as zero.
+        previous_prices (pd.Series, optional): Prices per ticker at the close before
+            the first day. When given, the first day's daily_return is measured like
+            every other day's, against the holdings after that day's trades at these
+            prices; otherwise it is zero.
     
     Returns:
-        Tuple[pd.DataFrame, List[Dict[str, float]]]: DataFrame with simulation results and list of transaction logs
+        Tuple[pd.DataFrame, TradeLedger]: DataFrame with simulation results and ledger of
+            transaction logs when return_portfolio is False.
+        Tuple[pd.DataFrame, TradeLedger, dict or PortfolioState]: The same two values followed
+            by the final portfolio (of the same type as portfolio) when return_portfolio is True.
     """
+    if checkpoint_dir is not None and engine != "numpy":
+        raise ValueError("Checkpoints need the numpy simulation engine")
+    if engine == "numpy":
+        checkpoint = None
+        if checkpoint_dir is not None:
+            checkpoint = SimulationCheckpoint(checkpoint_dir, checkpoint_frequency)
+            checkpoint.start({
+                "tickers": list(portfolio.keys()),
+                "initial_shares": [float(shares) for shares in portfolio.values()],
+                "portfolio_state": isinstance(portfolio, PortfolioState),
+                "management_fee_rate": management_fee_rate,
+                "target_beta": target_beta,
+                "beta_tolerance": beta_tolerance,
+                "transaction_fee": transaction_fee,
+                "rebalance_method": rebalance_method,
+                "initial_betas": (
+                    None if initial_betas is None
+                    else {ticker: float(beta) for ticker, beta in initial_betas.items()}
+                ),
+                "previous_prices": (
+                    None if previous_prices is None
+                    else {ticker: float(previous_prices[ticker]) for ticker in portfolio.keys()}
+                ),
+            })
+        results, all_transaction_logs, final_portfolio = _simulate_portfolio_numpy(
+            price_data, portfolio, betas, exchange_rates, management_fee_rate, target_beta,
+            beta_tolerance, transaction_fee, rebalance_method, checkpoint=checkpoint,
+            initial_betas=initial_betas, previous_prices=previous_prices,
+        )
+        if return_portfolio:
+            return results, all_transaction_logs, final_portfolio
+        return results, all_transaction_logs
+    if engine != "pandas":
+        raise ValueError(f"Unknown simulation engine: {engine}")
+
+    beta_frame = _align_betas(betas, price_data.index, list(portfolio.keys()), initial_betas)
+    rates = align_exchange_rates(exchange_rates, price_data.index).to_numpy(dtype=np.float64)
+
     # Initialize results storage
     results = []
-    all_transaction_logs = []  # Store all transaction logs
+    all_transaction_logs = TradeLedger()  # Store all transaction logs
     current_portfolio = portfolio.copy()
     
     # Calculate initial portfolio value and gross exposure
@@ -89,7 +172,7 @@ def simulate_portfolio(price_data: pd.DataFrame,
         logger.info(f"  {ticker}: {current_portfolio[ticker]:,.0f} shares, ${value:,.2f}")
     
     # Iterate through each day
-    for date in price_data.index:
+    for day, date in enumerate(price_data.index):
         # Get current day's prices
         current_prices = price_data.loc[date]
         
@@ -108,10 +191,11 @@ def simulate_portfolio(price_data: pd.DataFrame,
                 logger.info(f"Significant exposure change on {date}: ${gross_exposure_usd:,.2f} (prev: ${prev_exposure:,.2f})")
         
         # Calculate current portfolio beta
-        current_beta = compute_portfolio_beta(positions, betas)
+        day_betas = betas if beta_frame is None else beta_frame.loc[date].to_dict()
+        current_beta = compute_portfolio_beta(positions, day_betas)
         
         # Check if rebalancing is needed
-        needs_rebalancing = abs(current_beta - target_beta) > BETA_TOLERANCE
+        needs_rebalancing = abs(current_beta - target_beta) > beta_tolerance
         transaction_cost = 0.0
         
         # Perform rebalancing if needed
@@ -120,9 +204,12 @@ def simulate_portfolio(price_data: pd.DataFrame,
             current_portfolio, rebalance_cost, transaction_logs = rebalance_portfolio(
                 current_portfolio,
                 current_prices,
-                betas,
+                day_betas,
                 target_beta,
-                date  # Pass the date directly
+                date,  # Pass the date directly
+                beta_tolerance=beta_tolerance,
+                transaction_fee=transaction_fee,
+                method=rebalance_method
             )
             transaction_cost = rebalance_cost
             all_transaction_logs.extend(transaction_logs)  # Add new transaction logs
@@ -139,6 +226,9 @@ def simulate_portfolio(price_data: pd.DataFrame,
                                     {t: s * price_data.loc[price_data.index[price_data.index.get_loc(date)-1]][t] 
                                      for t, s in current_portfolio.items()}.values())
             daily_return = (gross_exposure_usd / prev_gross_exposure) - 1 if prev_gross_exposure > 0 else 0.0
+        elif previous_prices is not None:
+            prev_gross_exposure = sum(abs(s * previous_prices[t]) for t, s in current_portfolio.items())
+            daily_return = (gross_exposure_usd / prev_gross_exposure) - 1 if prev_gross_exposure > 0 else 0.0
         else:
             daily_return = 0.0  # First day has no return
         
@@ -149,13 +239,13 @@ def simulate_portfolio(price_data: pd.DataFrame,
         results.append({
             "portfolio_value_usd": portfolio_value_usd,
             "gross_exposure_usd": gross_exposure_usd,
-            "portfolio_value_cad": portfolio_value_usd * exchange_rates[date],
+            "portfolio_value_cad": portfolio_value_usd * rates[day],
             "portfolio_beta": current_beta,
             "daily_return": daily_return,
             "management_fee": management_fee,
             "transaction_costs": transaction_cost,
             "rebalanced": needs_rebalancing,
-            "exchange_rate": exchange_rates[date]
+            "exchange_rate": rates[day]
         })
     
     # Log final portfolio state
@@ -164,9 +254,296 @@ def simulate_portfolio(price_data: pd.DataFrame,
     logger.info(f"Final portfolio gross exposure: ${final_gross_exposure:,.2f}")
     
     # Convert results to DataFrame
+    if return_portfolio:
+        return pd.DataFrame(results, index=price_data.index), all_transaction_logs, current_portfolio
     return pd.DataFrame(results, index=price_data.index), all_transaction_logs
 
 
+def resume_simulation(checkpoint_dir: str,
+                      price_data: pd.DataFrame,
+                      betas: Union[dict, pd.DataFrame],
+                      exchange_rates: pd.Series,
+                      return_portfolio: bool = False
+                      ) -> Union[Tuple[pd.DataFrame, TradeLedger],
+                                 Tuple[pd.DataFrame, TradeLedger, Union[dict, PortfolioState]]]:
+    """
+    Continue a checkpointed simulate_portfolio run from its last checkpoint.
+
+    The holdings, fees and parameters of the run come from the checkpoint;
+    only the days after its date are simulated again, and the results and
+    transaction logs of the earlier days are read back from the checkpoint
+    files. price_data, betas and exchange_rates may be corrected versions of
+    the original inputs, but must include the checkpoint date.
+
+    Args:
+        checkpoint_dir (str): Directory given to simulate_portfolio
+        price_data (pd.DataFrame): Daily price data for all tickers.
+        betas (dict or pd.DataFrame): Betas as for simulate_portfolio.
+        exchange_rates (pd.Series): Daily exchange rates.
+        return_portfolio (bool): If True, also return the final holdings.
+
+    Returns:
+        Tuple[pd.DataFrame, TradeLedger]: Simulation results and transaction
+            logs of the whole run, as returned by simulate_portfolio.
+        Tuple[pd.DataFrame, TradeLedger, dict or PortfolioState]: The same two values
+            followed by the final portfolio when return_portfolio is True.
+    """
+    try:
+        checkpoint = SimulationCheckpoint.load(checkpoint_dir)
+        state = checkpoint.state
+        parameters = state["parameters"]
+        tickers = parameters["tickers"]
+        completed = checkpoint.completed_results()
+        completed_logs = checkpoint.completed_transaction_logs()
+
+        if state["last_date"] is None:
+            start_day, shares = 0, parameters["initial_shares"]
+        else:
+            last_date = pd.Timestamp(state["last_date"])
+            if last_date not in price_data.index:
+                raise ValueError(f"Price data does not include the checkpoint date {last_date.date()}")
+            start_day, shares = price_data.index.get_loc(last_date) + 1, state["shares"]
+            logger.info(f"Resuming simulation after {last_date.date()} ({state['result_rows']} days done)")
+
+        if parameters["portfolio_state"]:
+            portfolio = PortfolioState(tickers, shares)
+        else:
+            portfolio = dict(zip(tickers, shares))
+
+        results, transaction_logs = completed, completed_logs
+        if start_day < len(price_data):
+            new_results, new_logs, portfolio = _simulate_portfolio_numpy(
+                price_data, portfolio, betas, exchange_rates,
+                parameters["management_fee_rate"], parameters["target_beta"],
+                parameters["beta_tolerance"], parameters["transaction_fee"], parameters["rebalance_method"],
+                start_day=start_day, checkpoint=checkpoint,
+                initial_betas=parameters.get("initial_betas"),
+                previous_prices=(
+                    None if parameters.get("previous_prices") is None
+                    else pd.Series(parameters["previous_prices"])
+                ),
+            )
+            results = pd.concat([completed, new_results]) if len(completed) else new_results
+            transaction_logs = completed_logs.extend(new_logs)
+        results.index.name = price_data.index.name
+
+        if return_portfolio:
+            return results, transaction_logs, portfolio
+        return results, transaction_logs
+
+    except Exception as e:
+        logger.error(f"Error resuming simulation: {str(e)}")
+        raise
+
+
+def _align_betas(betas: Union[dict, pd.DataFrame],
+                 dates: pd.Index,
+                 tickers: List[str],
+                 initial_betas: Optional[dict] = None):
+    """
+    Align a dates x tickers beta matrix with the simulation, or None for static betas.
+
+    Missing betas (such as the warm-up rows of compute_rolling_betas) take the
+    ticker's latest earlier beta, then its initial beta; only tickers that never
+    get a beta are treated as zero.
+    """
+    if not isinstance(betas, pd.DataFrame):
+        return None
+    aligned = betas.reindex(columns=tickers).ffill().loc[dates]
+    if initial_betas:
+        aligned = aligned.fillna({ticker: initial_betas[ticker] for ticker in tickers if ticker in initial_betas})
+    return aligned.fillna(0.0)
+
+
+def _simulate_portfolio_numpy(price_data: pd.DataFrame,
+                              portfolio: Union[dict, PortfolioState],
+                              betas: Union[dict, pd.DataFrame],
+                              exchange_rates: pd.Series,
+                              management_fee_rate: float,
+                              target_beta: float,
+                              beta_tolerance: float = BETA_TOLERANCE,
+                              transaction_fee: float = TRANSACTION_FEE_PER_SHARE,
+                              rebalance_method: str = "heuristic",
+                              start_day: int = 0,
+                              checkpoint: Optional[SimulationCheckpoint] = None,
+                              initial_betas: Optional[dict] = None,
+                              previous_prices: Optional[pd.Series] = None) -> Tuple[pd.DataFrame, TradeLedger, Dict[str, float]]:
+    """
+    Vectorized implementation of simulate_portfolio.
+
+    Holdings are kept as a float64 vector aligned with the columns of a price
+    matrix. Between rebalance events the holdings are constant, so net value,
+    gross exposure and beta are computed for a block of days with a single
+    matrix-vector product; the block is cut at the first day whose beta
+    breaches the tolerance, that day is rebalanced and evaluation resumes
+    from the next day.
+
+    Args:
+        price_data (pd.DataFrame): Daily price data for all tickers.
+        portfolio (dict or PortfolioState): Ticker positions (shares).
+        betas (dict or pd.DataFrame): Static betas per ticker or a dates x tickers matrix.
+        exchange_rates (pd.Series): Daily exchange rates.
+        management_fee_rate (float): Annual management fee rate.
+        target_beta (float): Target portfolio beta.
+        beta_tolerance (float): Allowed deviation from the target beta before rebalancing.
+        transaction_fee (float): Transaction fee per share traded when rebalancing.
+        rebalance_method (str): Rebalancing method passed to rebalance_portfolio.
+        start_day (int): Position of the first day to simulate; earlier days only
+            provide the previous day's prices. Used to resume from a checkpoint.
+        checkpoint (SimulationCheckpoint, optional): Saved at the last day of
+            every checkpoint period. Blocks are cut at those days.
+        initial_betas (dict, optional): Betas for the warm-up dates of a beta matrix.
+        previous_prices (pd.Series, optional): Prices at the close before the first day.
+
+    Returns:
+        Tuple[pd.DataFrame, TradeLedger, Dict[str, float]]: DataFrame with simulation results
+            from start_day, ledger of transaction logs and the final portfolio
+    """
+    tickers = list(portfolio.keys())
+    dates = price_data.index
+    prices = price_data[tickers].to_numpy(dtype=np.float64)
+    abs_prices = np.abs(prices)
+    rates = align_exchange_rates(exchange_rates, dates).to_numpy(dtype=np.float64)
+    if previous_prices is not None:
+        # The close before the first day, so day 0 has a return like any other day
+        previous_abs_prices = np.abs(previous_prices[tickers].to_numpy(dtype=np.float64))
+    beta_frame = _align_betas(betas, dates, tickers, initial_betas)
+    if beta_frame is None:
+        beta_vector = np.array([betas.get(ticker, 0.0) for ticker in tickers], dtype=np.float64)
+    else:
+        beta_matrix = beta_frame.to_numpy(dtype=np.float64)
+    current_portfolio = portfolio.copy()
+    is_state = isinstance(portfolio, PortfolioState)
+    if is_state:
+        holdings = portfolio.shares.copy()
+    else:
+        holdings = np.array([current_portfolio[ticker] for ticker in tickers], dtype=np.float64)
+
+    n_days = len(dates)
+    net_value = np.empty(n_days)
+    gross_exposure = np.empty(n_days)
+    portfolio_beta = np.empty(n_days)
+    prev_gross_exposure = np.zeros(n_days)
+    transaction_costs = np.zeros(n_days)
+    rebalanced = np.zeros(n_days, dtype=bool)
+    all_transaction_logs = TradeLedger(tickers)
+
+    logger.info(f"Initial portfolio net value: ${prices[start_day] @ holdings:,.2f}")
+    logger.info(f"Initial portfolio gross exposure: ${abs_prices[start_day] @ np.abs(holdings):,.2f}")
+
+    def results_frame(first_day: int, stop_day: int) -> pd.DataFrame:
+        days = slice(first_day, stop_day)
+        previous = prev_gross_exposure[days]
+        valid = previous > 0
+        if first_day == 0 and previous_prices is None:
+            valid[0] = False
+        daily_return = np.zeros(stop_day - first_day)
+        daily_return[valid] = gross_exposure[days][valid] / previous[valid] - 1
+        return pd.DataFrame(
+            {
+                "portfolio_value_usd": net_value[days],
+                "gross_exposure_usd": gross_exposure[days],
+                "portfolio_value_cad": net_value[days] * rates[days],
+                "portfolio_beta": portfolio_beta[days],
+                "daily_return": daily_return,
+                "management_fee": gross_exposure[days] * (management_fee_rate / 252),
+                "transaction_costs": transaction_costs[days],
+                "rebalanced": rebalanced[days],
+                "exchange_rate": rates[days],
+            },
+            index=dates[days],
+        )
+
+    if checkpoint is not None:
+        boundaries = checkpoint.boundaries(dates)
+        boundaries = np.append(boundaries[boundaries >= start_day], n_days - 1)
+        saved_day = start_day
+        saved_logs = 0
+
+    start = start_day
+    while start < n_days:
+        stop = min(start + SIMULATION_BLOCK_SIZE, n_days)
+        if checkpoint is not None:
+            # Blocks never span a checkpoint day
+            stop = min(stop, int(boundaries[np.searchsorted(boundaries, start)]) + 1)
+        block_gross = abs_prices[start:stop] @ np.abs(holdings)
+        if np.any(block_gross == 0):
+            raise ValueError("Total portfolio exposure cannot be zero")
+        if beta_frame is None:
+            block_beta = (prices[start:stop] @ (holdings * beta_vector)) / block_gross
+        else:
+            block_beta = np.einsum(
+                "ij,ij,j->i", prices[start:stop], beta_matrix[start:stop], holdings
+            ) / block_gross
+
+        # Holdings stay constant up to and including the first day that breaches tolerance
+        breaches = np.flatnonzero(np.abs(block_beta - target_beta) > beta_tolerance)
+        end = start + int(breaches[0]) + 1 if breaches.size else stop
+        count = end - start
+
+        net_value[start:end] = prices[start:end] @ holdings
+        gross_exposure[start:end] = block_gross[:count]
+        portfolio_beta[start:end] = block_beta[:count]
+
+        # Exposure of the current holdings at the previous day's prices
+        first = max(start, 1)
+        if first < end:
+            prev_gross_exposure[first:end] = abs_prices[first - 1:end - 1] @ np.abs(holdings)
+            changes = np.abs(gross_exposure[first:end] / prev_gross_exposure[first:end] - 1)
+            for offset in np.flatnonzero(changes > 0.05):
+                day = first + offset
+                logger.info(f"Significant exposure change on {dates[day]}: ${gross_exposure[day]:,.2f} (prev: ${prev_gross_exposure[day]:,.2f})")
+        if start == 0 and previous_prices is not None:
+            prev_gross_exposure[0] = previous_abs_prices @ np.abs(holdings)
+
+        if breaches.size:
+            day = end - 1
+            if is_state:
+                # Array-backed portfolios are rebalanced straight from the matrices
+                day_prices = prices[day]
+                day_betas = beta_vector if beta_frame is None else beta_matrix[day]
+            else:
+                day_prices = price_data.iloc[day]
+                day_betas = betas if beta_frame is None else beta_frame.iloc[day].to_dict()
+            current_portfolio, rebalance_cost, transaction_logs = rebalance_portfolio(
+                current_portfolio,
+                day_prices,
+                day_betas,
+                target_beta,
+                dates[day],
+                beta_tolerance=beta_tolerance,
+                transaction_fee=transaction_fee,
+                method=rebalance_method
+            )
+            if is_state:
+                holdings = current_portfolio.shares.copy()
+            else:
+                holdings = np.array([current_portfolio.get(ticker, 0.0) for ticker in tickers], dtype=np.float64)
+            transaction_costs[day] = rebalance_cost
+            rebalanced[day] = True
+            all_transaction_logs.extend(transaction_logs)
+            logger.info(f"Gross exposure after rebalancing: ${abs_prices[day] @ np.abs(holdings):,.2f}")
+
+            # Returns are measured against the post-rebalance holdings
+            if day > 0:
+                prev_gross_exposure[day] = abs_prices[day - 1] @ np.abs(holdings)
+            elif previous_prices is not None:
+                prev_gross_exposure[day] = previous_abs_prices @ np.abs(holdings)
+
+        start = end
+        if checkpoint is not None and end - 1 == boundaries[np.searchsorted(boundaries, end - 1)]:
+            checkpoint.save(
+                end, dates[end - 1], holdings, results_frame(saved_day, end), all_transaction_logs.to_frame(saved_logs)
+            )
+            saved_day, saved_logs = end, len(all_transaction_logs)
+
+    logger.info(f"Final portfolio net value: ${net_value[-1]:,.2f}")
+    logger.info(f"Final portfolio gross exposure: ${gross_exposure[-1]:,.2f}")
+
+    results = results_frame(start_day, n_days)
+    return results, all_transaction_logs, current_portfolio
+
+
 def compute_beta(stock_returns: pd.Series, market_returns: pd.Series) -> float:
     """
     Calculate beta coefficient using covariance method.
@@ -4,14 +4,15 @@ Handles beta calculations, portfolio initialization, and rebalancing.
 """
 
 import logging
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
-import statsmodels.api as sm
 from rich.console import Console
 from rich.progress import BarColumn, Progress, SpinnerColumn, TextColumn
 
-from .config import BETA_TOLERANCE, MARKET_INDEX
+from .config import BETA_TOLERANCE, MARKET_INDEX, TRANSACTION_FEE_PER_SHARE
+from .trade_ledger import TradeLedger
 
 # Configure logging
 logging.basicConfig(
@@ -20,6 +21,10 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 console = Console()
 
+# Fraction of the beta tolerance kept between the optimized beta and the edge
+# of the tolerance band, so that rounding to whole shares stays inside it
+BETA_BAND_MARGIN = 0.1
+
 
 def compute_beta(stock_returns: pd.Series, market_returns: pd.Series) -> float:
     """
@@ -33,6 +38,9 @@ def compute_beta(stock_returns: pd.Series, market_returns: pd.Series) -> float:
         float: Beta coefficient
     """
     try:
+        # statsmodels is only needed for the full OLS fit, so import it lazily
+        import statsmodels.api as sm
+
         # Add constant to market returns for regression
         X = sm.add_constant(market_returns)
 
@@ -51,6 +59,185 @@ def compute_beta(stock_returns: pd.Series, market_returns: pd.Series) -> float:
         raise
 
 
+def compute_betas(returns: pd.DataFrame, market_column: str) -> pd.DataFrame:
+    """
+    Estimate OLS beta statistics for every ticker in one vectorized pass.
+
+    Uses the closed-form simple regression of each ticker's returns on the
+    market returns, so the results match compute_beta without fitting one
+    statsmodels model per ticker. Missing values are excluded pairwise.
+
+    Args:
+        returns (pd.DataFrame): Daily returns, one column per ticker
+        market_column (str): Name of the market index column in returns
+
+    Returns:
+        pd.DataFrame: Indexed by ticker with columns beta, alpha, r_squared
+                    and std_err (standard error of beta)
+    """
+    try:
+        if market_column not in returns.columns:
+            raise KeyError(f"Market column {market_column} not found in returns")
+
+        tickers = [ticker for ticker in returns.columns if ticker != market_column]
+        y = returns[tickers].to_numpy(dtype=np.float64)
+        x = returns[market_column].to_numpy(dtype=np.float64)[:, None]
+
+        # Pairwise-complete observations
+        valid = ~np.isnan(y) & ~np.isnan(x)
+        n = valid.sum(axis=0).astype(np.float64)
+        x = np.where(valid, x, 0.0)
+        y = np.where(valid, y, 0.0)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_mean = x.sum(axis=0) / n
+            y_mean = y.sum(axis=0) / n
+            x_dev = np.where(valid, x - x_mean, 0.0)
+            y_dev = np.where(valid, y - y_mean, 0.0)
+
+            sxx = (x_dev * x_dev).sum(axis=0)
+            syy = (y_dev * y_dev).sum(axis=0)
+            sxy = (x_dev * y_dev).sum(axis=0)
+
+            beta = sxy / sxx
+            alpha = y_mean - beta * x_mean
+            ssr = np.maximum(syy - beta * sxy, 0.0)
+            r_squared = 1.0 - ssr / syy
+            std_err = np.sqrt(ssr / (n - 2) / sxx)
+
+        if np.any(sxx == 0):
+            logger.warning("Market returns have zero variance for some tickers; beta is undefined")
+
+        result = pd.DataFrame(
+            {"beta": beta, "alpha": alpha, "r_squared": r_squared, "std_err": std_err},
+            index=pd.Index(tickers, name="ticker"),
+        )
+        logger.debug(f"Computed betas for {len(tickers)} tickers")
+        return result
+
+    except Exception as e:
+        logger.error(f"Error computing betas: {str(e)}")
+        raise
+
+
+def compute_rolling_betas(
+    returns: pd.DataFrame,
+    market_column: str,
+    window: Optional[int] = None,
+    halflife: Optional[float] = None,
+    min_periods: int = 2,
+    chunk_size: int = 500,
+    dtype=np.float64,
+) -> pd.DataFrame:
+    """
+    Estimate a dates x tickers matrix of time-varying betas.
+
+    The beta on each date only uses returns up to and including that date.
+    With window set, betas come from a rolling window computed with cumulative
+    sums; with halflife set, from exponentially weighted moments updated one
+    date at a time; with neither, from an expanding window. Either way each
+    estimate costs O(1), so the whole matrix is a single O(N*T) pass. Tickers
+    are processed in chunks so that working memory stays bounded by
+    chunk_size columns on top of the output matrix.
+
+    Args:
+        returns (pd.DataFrame): Daily returns, one column per ticker
+        market_column (str): Name of the market index column in returns
+        window (int, optional): Rolling window length in trading days
+        halflife (float, optional): Halflife in trading days for EWMA betas
+        min_periods (int): Minimum observations before a beta is reported
+        chunk_size (int): Number of tickers processed at a time
+        dtype: Floating point type of the returned matrix
+
+    Returns:
+        pd.DataFrame: Betas indexed like returns, one column per ticker.
+                    Dates with fewer than min_periods observations are NaN.
+    """
+    try:
+        if market_column not in returns.columns:
+            raise KeyError(f"Market column {market_column} not found in returns")
+        if window is not None and halflife is not None:
+            raise ValueError("Specify either window or halflife, not both")
+        if window is not None and window < 2:
+            raise ValueError(f"Window must be at least 2, got {window}")
+        if halflife is not None and halflife <= 0:
+            raise ValueError(f"Halflife must be positive, got {halflife}")
+
+        tickers = [ticker for ticker in returns.columns if ticker != market_column]
+        market = returns[market_column].to_numpy(dtype=np.float64)
+        betas = np.empty((len(returns), len(tickers)), dtype=dtype)
+
+        for start in range(0, len(tickers), chunk_size):
+            columns = tickers[start:start + chunk_size]
+            stock = returns[columns].to_numpy(dtype=np.float64)
+            if halflife is not None:
+                chunk = _ewma_betas(stock, market, halflife, min_periods)
+            else:
+                chunk = _window_betas(stock, market, window, min_periods)
+            betas[:, start:start + len(columns)] = chunk
+
+        logger.debug(f"Computed rolling betas for {len(tickers)} tickers over {len(returns)} dates")
+        return pd.DataFrame(betas, index=returns.index, columns=tickers)
+
+    except Exception as e:
+        logger.error(f"Error computing rolling betas: {str(e)}")
+        raise
+
+
+def _window_betas(stock: np.ndarray, market: np.ndarray, window: Optional[int], min_periods: int) -> np.ndarray:
+    """Rolling (or expanding, if window is None) betas from cumulative sums."""
+    valid = ~np.isnan(stock) & ~np.isnan(market)[:, None]
+    x = np.where(valid, market[:, None], 0.0)
+    y = np.where(valid, stock, 0.0)
+
+    sums = []
+    for values in (valid.astype(np.float64), x, y, x * x, x * y):
+        total = np.cumsum(values, axis=0)
+        if window is not None and window < len(total):
+            total[window:] -= total[:-window].copy()
+        sums.append(total)
+    n, sx, sy, sxx, sxy = sums
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        betas = (n * sxy - sx * sy) / (n * sxx - sx * sx)
+    betas[n < min_periods] = np.nan
+    return betas
+
+
+def _ewma_betas(stock: np.ndarray, market: np.ndarray, halflife: float, min_periods: int) -> np.ndarray:
+    """Exponentially weighted betas from recursively updated moments."""
+    alpha = 1.0 - np.exp(np.log(0.5) / halflife)
+    n_days, n_tickers = stock.shape
+    betas = np.empty((n_days, n_tickers))
+
+    count = np.zeros(n_tickers)
+    mean_x = np.zeros(n_tickers)
+    mean_y = np.zeros(n_tickers)
+    mean_xx = np.zeros(n_tickers)
+    mean_xy = np.zeros(n_tickers)
+
+    for t in range(n_days):
+        x = market[t]
+        y = stock[t]
+        valid = ~np.isnan(y) & ~np.isnan(x)
+        # The first observation seeds the averages, later ones are blended in
+        weight = np.where(valid, np.where(count > 0, alpha, 1.0), 0.0)
+        x_obs = np.where(valid, x, 0.0)
+        y_obs = np.where(valid, y, 0.0)
+
+        mean_x += weight * (x_obs - mean_x)
+        mean_y += weight * (y_obs - mean_y)
+        mean_xx += weight * (x_obs * x_obs - mean_xx)
+        mean_xy += weight * (x_obs * y_obs - mean_xy)
+        count += valid
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            beta = (mean_xy - mean_x * mean_y) / (mean_xx - mean_x * mean_x)
+        betas[t] = np.where(count >= min_periods, beta, np.nan)
+
+    return betas
+
+
 def compute_portfolio_beta(positions: Dict[str, float], betas: Dict[str, float]) -> float:
     """
     Calculate the weighted average beta for the entire portfolio.
@@ -83,26 +270,181 @@ def compute_portfolio_beta(positions: Dict[str, float], betas: Dict[str, float])
         raise
 
 
-def initialize_portfolio(initial_capital: float, prices: Dict[str, float], tickers_long: List[str], tickers_short: List[str], betas: Dict[str, float], current_date) -> Tuple[Dict[str, float], float, List[Dict[str, float]]]:
+class PortfolioState:
+    """
+    Array-backed portfolio holdings with a fixed ticker ordering.
+
+    Shares, prices and betas are float64 vectors aligned with tickers, so
+    valuations and the portfolio beta are single vector operations instead of
+    per-ticker dictionary arithmetic. The state also behaves as a read-only
+    mapping of ticker to shares, so code written for Dict[str, float]
+    portfolios (items(), portfolio[ticker], ...) keeps working.
+    """
+
+    __slots__ = ("tickers", "shares", "prices", "betas", "_index")
+
+    def __init__(self, tickers: List[str], shares=None, prices=None, betas=None):
+        """
+        Args:
+            tickers (List[str]): Ticker ordering shared by all vectors
+            shares: Shares per ticker, as a mapping or a sequence aligned with tickers
+            prices: Prices per ticker, as a mapping, pd.Series or aligned sequence
+            betas: Betas per ticker, as a mapping, pd.Series or aligned sequence
+        """
+        self.tickers = list(tickers)
+        self._index = {ticker: i for i, ticker in enumerate(self.tickers)}
+        if len(self._index) != len(self.tickers):
+            raise ValueError("Portfolio tickers must be unique")
+        self.shares = self._vector(shares)
+        self.prices = self._vector(prices)
+        self.betas = self._vector(betas)
+
+    @classmethod
+    def from_dict(cls, portfolio: Dict[str, float], prices=None, betas=None) -> "PortfolioState":
+        """Build a state from a ticker -> shares dictionary, keeping its order."""
+        return cls(list(portfolio.keys()), portfolio, prices, betas)
+
+    def to_dict(self) -> Dict[str, float]:
+        """Holdings as a ticker -> shares dictionary."""
+        return dict(zip(self.tickers, self.shares.tolist()))
+
+    def copy(self) -> "PortfolioState":
+        state = PortfolioState.__new__(PortfolioState)
+        state.tickers = self.tickers
+        state._index = self._index
+        state.shares = self.shares.copy()
+        state.prices = self.prices.copy()
+        state.betas = self.betas.copy()
+        return state
+
+    def update_prices(self, prices) -> None:
+        """Replace the prices, given as a mapping, pd.Series or aligned sequence."""
+        self.prices = self._vector(prices)
+
+    def update_betas(self, betas) -> None:
+        """Replace the betas; tickers missing from a mapping get a beta of zero."""
+        self.betas = self._vector(betas)
+
+    def positions(self) -> np.ndarray:
+        """Position values (shares times price) per ticker."""
+        return self.shares * self.prices
+
+    def net_value(self) -> float:
+        return float(self.shares @ self.prices)
+
+    def gross_value(self) -> float:
+        return float(np.abs(self.shares) @ np.abs(self.prices))
+
+    def long_value(self) -> float:
+        positions = self.positions()
+        return float(positions[self.shares > 0].sum())
+
+    def short_value(self) -> float:
+        positions = self.positions()
+        return float(positions[self.shares < 0].sum())
+
+    def beta(self) -> float:
+        """Portfolio beta, weighted by gross exposure as in compute_portfolio_beta."""
+        gross = self.gross_value()
+        if gross == 0:
+            raise ValueError("Total portfolio exposure cannot be zero")
+        return float(self.positions() @ self.betas) / gross
+
+    def long_beta(self) -> float:
+        """Beta contribution of the long positions to the portfolio beta."""
+        return self._side_beta(self.shares > 0)
+
+    def short_beta(self) -> float:
+        """Beta contribution of the short positions to the portfolio beta."""
+        return self._side_beta(self.shares < 0)
+
+    def _side_beta(self, mask: np.ndarray) -> float:
+        gross = self.gross_value()
+        if gross == 0:
+            raise ValueError("Total portfolio exposure cannot be zero")
+        return float(self.positions()[mask] @ self.betas[mask]) / gross
+
+    def _vector(self, values) -> np.ndarray:
+        if values is None:
+            return np.zeros(len(self.tickers))
+        if isinstance(values, pd.Series):
+            return values.reindex(self.tickers).fillna(0.0).to_numpy(dtype=np.float64)
+        if isinstance(values, dict):
+            return np.array([values.get(ticker, 0.0) for ticker in self.tickers], dtype=np.float64)
+        vector = np.asarray(values, dtype=np.float64)
+        if vector.shape != (len(self.tickers),):
+            raise ValueError(f"Expected {len(self.tickers)} values, got shape {vector.shape}")
+        return vector.copy()
+
+    # Read-only mapping interface over the shares
+    def __getitem__(self, ticker: str) -> float:
+        return float(self.shares[self._index[ticker]])
+
+    def __contains__(self, ticker) -> bool:
+        return ticker in self._index
+
+    def __iter__(self):
+        return iter(self.tickers)
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def get(self, ticker: str, default=None):
+        return self[ticker] if ticker in self._index else default
+
+    def keys(self) -> List[str]:
+        return list(self.tickers)
+
+    def values(self) -> List[float]:
+        return self.shares.tolist()
+
+    def items(self) -> List[Tuple[str, float]]:
+        return list(zip(self.tickers, self.shares.tolist()))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PortfolioState):
+            return self.tickers == other.tickers and np.array_equal(self.shares, other.shares)
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"PortfolioState({self.to_dict()!r})"
+
+
+def initialize_portfolio(initial_capital: float, prices: Union[Dict[str, float], PortfolioState], tickers_long: List[str], tickers_short: List[str], betas: Optional[Dict[str, float]], current_date, transaction_fee: float = TRANSACTION_FEE_PER_SHARE) -> Tuple[Union[Dict[str, float], PortfolioState], float, TradeLedger]:
     """
     Initializes the portfolio allocation based on an initial capital.
     
     Parameters:
         initial_capital (float): The total initial capital in USD.
-        prices (dict): A dictionary with tickers as keys and their initial price as values.
+        prices (dict or PortfolioState): A dictionary with tickers as keys and their initial price as values,
+            or a PortfolioState carrying the prices (and betas) of the ticker universe.
         tickers_long (list): A list of ticker symbols to take long positions.
         tickers_short (list): A list of ticker symbols to take short positions.
-        betas (dict): Dictionary of beta values per ticker.
+        betas (dict): Dictionary of beta values per ticker. May be None when prices is a
+            PortfolioState, in which case its betas are used.
         current_date: Current trading date.
+        transaction_fee (float): Transaction fee per share traded.
         
     Returns:
-        Tuple[Dict[str, float], float, List[Dict[str, float]]]: A tuple containing:
-            - Dictionary mapping each ticker to the number of shares
+        Tuple[Dict[str, float], float, TradeLedger]: A tuple containing:
+            - Dictionary mapping each ticker to the number of shares, or a PortfolioState
+              with the state's ticker ordering when prices is a PortfolioState
             - Total transaction costs
-            - List of transaction logs
+            - Ledger of the initial trades
     """
+    state = None
+    if isinstance(prices, PortfolioState):
+        state = prices
+        prices = dict(zip(state.tickers, state.prices.tolist()))
+        if betas is None:
+            betas = dict(zip(state.tickers, state.betas.tolist()))
+
     portfolio = {}
-    transaction_logs = []
+    trades = []
     total_transaction_cost = 0.0
     
     # Split the initial capital equally between long and short positions.
@@ -126,17 +468,10 @@ def initialize_portfolio(initial_capital: float, prices: Dict[str, float], ticke
         portfolio[ticker] = shares
         
         # Calculate transaction cost and log the trade
-        transaction_cost = shares * 0.01  # $0.01 per share
+        transaction_cost = shares * transaction_fee
         total_transaction_cost += transaction_cost
         
-        transaction_logs.append({
-            "date": current_date,
-            "ticker": ticker,
-            "shares_traded": shares,
-            "price": prices[ticker],
-            "portfolio_beta": 0.0,  # Initial portfolio beta
-            "transaction_cost": transaction_cost
-        })
+        trades.append((ticker, shares, prices[ticker], transaction_cost))
 
     # Calculate the number of shares for each short ticker.
     for ticker in tickers_short:
@@ -147,50 +482,75 @@ def initialize_portfolio(initial_capital: float, prices: Dict[str, float], ticke
         portfolio[ticker] = -shares
         
         # Calculate transaction cost and log the trade
-        transaction_cost = shares * 0.01  # $0.01 per share
+        transaction_cost = shares * transaction_fee
         total_transaction_cost += transaction_cost
         
-        transaction_logs.append({
-            "date": current_date,
-            "ticker": ticker,
-            "shares_traded": shares,
-            "price": prices[ticker],
-            "portfolio_beta": 0.0,  # Initial portfolio beta
-            "transaction_cost": transaction_cost
-        })
+        trades.append((ticker, shares, prices[ticker], transaction_cost))
 
     # Calculate initial portfolio beta
     positions = {ticker: shares * prices[ticker] for ticker, shares in portfolio.items()}
     initial_beta = compute_portfolio_beta(positions, betas)
     
-    # Update portfolio beta in transaction logs
-    for log in transaction_logs:
-        log["portfolio_beta"] = initial_beta
+    # Log the trades at the initial portfolio beta
+    transaction_logs = TradeLedger(capacity=len(trades))
+    for ticker, shares, price, transaction_cost in trades:
+        transaction_logs.append(current_date, ticker, shares, price, initial_beta, transaction_cost)
+
+    if state is not None:
+        portfolio = PortfolioState(state.tickers, portfolio, state.prices, betas)
 
     return portfolio, total_transaction_cost, transaction_logs
 
 
 def rebalance_portfolio(
-    portfolio: Dict[str, float],
+    portfolio: Union[Dict[str, float], PortfolioState],
     prices: pd.Series,
     betas: Dict[str, float],
     target_beta: float = 0.0,
     current_date = None,
-) -> Tuple[Dict[str, float], float, List[Dict[str, float]]]:
+    beta_tolerance: float = BETA_TOLERANCE,
+    transaction_fee: float = TRANSACTION_FEE_PER_SHARE,
+    method: str = "heuristic",
+) -> Tuple[Dict[str, float], float, TradeLedger]:
     """
     Rebalance the portfolio to maintain market neutrality and target beta.
     All share quantities are rounded to whole numbers.
+
+    The "heuristic" method scales each side by a fixed 60/40 split of the beta
+    gap and may need several passes to get inside the tolerance. The
+    "optimize" method solves in one pass for small trades that bring the beta
+    just inside the tolerance band while keeping the book dollar-neutral and
+    its gross exposure unchanged, see optimize_rebalance_trades; if its
+    rounded trades miss the band it falls back to the heuristic.
     
     Args:
-        portfolio: Current portfolio positions (shares)
-        prices: Current prices for all tickers
-        betas: Beta values for each ticker
+        portfolio: Current portfolio positions (shares), as a dictionary or a PortfolioState
+        prices: Current prices for all tickers. For a PortfolioState this may also be
+            an array aligned with its tickers.
+        betas: Beta values for each ticker. For a PortfolioState this may also be
+            an array aligned with its tickers.
         target_beta: Target portfolio beta (default: 0.0 for market neutral)
         current_date: Current trading date
+        beta_tolerance: Allowed deviation from the target beta before trading
+        transaction_fee: Transaction fee per share traded
+        method: "heuristic" or "optimize"
     
     Returns:
-        Tuple[Dict[str, float], float, List[Dict[str, float]]]: Updated portfolio positions, transaction costs, and transaction logs
+        Tuple[Dict[str, float], float, TradeLedger]: Updated portfolio positions, transaction costs, and transaction logs.
+            The positions have the same type as the portfolio argument.
     """
+    if method == "optimize":
+        return _rebalance_optimized(
+            portfolio, prices, betas, target_beta, current_date, beta_tolerance, transaction_fee
+        )
+    if method != "heuristic":
+        raise ValueError(f"Unknown rebalancing method: {method}")
+
+    if isinstance(portfolio, PortfolioState):
+        return _rebalance_state(
+            portfolio, prices, betas, target_beta, current_date, beta_tolerance, transaction_fee
+        )
+
     logging.info("Rebalancing portfolio to maintain market neutrality...")
     
     # Calculate current positions in USD
@@ -201,9 +561,9 @@ def rebalance_portfolio(
     current_beta = compute_portfolio_beta(positions, betas)
     
     # If beta is within tolerance, no rebalancing needed
-    if abs(current_beta - target_beta) <= BETA_TOLERANCE:
+    if abs(current_beta - target_beta) <= beta_tolerance:
         logging.info(f"Portfolio beta {current_beta:.2f} within tolerance of target {target_beta}")
-        return portfolio.copy(), 0.0, []  # Return empty transaction log
+        return portfolio.copy(), 0.0, TradeLedger()  # Return empty transaction log
     
     # Separate long and short positions
     long_positions = {t: s for t, s in portfolio.items() if s > 0}
@@ -224,7 +584,7 @@ def rebalance_portfolio(
     
     new_portfolio = {}
     total_transaction_cost = 0.0
-    transaction_logs = []  # Initialize transaction logs
+    transaction_logs = TradeLedger(list(portfolio))  # Initialize transaction logs
     
     # Adjust long positions
     for ticker, shares in long_positions.items():
@@ -235,19 +595,14 @@ def rebalance_portfolio(
         
         # Calculate transaction cost
         shares_traded = abs(new_shares - shares)
-        transaction_cost = shares_traded * 0.01  # $0.01 per share
+        transaction_cost = shares_traded * transaction_fee
         total_transaction_cost += transaction_cost
         
         # Log transaction
         if shares_traded > 0:  # Only log if shares were actually traded
-            transaction_logs.append({
-                "date": current_date,
-                "ticker": ticker,
-                "shares_traded": shares_traded,
-                "price": prices[ticker],
-                "portfolio_beta": current_beta,
-                "transaction_cost": transaction_cost
-            })
+            transaction_logs.append(
+                current_date, ticker, shares_traded, prices[ticker], current_beta, transaction_cost
+            )
         
         new_portfolio[ticker] = new_shares
     
@@ -260,19 +615,14 @@ def rebalance_portfolio(
         
         # Calculate transaction cost
         shares_traded = abs(new_shares - shares)
-        transaction_cost = shares_traded * 0.01  # $0.01 per share
+        transaction_cost = shares_traded * transaction_fee
         total_transaction_cost += transaction_cost
         
         # Log transaction
         if shares_traded > 0:  # Only log if shares were actually traded
-            transaction_logs.append({
-                "date": current_date,
-                "ticker": ticker,
-                "shares_traded": shares_traded,
-                "price": prices[ticker],
-                "portfolio_beta": current_beta,
-                "transaction_cost": transaction_cost
-            })
+            transaction_logs.append(
+                current_date, ticker, shares_traded, prices[ticker], current_beta, transaction_cost
+            )
         
         new_portfolio[ticker] = new_shares
     
@@ -282,3 +632,204 @@ def rebalance_portfolio(
     logging.info(f"Portfolio rebalanced. New beta: {new_beta:.2f}")
     
     return new_portfolio, total_transaction_cost, transaction_logs
+
+
+def _rebalance_state(
+    portfolio: PortfolioState,
+    prices,
+    betas,
+    target_beta: float,
+    current_date,
+    beta_tolerance: float,
+    transaction_fee: float,
+) -> Tuple[PortfolioState, float, TradeLedger]:
+    """Vectorized rebalance_portfolio for array-backed portfolios, same rules and rounding."""
+    logging.info("Rebalancing portfolio to maintain market neutrality...")
+
+    state = portfolio.copy()
+    state.update_prices(prices)
+    state.update_betas(betas)
+    current_beta = state.beta()
+
+    # If beta is within tolerance, no rebalancing needed
+    if abs(current_beta - target_beta) <= beta_tolerance:
+        logging.info(f"Portfolio beta {current_beta:.2f} within tolerance of target {target_beta}")
+        return state, 0.0, TradeLedger()
+
+    shares = state.shares
+    long_mask = shares > 0
+    short_mask = shares < 0
+    contributions = state.betas * state.positions() / state.gross_value()
+    long_beta = contributions[long_mask].sum()
+    short_beta = contributions[short_mask].sum()
+    if (long_mask.any() and long_beta == 0) or (short_mask.any() and short_beta == 0):
+        raise ZeroDivisionError("Cannot rebalance a side whose beta contribution is zero")
+
+    # Split the beta gap between the sides as in rebalance_portfolio
+    beta_gap = target_beta - current_beta
+    heavier, lighter = -beta_gap * 0.6, -beta_gap * 0.4
+    long_adjustment, short_adjustment = (
+        (heavier, lighter) if abs(long_beta) > abs(short_beta) else (lighter, heavier)
+    )
+
+    new_shares = shares.copy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        long_factor = 1.0 + long_adjustment * contributions / long_beta
+        short_factor = 1.0 + short_adjustment * contributions / short_beta
+    # np.rint rounds half to even like round()
+    new_shares[long_mask] = np.rint(shares[long_mask] * long_factor[long_mask])
+    new_shares[short_mask] = -np.rint(np.abs(shares[short_mask] * short_factor[short_mask]))
+
+    traded = np.abs(new_shares - shares)
+    costs = traded * transaction_fee
+    # Long trades are logged before short trades, as in rebalance_portfolio
+    traded_ids = np.concatenate([np.flatnonzero(mask & (traded > 0)) for mask in (long_mask, short_mask)])
+    transaction_logs = TradeLedger(state.tickers, capacity=len(traded_ids))
+    transaction_logs.append_many(
+        current_date, traded_ids, traded[traded_ids], state.prices[traded_ids], current_beta, costs[traded_ids]
+    )
+
+    state.shares = new_shares
+    logging.info(f"Portfolio rebalanced. New beta: {state.beta():.2f}")
+    return state, float(costs.sum()), transaction_logs
+
+
+def optimize_rebalance_trades(
+    shares: np.ndarray,
+    prices: np.ndarray,
+    betas: np.ndarray,
+    target_beta: float = 0.0,
+    beta_tolerance: float = BETA_TOLERANCE,
+) -> np.ndarray:
+    """
+    Solve for whole-share trades that bring the portfolio beta within tolerance of its target.
+
+    A portfolio already within beta_tolerance of target_beta is not traded.
+    Otherwise the trades aim at the nearest edge of the tolerance band (inset
+    by BETA_BAND_MARGIN of the tolerance to leave room for rounding) rather
+    than at the target itself, so the book moves no further than the band
+    requires. The dollar trades d minimize sum(d_i^2 / |v_i|), where v_i is
+    the current position value, subject to three linear constraints: the
+    portfolio beta equals that aim, net value is unchanged at zero
+    (dollar-neutral) and gross exposure is unchanged. Weighting by position
+    size keeps each trade proportional to the holding, so turnover is spread
+    over the book instead of concentrated in a few names, and positions are
+    never opened. The solution is closed form: d = W A' x with (A W A') x = r,
+    a 3x3 system whatever the number of tickers.
+
+    If the aim cannot be reached without some position crossing zero, the
+    dollar-neutral constraint is dropped, with a warning, and the beta is
+    moved by shifting exposure between the long and short books; the
+    returned trades then change the net value of the book. Trades are
+    rounded to whole shares and clamped so that no position crosses zero,
+    and the resulting beta is checked against the tolerance again.
+
+    Args:
+        shares (np.ndarray): Current shares per ticker
+        prices (np.ndarray): Current prices per ticker
+        betas (np.ndarray): Betas per ticker
+        target_beta (float): Target portfolio beta
+        beta_tolerance (float): Allowed deviation from the target beta
+
+    Returns:
+        np.ndarray: Shares to trade per ticker (positive buys, negative sells)
+
+    Raises:
+        ValueError: If the book has no exposure, or if the rounded and clamped
+            trades leave the beta outside the tolerance band
+    """
+    shares = np.asarray(shares, dtype=np.float64)
+    prices = np.asarray(prices, dtype=np.float64)
+    betas = np.asarray(betas, dtype=np.float64)
+
+    values = shares * prices
+    sides = np.sign(values)
+    weights = np.abs(values)
+    gross = weights.sum()
+    if gross == 0:
+        raise ValueError("Total portfolio exposure cannot be zero")
+
+    current_beta = values @ betas / gross
+    gap = current_beta - target_beta
+    if abs(gap) <= beta_tolerance:
+        return np.zeros_like(shares)
+    aim = target_beta + np.sign(gap) * beta_tolerance * (1 - BETA_BAND_MARGIN)
+
+    # Rows: net value, gross exposure (signs are kept), beta exposure
+    constraints = np.vstack([np.ones_like(values), sides, betas])
+    required = np.array([-values.sum(), 0.0, aim * gross - values @ betas])
+
+    for rows in (slice(0, 3), slice(1, 3)):
+        system = (constraints[rows] * weights) @ constraints[rows].T
+        multipliers = np.linalg.lstsq(system, required[rows], rcond=None)[0]
+        dollar_trades = weights * (constraints[rows].T @ multipliers)
+        if np.all(sides * (values + dollar_trades) >= 0):
+            break
+        if rows.start == 0:
+            logger.warning(
+                f"Beta {aim:.3f} is not reachable while dollar-neutral without flipping a position; "
+                "relaxing the net exposure constraint"
+            )
+
+    trades = np.zeros_like(shares)
+    np.divide(dollar_trades, prices, out=trades, where=prices != 0)
+    trades = np.rint(trades)
+
+    # Never flip a position to the other side of the book
+    new_shares = shares + trades
+    flipped = np.sign(new_shares) * np.sign(shares) < 0
+    trades[flipped] = -shares[flipped]
+
+    # Rounding and clamping move the beta and gross exposure away from the solution
+    new_values = (shares + trades) * prices
+    new_gross = np.abs(new_values).sum()
+    new_beta = new_values @ betas / new_gross if new_gross > 0 else np.nan
+    if not abs(new_beta - target_beta) <= beta_tolerance:
+        raise ValueError(
+            f"Optimized trades leave the portfolio beta at {new_beta:.3f}, outside "
+            f"{target_beta} +/- {beta_tolerance}"
+        )
+    return trades
+
+
+def _rebalance_optimized(
+    portfolio: Union[Dict[str, float], PortfolioState],
+    prices,
+    betas,
+    target_beta: float,
+    current_date,
+    beta_tolerance: float,
+    transaction_fee: float,
+) -> Tuple[Union[Dict[str, float], PortfolioState], float, TradeLedger]:
+    """rebalance_portfolio with trades from optimize_rebalance_trades."""
+    is_state = isinstance(portfolio, PortfolioState)
+    state = portfolio.copy() if is_state else PortfolioState.from_dict(portfolio)
+    state.update_prices(prices)
+    state.update_betas(betas)
+    current_beta = state.beta()
+
+    if abs(current_beta - target_beta) <= beta_tolerance:
+        logging.info(f"Portfolio beta {current_beta:.2f} within tolerance of target {target_beta}")
+        return (state if is_state else portfolio.copy()), 0.0, TradeLedger()
+
+    try:
+        trades = optimize_rebalance_trades(
+            state.shares, state.prices, state.betas, target_beta, beta_tolerance
+        )
+    except ValueError as e:
+        logger.warning(f"{str(e)}; falling back to the heuristic rebalance")
+        return rebalance_portfolio(
+            portfolio, prices, betas, target_beta, current_date,
+            beta_tolerance=beta_tolerance, transaction_fee=transaction_fee, method="heuristic",
+        )
+    traded = np.abs(trades)
+    costs = traded * transaction_fee
+    traded_ids = np.flatnonzero(traded > 0)
+    transaction_logs = TradeLedger(state.tickers, capacity=len(traded_ids))
+    transaction_logs.append_many(
+        current_date, traded_ids, traded[traded_ids], state.prices[traded_ids], current_beta, costs[traded_ids]
+    )
+
+    state.shares = state.shares + trades
+    logging.info(f"Portfolio rebalanced. New beta: {state.beta():.2f}")
+    return (state if is_state else state.to_dict()), float(costs.sum()), transaction_logs
@@ -0,0 +1,439 @@
+"""
+Market data providers for the hedge fund portfolio project.
+Defines the sources prices are fetched from and fetches many tickers
+concurrently with per-ticker retries.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import pandas as pd
+
+from .config import resolve_data_path
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Fetch settings used when none are given
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+
+# One price request: ticker, start date and exclusive end date
+FetchRequest = Tuple[str, str, str]
+
+
+class NoDataError(ValueError):
+    """The provider has no prices for a ticker and range. Retrying will not help."""
+
+
+class MarketDataProvider:
+    """
+    Source of daily adjusted close prices.
+
+    Subclasses implement fetch_history for a single ticker. It is called from
+    several threads at once, so implementations must be thread-safe.
+    """
+
+    # Whether downloaded prices are worth keeping in the local price store
+    cacheable = True
+
+    def fetch_history(self, ticker: str, start_date: str, end_date: str) -> pd.Series:
+        """
+        Fetch daily adjusted close prices for one ticker.
+
+        Args:
+            ticker (str): Ticker symbol
+            start_date (str): Start date in 'YYYY-MM-DD' format
+            end_date (str): End date in 'YYYY-MM-DD' format (exclusive)
+
+        Returns:
+            pd.Series: Prices indexed by timezone-naive dates, named after the ticker
+
+        Raises:
+            NoDataError: If there are no prices for the ticker in the range
+        """
+        raise NotImplementedError
+
+
+class YahooFinanceProvider(MarketDataProvider):
+    """
+    Prices from Yahoo Finance, one history request per ticker.
+
+    yfinance's exception setting is process-wide, so it is switched to raise
+    missing-data errors once, when the provider is created, rather than on
+    every fetch from several threads.
+    """
+
+    def __init__(self, timeout: float = 10):
+        import yfinance as yf
+
+        self.timeout = timeout
+        # Raise missing-data errors instead of logging them and returning an empty frame
+        yf.config.debug.hide_exceptions = False
+
+    def fetch_history(self, ticker: str, start_date: str, end_date: str) -> pd.Series:
+        import yfinance as yf
+        from yfinance.exceptions import YFPricesMissingError, YFTickerMissingError, YFTzMissingError
+
+        try:
+            history = yf.Ticker(ticker).history(
+                start=start_date, end=end_date, auto_adjust=False, actions=False,
+                timeout=self.timeout,
+            )
+        except (YFPricesMissingError, YFTickerMissingError, YFTzMissingError) as e:
+            raise NoDataError(str(e)) from e
+
+        if history.empty:
+            raise NoDataError(f"No price data found for {ticker} from {start_date} to {end_date}")
+        column = "Adj Close" if "Adj Close" in history.columns else "Close"
+        prices = history[column].rename(ticker)
+        prices.index = pd.DatetimeIndex(prices.index).tz_localize(None).normalize()
+        prices.index.name = "Date"
+        return prices
+
+
+class InMemoryProvider(MarketDataProvider):
+    """
+    Offline stand-in serving prices from a DataFrame.
+
+    Useful for tests and for replaying a saved panel. Failures can be injected
+    per ticker to exercise retries, and every request is recorded in calls.
+
+    Args:
+        prices (pd.DataFrame): Prices indexed by date, one column per ticker
+        failures (Dict[str, int], optional): Number of times each ticker fails
+            with a ConnectionError before it succeeds
+        latency (float): Seconds each request sleeps, to mimic a network round trip
+    """
+
+    def __init__(
+        self,
+        prices: pd.DataFrame,
+        failures: Optional[Dict[str, int]] = None,
+        latency: float = 0.0,
+    ):
+        self.prices = prices.sort_index()
+        self.failures = dict(failures or {})
+        self.latency = latency
+        self.calls: List[FetchRequest] = []
+        self._lock = threading.Lock()
+
+    def fetch_history(self, ticker: str, start_date: str, end_date: str) -> pd.Series:
+        with self._lock:
+            self.calls.append((ticker, start_date, end_date))
+            failing = self.failures.get(ticker, 0) > 0
+            if failing:
+                self.failures[ticker] -= 1
+        if self.latency:
+            time.sleep(self.latency)
+        if failing:
+            raise ConnectionError(f"Simulated network failure for {ticker}")
+        if ticker not in self.prices.columns:
+            raise NoDataError(f"No price data found for {ticker}")
+
+        index = self.prices.index
+        rows = (index >= pd.Timestamp(start_date)) & (index < pd.Timestamp(end_date))
+        prices = self.prices.loc[rows, ticker].dropna()
+        if prices.empty:
+            raise NoDataError(f"No price data found for {ticker} from {start_date} to {end_date}")
+        return prices.rename(ticker)
+
+
+class LocalFileProvider(MarketDataProvider):
+    """
+    Offline provider reading prices from local Parquet, CSV or Excel files.
+
+    path may point to:
+
+    - a wide panel with a Date column or index and one column per ticker,
+      such as data/market_data.csv
+    - an Excel workbook with one sheet per ticker, as written by download.py
+    - a directory with one Parquet, CSV or Excel file per ticker, named after it
+
+    Per-ticker tables hold one column per field (Open, High, Low, Close, ...).
+    Every file or sheet is parsed once and kept in memory, and Parquet panels
+    only read the columns that are asked for, so repeated requests run at
+    memory speed and a cold read at disk speed.
+
+    Args:
+        path (str): Panel file, workbook or directory
+        price_column (str, optional): Field fetch_history returns from per-ticker
+            tables. Defaults to "Adj Close" when present, else "Close".
+        columns (List[str], optional): Fields to read from per-ticker tables,
+            all of them if not given
+    """
+
+    EXTENSIONS = (".parquet", ".csv", ".xlsx", ".xls")
+
+    # Prices already live on disk, so copying them into the price store is pointless
+    cacheable = False
+
+    def __init__(
+        self,
+        path: str,
+        price_column: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+    ):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Price data not found: {path}")
+        if not os.path.isdir(path) and os.path.splitext(path)[1].lower() not in self.EXTENSIONS:
+            raise ValueError(f"Unsupported price file format: {path}")
+        self.path = path
+        self.price_column = price_column
+        self.columns = list(columns) if columns else None
+        self._tables: Dict[Tuple[str, str], Any] = {}
+        self._lock = threading.Lock()
+
+    def fetch_history(self, ticker: str, start_date: str, end_date: str) -> pd.Series:
+        frame = self.fetch_frame(ticker, start_date, end_date)
+        column = self.price_column or next(
+            (name for name in ("Adj Close", "Close", ticker) if name in frame.columns), None
+        )
+        if column not in frame.columns:
+            raise NoDataError(f"No price column found for {ticker} in {self.path}")
+        prices = frame[column].dropna()
+        if prices.empty:
+            raise NoDataError(f"No price data found for {ticker} from {start_date} to {end_date}")
+        return prices.rename(ticker)
+
+    def fetch_frame(
+        self,
+        ticker: str,
+        start_date: str,
+        end_date: str,
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Read the rows of one ticker in [start_date, end_date).
+
+        Args:
+            ticker (str): Ticker symbol
+            start_date (str): Start date in 'YYYY-MM-DD' format
+            end_date (str): End date in 'YYYY-MM-DD' format (exclusive)
+            columns (List[str], optional): Fields to return, all if not given.
+                Wide panels have a single field named after the ticker.
+
+        Returns:
+            pd.DataFrame: The requested fields indexed by date
+
+        Raises:
+            NoDataError: If the ticker is not in the files or has no rows in the range
+        """
+        table = self._load(ticker)
+        if columns is not None:
+            missing = [column for column in columns if column not in table.columns]
+            if missing:
+                raise ValueError(f"Columns {missing} not available for {ticker} in {self.path}")
+            table = table[columns]
+
+        # Tables are sorted by date, so the range is two binary searches
+        first, last = table.index.searchsorted([pd.Timestamp(start_date), pd.Timestamp(end_date)])
+        frame = table.iloc[first:last]
+        if frame.empty:
+            raise NoDataError(f"No price data found for {ticker} from {start_date} to {end_date}")
+        return frame
+
+    def _load(self, ticker: str) -> pd.DataFrame:
+        """Table holding a ticker's rows, read on first use."""
+        with self._lock:
+            if os.path.isdir(self.path):
+                path = self._ticker_file(ticker)
+                return self._read(path, "", self.columns)
+
+            extension = os.path.splitext(self.path)[1].lower()
+            if extension in (".xlsx", ".xls"):
+                sheets = self._read_sheet_names()
+                if ticker in sheets:
+                    return self._read(self.path, ticker, self.columns)
+                # No sheet per ticker, so the first sheet is a wide panel
+                panel = self._read(self.path, sheets[0], None)
+            elif extension == ".parquet":
+                # Columnar format, so read just this ticker's column
+                if ticker not in self._parquet_columns(self.path):
+                    raise NoDataError(f"No price data found for {ticker} in {self.path}")
+                return self._read(self.path, ticker, [ticker])
+            else:
+                panel = self._read(self.path, "", None)
+
+            if ticker not in panel.columns:
+                raise NoDataError(f"No price data found for {ticker} in {self.path}")
+            return panel[[ticker]]
+
+    def _ticker_file(self, ticker: str) -> str:
+        """File holding one ticker in a directory of per-ticker files."""
+        for name in dict.fromkeys((ticker, quote(ticker, safe=""))):
+            for extension in self.EXTENSIONS:
+                path = os.path.join(self.path, name + extension)
+                if os.path.exists(path):
+                    return path
+        raise NoDataError(f"No price file found for {ticker} in {self.path}")
+
+    def _read_sheet_names(self) -> List[str]:
+        key = (self.path, "__sheets__")
+        if key not in self._tables:
+            with pd.ExcelFile(self.path) as workbook:
+                self._tables[key] = list(workbook.sheet_names)
+        return self._tables[key]
+
+    def _parquet_columns(self, path: str) -> List[str]:
+        key = (path, "__columns__")
+        if key not in self._tables:
+            import pyarrow.parquet as pq
+
+            self._tables[key] = pq.read_schema(path).names
+        return self._tables[key]
+
+    def _read(self, path: str, part: str, columns: Optional[List[str]]) -> pd.DataFrame:
+        """Read a file (or one sheet of a workbook) into a sorted, date-indexed frame."""
+        key = (path, part)
+        if key in self._tables:
+            return self._tables[key]
+
+        extension = os.path.splitext(path)[1].lower()
+        wanted = None if columns is None else set(columns) | {"Date"}
+        if extension == ".parquet":
+            if columns is not None and "Date" in self._parquet_columns(path):
+                columns = ["Date"] + [column for column in columns if column != "Date"]
+            table = pd.read_parquet(path, columns=columns)
+        elif extension == ".csv":
+            header = pd.read_csv(path, nrows=0).columns
+            wanted = None if wanted is None else wanted | {header[0]}
+            table = pd.read_csv(path, usecols=None if wanted is None else lambda c: c in wanted)
+        else:
+            table = pd.read_excel(
+                path, sheet_name=part or 0,
+                usecols=None if wanted is None else lambda c: c in wanted,
+            )
+
+        # The date is the index, a Date column, or else the first column
+        if not isinstance(table.index, pd.DatetimeIndex):
+            date_column = "Date" if "Date" in table.columns else table.columns[0]
+            table = table.set_index(date_column)
+        index = pd.DatetimeIndex(pd.to_datetime(table.index))
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        table.index = index.normalize().rename("Date")
+        if not table.index.is_monotonic_increasing:
+            table = table.sort_index()
+
+        self._tables[key] = table
+        return table
+
+
+# Created on first use, so importing this module neither imports yfinance nor changes its settings
+_default_provider: Optional[MarketDataProvider] = None
+
+
+def get_default_provider() -> MarketDataProvider:
+    """Provider used when none is passed explicitly, a YahooFinanceProvider unless replaced."""
+    global _default_provider
+    if _default_provider is None:
+        _default_provider = YahooFinanceProvider()
+    return _default_provider
+
+
+def set_default_provider(provider: Optional[MarketDataProvider]) -> Optional[MarketDataProvider]:
+    """
+    Replace the default provider, e.g. with an offline one.
+
+    Args:
+        provider (MarketDataProvider, optional): New default provider, or None
+            to go back to Yahoo Finance
+
+    Returns:
+        Optional[MarketDataProvider]: The previous default provider, None if it
+            had not been created yet
+    """
+    global _default_provider
+    previous, _default_provider = _default_provider, provider
+    return previous
+
+
+def provider_from_config(config: Dict[str, Any]) -> Optional[MarketDataProvider]:
+    """
+    Build the provider selected in the configuration.
+
+    Args:
+        config (Dict[str, Any]): Configuration; data_path selects local files,
+            relative paths being resolved from the project root
+
+    Returns:
+        Optional[MarketDataProvider]: A LocalFileProvider if data_path is set,
+            else None to use the default provider
+    """
+    data_path = resolve_data_path(config)
+    if not data_path:
+        return None
+    logger.info(f"Reading market data from {data_path}")
+    return LocalFileProvider(data_path)
+
+
+def fetch_many(
+    requests: List[FetchRequest],
+    provider: Optional[MarketDataProvider] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+    on_complete: Optional[Callable[[FetchRequest], None]] = None,
+) -> Tuple[Dict[FetchRequest, pd.Series], Dict[FetchRequest, str]]:
+    """
+    Run price requests concurrently on a bounded thread pool.
+
+    Each request is retried on its own with exponential backoff (backoff,
+    2 * backoff, ... seconds, with jitter), so one slow or failing ticker does
+    not hold back or sink the others. NoDataError is not retried.
+
+    Args:
+        requests (List[FetchRequest]): (ticker, start_date, end_date) requests
+        provider (MarketDataProvider, optional): Price source, defaults to get_default_provider()
+        max_workers (int): Maximum number of requests in flight
+        retries (int): Retries per request after the first attempt
+        backoff (float): Base delay in seconds between attempts
+        on_complete (Callable, optional): Called with each request when it finishes
+
+    Returns:
+        Tuple[Dict[FetchRequest, pd.Series], Dict[FetchRequest, str]]: Prices of the
+            requests that succeeded, and the last error of those that failed
+    """
+    provider = provider or get_default_provider()
+    results: Dict[FetchRequest, pd.Series] = {}
+    errors: Dict[FetchRequest, str] = {}
+    if not requests:
+        return results, errors
+
+    def fetch(request: FetchRequest) -> pd.Series:
+        for attempt in range(retries + 1):
+            try:
+                return provider.fetch_history(*request)
+            except NoDataError:
+                raise
+            except Exception as e:
+                if attempt == retries:
+                    raise
+                delay = backoff * 2 ** attempt * (1 + 0.25 * random.random())
+                logger.warning(f"Fetching {request[0]} failed ({str(e)}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(requests)))) as executor:
+        futures = {executor.submit(fetch, request): request for request in requests}
+        for future in as_completed(futures):
+            request = futures[future]
+            try:
+                results[request] = future.result()
+            except Exception as e:
+                errors[request] = str(e)
+                logger.warning(f"Could not fetch {request[0]} from {request[1]} to {request[2]}: {str(e)}")
+            if on_complete is not None:
+                on_complete(request)
+
+    return results, errors
@@ -3,11 +3,16 @@ Reporting module for the hedge fund portfolio project.
 Handles PDF report generation and Excel data export.
 """
 
+import hashlib
 import logging
 import os
-from datetime import date, datetime
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 import pandas as pd
 import numpy as np
@@ -20,8 +25,13 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib.units import inch
 import markdown2
 from weasyprint import HTML, CSS
+from weasyprint.text.fonts import FontConfiguration
 from pygments.formatters import HtmlFormatter
 
+from .excel_export import EXPORT_CHUNK_SIZE, iter_chunks, stream_daily_results, write_sheets
+from .risk_metrics import calculate_portfolio_metrics
+from .trade_ledger import TradeLedger
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -30,91 +40,147 @@ logger = logging.getLogger(__name__)
 console = Console()
 
 
-def markdown_to_pdf(markdown_content: str, pdf_path: str) -> None:
+# Extras used to convert report markdown to HTML
+MARKDOWN_EXTRAS = [
+    "tables",
+    "fenced-code-blocks",
+    "header-ids",
+    "break-on-newline",
+    "cuddled-lists",
+    "code-friendly"
+]
+
+# Stylesheet of the PDF reports (Pygments code highlighting is appended)
+REPORT_CSS = """
+    @page {
+        margin: 1in;
+        size: letter;
+        @top-right {
+            content: "Page " counter(page);
+        }
+    }
+    body {
+        font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif;
+        line-height: 1.6;
+        max-width: 100%;
+        margin: 0 auto;
+        padding: 2em;
+    }
+    h1 {
+        color: #2c3e50;
+        border-bottom: 2px solid #3498db;
+        padding-bottom: 0.3em;
+    }
+    h2 {
+        color: #2c3e50;
+        margin-top: 1.5em;
+    }
+    h3 {
+        color: #34495e;
+    }
+    table {
+        border-collapse: collapse;
+        width: 100%;
+        margin: 1em 0;
+    }
+    th, td {
+        border: 1px solid #ddd;
+        padding: 8px;
+        text-align: left;
+    }
+    th {
+        background-color: #f5f5f5;
+        font-weight: bold;
+    }
+    tr:nth-child(even) {
+        background-color: #f9f9f9;
+    }
+    code {
+        background-color: #f8f9fa;
+        padding: 0.2em 0.4em;
+        border-radius: 3px;
+        font-family: Monaco, "Courier New", monospace;
+    }
+    pre {
+        background-color: #f8f9fa;
+        padding: 1em;
+        border-radius: 5px;
+    }
+"""
+
+# Columns of the batch report manifest
+MANIFEST_COLUMNS = [
+    "name", "status", "markdown_path", "pdf_path", "build_seconds", "pdf_seconds", "pid", "error"
+]
+
+# Suffix of the file next to each PDF holding the hash it was rendered from
+PDF_HASH_SUFFIX = ".sha256"
+
+
+class PDFRenderer:
     """
-    Convert markdown content to PDF using weasyprint with proper styling.
-    
+    Render markdown reports to PDF with a stylesheet compiled once.
+
+    The markdown converter, the stylesheet (with the Pygments code styles)
+    and WeasyPrint's font configuration are built on first use and shared
+    by every render. Each PDF is written with a <pdf>.sha256 file holding
+    the hash of the markdown and stylesheet it came from, and rendering is
+    skipped while that hash is unchanged and the PDF still exists.
+
     Args:
-        markdown_content (str): Content in markdown format
-        pdf_path (str): Path to save the PDF file
+        stylesheet (str): CSS applied to every report
     """
-    # Convert markdown to HTML with extras for better formatting
-    html_content = markdown2.markdown(
-        markdown_content,
-        extras=[
-            "tables",
-            "fenced-code-blocks",
-            "header-ids",
-            "break-on-newline",
-            "cuddled-lists",
-            "code-friendly"
-        ]
-    )
-    
-    # Get Pygments CSS for code highlighting
-    code_style = HtmlFormatter().get_style_defs('.highlight')
-    
-    # Create CSS for better styling
-    css = CSS(string=f"""
-        @page {{
-            margin: 1in;
-            size: letter;
-            @top-right {{
-                content: "Page " counter(page);
-            }}
-        }}
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif;
-            line-height: 1.6;
-            max-width: 100%;
-            margin: 0 auto;
-            padding: 2em;
-        }}
-        h1 {{
-            color: #2c3e50;
-            border-bottom: 2px solid #3498db;
-            padding-bottom: 0.3em;
-        }}
-        h2 {{
-            color: #2c3e50;
-            margin-top: 1.5em;
-        }}
-        h3 {{
-            color: #34495e;
-        }}
-        table {{
-            border-collapse: collapse;
-            width: 100%;
-            margin: 1em 0;
-        }}
-        th, td {{
-            border: 1px solid #ddd;
-            padding: 8px;
-            text-align: left;
-        }}
-        th {{
-            background-color: #f5f5f5;
-            font-weight: bold;
-        }}
-        tr:nth-child(even) {{
-            background-color: #f9f9f9;
-        }}
-        code {{
-            background-color: #f8f9fa;
-            padding: 0.2em 0.4em;
-            border-radius: 3px;
-            font-family: Monaco, "Courier New", monospace;
-        }}
-        pre {{
-            background-color: #f8f9fa;
-            padding: 1em;
-            border-radius: 5px;
-        }}
-        {code_style}
-    """)
-    
-    # Create complete HTML document
-    full_html = f"""
+
+    def __init__(self, stylesheet: str = REPORT_CSS):
+        self.stylesheet = stylesheet + HtmlFormatter().get_style_defs('.highlight')
+        self._stylesheet_hash = hashlib.sha256(self.stylesheet.encode()).hexdigest()
+        self._markdown = markdown2.Markdown(extras=MARKDOWN_EXTRAS)
+        self._css = None
+        self._font_config = None
+        self._lock = threading.Lock()
+
+    def content_hash(self, markdown_content: str) -> str:
+        """Hash identifying a PDF rendered from this content and stylesheet."""
+        return hashlib.sha256(f"{self._stylesheet_hash}\n{markdown_content}".encode()).hexdigest()
+
+    def is_current(self, markdown_content: str, pdf_path: str) -> bool:
+        """Whether pdf_path was already rendered from this content."""
+        hash_path = pdf_path + PDF_HASH_SUFFIX
+        if not (os.path.exists(pdf_path) and os.path.exists(hash_path)):
+            return False
+        with open(hash_path) as f:
+            return f.read().strip() == self.content_hash(markdown_content)
+
+    def render(self, markdown_content: str, pdf_path: str, force: bool = False) -> bool:
+        """
+        Render markdown content to a PDF unless it is already up to date.
+
+        Args:
+            markdown_content (str): Content in markdown format
+            pdf_path (str): Path to save the PDF file
+            force (bool): Render even if the content hash is unchanged
+
+        Returns:
+            bool: True if the PDF was rendered, False if it was up to date
+        """
+        if not force and self.is_current(markdown_content, pdf_path):
+            logger.info(f"PDF is up to date: {pdf_path}")
+            return False
+
+        hash_path = pdf_path + PDF_HASH_SUFFIX
+        if os.path.exists(hash_path):
+            # A failed render must not leave a PDF that looks current
+            os.remove(hash_path)
+
+        with self._lock:
+            # Markdown instances keep state between conversions
+            html_content = self._markdown.convert(markdown_content)
+            if self._css is None:
+                self._font_config = FontConfiguration()
+                self._css = CSS(string=self.stylesheet, font_config=self._font_config)
+
+        # Create complete HTML document
+        full_html = f"""
     <!DOCTYPE html>
     <html>
     <head>
@@ -125,43 +191,65 @@ def markdown_to_pdf(markdown_content: str, pdf_path: str) -> None:
     </body>
     </html>
     """
+        HTML(string=full_html).write_pdf(pdf_path, stylesheets=[self._css], font_config=self._font_config)
+        with open(hash_path, "w") as f:
+            f.write(self.content_hash(markdown_content))
+
+        logger.info(f"PDF generated with proper formatting: {pdf_path}")
+        return True
+
+
+@lru_cache(maxsize=None)
+def get_pdf_renderer() -> PDFRenderer:
+    """The process-wide PDFRenderer, so its stylesheet and fonts are compiled once."""
+    return PDFRenderer()
+
+
+def markdown_to_pdf(markdown_content: str, pdf_path: str, force: bool = False) -> bool:
+    """
+    Convert markdown content to PDF using weasyprint with proper styling.
     
-    # Convert to PDF
-    HTML(string=full_html).write_pdf(pdf_path, stylesheets=[css])
-    
-    logger.info(f"PDF generated with proper formatting: {pdf_path}")
+    Args:
+        markdown_content (str): Content in markdown format
+        pdf_path (str): Path to save the PDF file
+        force (bool): Render even if the PDF is up to date with the content
 
+    Returns:
+        bool: True if the PDF was rendered, False if it was up to date
+    """
+    return get_pdf_renderer().render(markdown_content, pdf_path, force=force)
 
-def generate_monthly_report(
+
+def build_monthly_report(
     simulation_results: pd.DataFrame,
     market_data: pd.DataFrame,
     portfolio: Dict[str, float],
     config: Dict[str, any],
-    transaction_logs: List[Dict[str, float]],
-    output_dir: str = "docs",
-) -> None:
+    transaction_logs: Union[TradeLedger, List[Dict[str, float]]],
+) -> str:
     """
-    Generate monthly performance report.
+    Build the markdown of the monthly performance report.
 
     Args:
         simulation_results (pd.DataFrame): Daily simulation results
         market_data (pd.DataFrame): Market data for all tickers
         portfolio (Dict[str, float]): Portfolio positions
         config (Dict[str, any]): Configuration parameters
-        transaction_logs (List[Dict[str, float]]): List of transaction logs
-        output_dir (str): Output directory for reports
+        transaction_logs (TradeLedger or List[Dict[str, float]]): Transaction logs
+
+    Returns:
+        str: Report content in markdown format
     """
     try:
-        # Create output directory
-        Path(output_dir).mkdir(parents=True, exist_ok=True)
-
         # Calculate portfolio metrics
         metrics = calculate_portfolio_metrics(simulation_results, market_data)
 
         # Generate report content
         report_content = [
             "# Monthly Performance Report\n",
-            f"## Report Date: {datetime.now().strftime('%Y-%m-%d')}\n",
+            # Dated by the data rather than the clock, so an unchanged report
+            # keeps its content hash and is not rendered again
+            f"## Report Date: {pd.Timestamp(simulation_results.index[-1]).strftime('%Y-%m-%d')}\n",
             f"## Simulation Period: {config.get('analysis_year', 2025)}-{config.get('analysis_month', 1):02d}\n",
             "\n### Market-Neutral Strategy Overview\n",
             "This portfolio follows a market-neutral strategy, which aims to generate returns regardless of market direction by maintaining equal long and short positions. Key concepts:\n",
@@ -189,8 +277,12 @@ def generate_monthly_report(
             f"* Total Return (on Gross Exposure): {metrics['total_return']:.2%}" + (" (N/A - insufficient data)" if np.isnan(metrics['total_return']) else ""),
             f"* Annualized Return (on Gross Exposure): {metrics['annualized_return']:.2%}" + (" (N/A - insufficient data)" if np.isnan(metrics['annualized_return']) else ""),
             f"* Sharpe Ratio: {metrics['sharpe_ratio']:.2f}" + (" (N/A - insufficient volatility)" if np.isnan(metrics['sharpe_ratio']) else ""),
+            f"* Sortino Ratio: {metrics['sortino_ratio']:.2f}" + (" (N/A - no downside volatility)" if np.isnan(metrics['sortino_ratio']) else ""),
             f"* Maximum Drawdown: {metrics['max_drawdown']:.2%}",
+            f"* Calmar Ratio: {metrics['calmar_ratio']:.2f}" + (" (N/A - no drawdown)" if np.isnan(metrics['calmar_ratio']) else ""),
+            f"* Hit Rate (days with a positive return): {metrics['hit_rate']:.1%}",
             f"* Beta to Market: {metrics['portfolio_beta']:.2f}",
+            f"* Beta Drift (last day vs first day): {metrics['beta_drift']:+.3f}",
             "\n### Risk Metrics\n",
             "Note: Small or negative values in risk metrics indicate low downside risk, which is expected in a market-neutral strategy.\n",
             f"* Daily Value at Risk (95%): ${metrics['var_95']:,.4f}",
@@ -245,43 +337,190 @@ def generate_monthly_report(
             "| Date | Ticker | Shares Traded | Portfolio Beta | Transaction Cost |",
             "|------|--------|---------------|----------------|------------------|"
         ])
-        # Add table rows
-        for log in transaction_logs:
-            date_str = log['date'].strftime('%Y-%m-%d') if hasattr(log['date'], 'strftime') else str(log['date'])
-            report_content.append(
-                f"| {date_str} | {log['ticker']} | {log['shares_traded']:,.2f} | {log.get('portfolio_beta', 0):,.3f} | ${log['transaction_cost']:.2f} |"
-            )
+        # Add table rows, formatted a column at a time
+        if not isinstance(transaction_logs, TradeLedger):
+            transaction_logs = TradeLedger.from_records(transaction_logs)
+        trades = transaction_logs.to_frame()
+        rows = (
+            "| " + trades["date"].dt.strftime('%Y-%m-%d').fillna("NaT")
+            + " | " + trades["ticker"].astype(str)
+            + " | " + trades["shares_traded"].map("{:,.2f}".format)
+            + " | " + trades["portfolio_beta"].fillna(0).map("{:,.3f}".format)
+            + " | $" + trades["transaction_cost"].map("{:.2f}".format) + " |"
+        )
+        report_content.extend(rows.tolist())
 
         # Calculate and add totals
-        total_shares = sum(abs(log['shares_traded']) for log in transaction_logs)
-        total_cost = sum(log['transaction_cost'] for log in transaction_logs)
+        total_shares = float(np.abs(trades["shares_traded"]).sum())
+        total_cost = float(trades["transaction_cost"].sum())
         report_content.extend([
             "|------|--------|---------------|----------------|------------------|",
             f"| **Total** | — | **{total_shares:,.2f}** | **—** | **${total_cost:.2f}** |",
             "\nNote: Transaction costs are calculated at a rate of $0.01 per share traded. Portfolio Beta shows the portfolio's beta at the time of each trade."
         ])
 
+        return "\n".join(report_content)
+
+    except Exception as e:
+        logger.error(f"Error building monthly report: {str(e)}")
+        raise
+
+
+def generate_monthly_report(
+    simulation_results: pd.DataFrame,
+    market_data: pd.DataFrame,
+    portfolio: Dict[str, float],
+    config: Dict[str, any],
+    transaction_logs: Union[TradeLedger, List[Dict[str, float]]],
+    output_dir: str = "docs",
+    report_name: str = "monthly_report",
+) -> Tuple[Path, Path]:
+    """
+    Generate monthly performance report.
+
+    Args:
+        simulation_results (pd.DataFrame): Daily simulation results
+        market_data (pd.DataFrame): Market data for all tickers
+        portfolio (Dict[str, float]): Portfolio positions
+        config (Dict[str, any]): Configuration parameters
+        transaction_logs (TradeLedger or List[Dict[str, float]]): Transaction logs
+        output_dir (str): Output directory for reports
+        report_name (str): File name of the reports, without extension
+
+    Returns:
+        Tuple[Path, Path]: Paths of the markdown and PDF reports
+    """
+    try:
+        # Create output directory
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+        report_content = build_monthly_report(
+            simulation_results, market_data, portfolio, config, transaction_logs
+        )
+
         # Write markdown report to file
-        report_path = Path(output_dir) / "monthly_report.md"
+        report_path = Path(output_dir) / f"{report_name}.md"
         with open(report_path, "w") as f:
-            f.write("\n".join(report_content))
+            f.write(report_content)
 
         # Generate PDF version
-        pdf_path = Path(output_dir) / "monthly_report.pdf"
-        markdown_to_pdf("\n".join(report_content), str(pdf_path))
+        pdf_path = Path(output_dir) / f"{report_name}.pdf"
+        markdown_to_pdf(report_content, str(pdf_path))
 
         logger.info(f"Monthly report generated: {report_path}")
         logger.info(f"PDF report generated: {pdf_path}")
+        return report_path, pdf_path
 
     except Exception as e:
         logger.error(f"Error generating monthly report: {str(e)}")
         raise
 
 
+def generate_batch_reports(
+    bundles: List[Dict[str, Any]],
+    output_dir: str = "docs/reports",
+    max_workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Generate the monthly reports of many portfolios across a process pool.
+
+    Every bundle is written to its own <name>.md and <name>.pdf, and the
+    reports are built and rendered in worker processes (all cores by
+    default), each of which compiles the PDF stylesheet once. A failing
+    bundle is recorded in the manifest instead of stopping the batch.
+
+    Args:
+        bundles (List[Dict[str, Any]]): One dict per report with the
+            generate_monthly_report arguments simulation_results, market_data,
+            portfolio, config and transaction_logs, and optionally a name
+            (defaults to config["name"], else report_<n>)
+        output_dir (str): Output directory for the reports and manifest.csv
+        max_workers (int, optional): Number of worker processes; 1 renders
+            in this process
+
+    Returns:
+        pd.DataFrame: Manifest with one row per bundle: name, status
+            ("rendered", "unchanged" or "failed"), paths, timings and error
+    """
+    try:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        jobs = [
+            (name, bundle, output_dir)
+            for name, bundle in zip(_report_names(bundles), bundles)
+        ]
+        logger.info(f"Generating {len(jobs)} reports...")
+
+        started = time.perf_counter()
+        if max_workers == 1 or len(jobs) < 2:
+            rows = [_render_report(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                workers = max_workers or os.cpu_count() or 1
+                chunksize = max(1, len(jobs) // (4 * workers))
+                rows = list(executor.map(_render_report, jobs, chunksize=chunksize))
+
+        manifest = pd.DataFrame(rows, columns=MANIFEST_COLUMNS)
+        manifest.to_csv(Path(output_dir) / "manifest.csv", index=False)
+        failed = int((manifest["status"] == "failed").sum())
+        logger.info(
+            f"Generated {len(manifest) - failed} of {len(manifest)} reports "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        return manifest
+
+    except Exception as e:
+        logger.error(f"Error generating batch reports: {str(e)}")
+        raise
+
+
+def _report_names(bundles: List[Dict[str, Any]]) -> List[str]:
+    """File-safe, unique report names."""
+    names = []
+    seen = set()
+    for number, bundle in enumerate(bundles, start=1):
+        name = bundle.get("name") or bundle.get("config", {}).get("name") or f"report_{number:03d}"
+        name = re.sub(r"[^A-Za-z0-9._-]+", "_", str(name)).strip("._") or f"report_{number:03d}"
+        unique, suffix = name, 2
+        while unique.lower() in seen:
+            unique, suffix = f"{name}_{suffix}", suffix + 1
+        seen.add(unique.lower())
+        names.append(unique)
+    return names
+
+
+def _render_report(job: Tuple[str, Dict[str, Any], str]) -> Dict[str, Any]:
+    """Build, write and render one report of a batch, timing each step."""
+    name, bundle, output_dir = job
+    row = {"name": name, "status": "failed", "markdown_path": None, "pdf_path": None,
+           "build_seconds": np.nan, "pdf_seconds": np.nan, "pid": os.getpid(), "error": None}
+    try:
+        started = time.perf_counter()
+        content = build_monthly_report(
+            bundle["simulation_results"], bundle["market_data"], bundle["portfolio"],
+            bundle["config"], bundle["transaction_logs"],
+        )
+        markdown_path = Path(output_dir) / f"{name}.md"
+        markdown_path.write_text(content)
+        row["markdown_path"] = str(markdown_path)
+        row["build_seconds"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        pdf_path = Path(output_dir) / f"{name}.pdf"
+        rendered = markdown_to_pdf(content, str(pdf_path))
+        row["pdf_path"] = str(pdf_path)
+        row["pdf_seconds"] = time.perf_counter() - started
+        row["status"] = "rendered" if rendered else "unchanged"
+    except Exception as e:
+        logger.error(f"Error generating report {name}: {str(e)}")
+        row["error"] = str(e)
+    return row
+
+
 def generate_performance_report(
     portfolio_data: pd.DataFrame,
     performance_metrics: dict,
-    output_dir: str = "reports"
+    output_dir: str = "reports",
+    streaming: bool = False
 ) -> str:
     """
     Generate a detailed performance report in Excel format.
@@ -290,6 +529,8 @@ def generate_performance_report(
         portfolio_data: DataFrame with portfolio performance data
         performance_metrics: Dictionary containing performance metrics
         output_dir: Directory to save the report (default: 'reports')
+        streaming: Write with write-only worksheets in row chunks, for long
+            histories (default: False)
     
     Returns:
         Path to the generated report file
@@ -302,33 +543,64 @@ def generate_performance_report(
     # Format report filename
     report_file = f"{output_dir}/portfolio_performance.xlsx"
     
+    metrics = pd.DataFrame.from_dict(performance_metrics, orient='index', columns=['Value'])
+    if streaming:
+        write_sheets(report_file, {'Portfolio Data': portfolio_data, 'Performance Metrics': metrics})
+        logging.info(f"Performance report generated: {report_file}")
+        return report_file
+
     # Create Excel writer
     with pd.ExcelWriter(report_file) as writer:
         # Write portfolio data
         portfolio_data.to_excel(writer, sheet_name='Portfolio Data')
         
         # Write performance metrics
-        pd.DataFrame.from_dict(
-            performance_metrics,
-            orient='index',
-            columns=['Value']
-        ).to_excel(writer, sheet_name='Performance Metrics')
+        metrics.to_excel(writer, sheet_name='Performance Metrics')
     
     logging.info(f"Performance report generated: {report_file}")
     return report_file
 
 
 def export_to_excel(
-    daily_results: pd.DataFrame, filename: str = "docs/portfolio_performance.xlsx"
+    daily_results: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+    filename: str = "docs/portfolio_performance.xlsx",
+    streaming: bool = False,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
 ) -> None:
     """
     Export detailed performance data to Excel.
 
+    In streaming mode the rows are written in chunks to write-only worksheets,
+    and the rebalancing events and summary statistics are gathered in the
+    same pass (see DailyResultsWriter), so memory does not grow with the
+    length of the history.
+
     Args:
-        daily_results (pd.DataFrame): Daily portfolio performance results
+        daily_results (pd.DataFrame or Iterable[pd.DataFrame]): Daily portfolio
+            performance results, or chunks of them in date order (streamed)
         filename (str): Path to save the Excel file
+        streaming (bool): If True, stream a DataFrame in chunks of chunk_size rows
+        chunk_size (int): Rows per chunk when streaming a DataFrame
     """
     try:
+        if streaming or not isinstance(daily_results, pd.DataFrame):
+            chunks = (
+                iter_chunks(daily_results, chunk_size)
+                if isinstance(daily_results, pd.DataFrame)
+                else daily_results
+            )
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                console=console,
+            ) as progress:
+                task = progress.add_task("[green]Streaming to Excel...", total=None)
+                stream_daily_results(
+                    chunks, filename, on_chunk=lambda chunk: progress.update(task, advance=len(chunk))
+                )
+            logger.info(f"Performance data exported successfully: {filename}")
+            return
+
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
@@ -393,114 +665,3 @@ def export_to_excel(
     except Exception as e:
         logger.error(f"Error exporting to Excel: {str(e)}")
         raise
-
-
-def calculate_portfolio_metrics(simulation_results: pd.DataFrame, market_data: pd.DataFrame) -> dict:
-    """
-    Calculate portfolio performance metrics from simulation results.
-
-    Args:
-        simulation_results (pd.DataFrame): Daily simulation results
-        market_data (pd.DataFrame): Market data for all tickers
-
-    Returns:
-        dict: Dictionary containing calculated metrics
-    """
-    try:
-        # Calculate basic metrics using gross exposure
-        initial_gross_exposure = simulation_results["gross_exposure_usd"].iloc[0]
-        final_gross_exposure = simulation_results["gross_exposure_usd"].iloc[-1]
-        initial_value_usd = simulation_results["portfolio_value_usd"].iloc[0]
-        final_value_usd = simulation_results["portfolio_value_usd"].iloc[-1]
-        
-        # Calculate returns based on gross exposure
-        if initial_gross_exposure > 0:
-            total_return = (final_gross_exposure / initial_gross_exposure) - 1
-            logger.info(f"Total return based on gross exposure: {total_return:.2%}")
-        else:
-            logger.warning("Initial gross exposure is zero or negative")
-            total_return = float('nan')
-        
-        # Calculate annualized return (handle edge cases)
-        trading_days = len(simulation_results)
-        if not np.isnan(total_return) and trading_days > 0:
-            annualized_return = (1 + total_return) ** (252 / trading_days) - 1
-        else:
-            annualized_return = float('nan')
-        
-        # Calculate daily returns using gross exposure
-        daily_returns = simulation_results["daily_return"]
-        
-        # Calculate risk-adjusted metrics
-        risk_free_rate = 0.02  # 2% annual risk-free rate
-        excess_returns = daily_returns - (risk_free_rate / 252)
-        
-        # Handle Sharpe ratio calculation with proper error handling
-        returns_std = daily_returns.std()
-        if returns_std > 0 and not np.isnan(returns_std):
-            sharpe_ratio = np.sqrt(252) * excess_returns.mean() / returns_std
-        else:
-            sharpe_ratio = float('nan')
-            logger.warning("Unable to calculate Sharpe ratio due to zero or undefined volatility")
-        
-        # Calculate maximum drawdown using gross exposure with error handling
-        rolling_max = simulation_results["gross_exposure_usd"].expanding().max()
-        drawdowns = np.where(rolling_max > 0, 
-                           simulation_results["gross_exposure_usd"] / rolling_max - 1,
-                           float('nan'))
-        max_drawdown = float('nan') if np.all(np.isnan(drawdowns)) else np.nanmin(drawdowns)
-        
-        # Calculate portfolio beta
-        portfolio_beta = simulation_results["portfolio_beta"].mean()
-        
-        # Calculate risk metrics with proper scaling and error handling
-        # Convert to percentage for clearer presentation
-        daily_returns_pct = daily_returns * 100
-        
-        # Calculate VaR with minimum sample size check
-        min_samples = 15  # Minimum samples needed for reliable VaR calculation
-        if len(daily_returns_pct) >= min_samples:
-            var_95 = np.percentile(daily_returns_pct, 5)
-            var_99 = np.percentile(daily_returns_pct, 1)
-            
-            # Calculate Expected Shortfall
-            below_var = daily_returns_pct[daily_returns_pct <= var_95]
-            es_95 = below_var.mean() if not below_var.empty else float('nan')
-        else:
-            var_95 = float('nan')
-            var_99 = float('nan')
-            es_95 = float('nan')
-            logger.warning("Insufficient data for reliable VaR calculation")
-        
-        # Calculate fee metrics
-        total_management_fees = simulation_results["management_fee"].sum()
-        total_transaction_costs = simulation_results["transaction_costs"].sum()
-        
-        # Calculate additional market-neutral specific metrics
-        avg_gross_exposure = simulation_results["gross_exposure_usd"].mean()
-        avg_net_exposure = simulation_results["portfolio_value_usd"].mean()
-        net_exposure_ratio = avg_net_exposure / avg_gross_exposure if avg_gross_exposure > 0 else float('nan')
-        
-        return {
-            "initial_value_usd": initial_value_usd,
-            "final_value_usd": final_value_usd,
-            "initial_gross_exposure_usd": initial_gross_exposure,
-            "final_gross_exposure_usd": final_gross_exposure,
-            "total_return": total_return,
-            "annualized_return": annualized_return,
-            "sharpe_ratio": sharpe_ratio,
-            "max_drawdown": max_drawdown,
-            "portfolio_beta": portfolio_beta,
-            "var_95": var_95,
-            "var_99": var_99,
-            "es_95": es_95,
-            "total_management_fees": total_management_fees,
-            "total_transaction_costs": total_transaction_costs,
-            "avg_gross_exposure": avg_gross_exposure,
-            "avg_net_exposure": avg_net_exposure,
-            "net_exposure_ratio": net_exposure_ratio
-        }
-        
-    except Exception as e:
-        logger.error(f"Error calculating portfolio metrics: {str(e)}")
-        raise
@@ -0,0 +1,271 @@
+"""
+Risk metrics module for the hedge fund portfolio project.
+Computes return, risk and exposure metrics of simulation results, over the
+whole sample or as rolling and expanding series.
+"""
+
+import bisect
+import logging
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS_PER_YEAR = 252
+RISK_FREE_RATE = 0.02  # 2% annual risk-free rate
+
+# Minimum samples needed for reliable VaR calculation
+MIN_VAR_SAMPLES = 15
+
+# Elements of the sliding-window blocks used for rolling drawdowns
+_DRAWDOWN_BLOCK = 1_000_000
+
+RISK_METRIC_COLUMNS = [
+    "days",
+    "total_return",
+    "annualized_return",
+    "volatility",
+    "sharpe_ratio",
+    "sortino_ratio",
+    "max_drawdown",
+    "calmar_ratio",
+    "var_95",
+    "var_99",
+    "es_95",
+    "hit_rate",
+    "portfolio_beta",
+    "beta_drift",
+]
+
+
+def compute_risk_metrics(
+    simulation_results: pd.DataFrame,
+    window: Optional[int] = None,
+    risk_free_rate: float = RISK_FREE_RATE,
+) -> pd.DataFrame:
+    """
+    Rolling or expanding risk metrics of daily simulation results.
+
+    The metrics on each date only use the results up to that date: the
+    trailing window days if window is set, otherwise everything since the
+    start (a rolling window is expanding until it fills). Mean, volatility,
+    downside deviation, hit counts and average beta come from one set of
+    windowed cumulative sums, drawdowns from windowed running peaks, and the
+    VaR and expected shortfall percentiles from a sorted window updated one
+    day at a time, so a 20-year history takes milliseconds.
+
+    Returns and drawdowns are measured on gross exposure, as in
+    calculate_portfolio_metrics. Sortino uses the daily risk-free rate as its
+    target, Calmar is the annualized return over the maximum drawdown, the hit
+    rate is the share of days with a positive return and the beta drift is
+    the change in portfolio beta since the first day of the window.
+
+    Args:
+        simulation_results (pd.DataFrame): Daily results from simulate_portfolio
+        window (int, optional): Rolling window in trading days; None for expanding
+        risk_free_rate (float): Annual risk-free rate
+
+    Returns:
+        pd.DataFrame: RISK_METRIC_COLUMNS indexed like simulation_results.
+            var_95, var_99 and es_95 are daily returns in percent, NaN until
+            MIN_VAR_SAMPLES returns are available.
+    """
+    try:
+        if window is not None and window < 2:
+            raise ValueError(f"Window must be at least 2, got {window}")
+
+        returns = simulation_results["daily_return"].to_numpy(dtype=np.float64)
+        gross = simulation_results["gross_exposure_usd"].to_numpy(dtype=np.float64)
+        beta = simulation_results["portfolio_beta"].to_numpy(dtype=np.float64)
+        n_days = len(returns)
+        positions = np.arange(n_days)
+        first = np.zeros(n_days, dtype=np.int64) if window is None else np.maximum(positions - window + 1, 0)
+        days = positions - first + 1
+
+        # Windowed sums of every moment in one cumulative pass
+        daily_rf = risk_free_rate / TRADING_DAYS_PER_YEAR
+        valid = ~np.isnan(returns)
+        r = np.where(valid, returns, 0.0)
+        beta_valid = ~np.isnan(beta)
+        moments = np.column_stack([
+            valid, r, r * r, np.where(valid, np.minimum(r - daily_rf, 0.0) ** 2, 0.0), r > 0,
+            beta_valid, np.where(beta_valid, beta, 0.0),
+        ]).astype(np.float64)
+        sums = np.cumsum(moments, axis=0)
+        if window is not None and window < n_days:
+            sums[window:] -= sums[:-window].copy()
+        count, total, total_sq, downside_sq, hits, beta_count, beta_total = sums.T
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = total / count
+            variance = np.maximum(total_sq - total * mean, 0.0) / (count - 1)
+            std = np.sqrt(variance)
+            downside = np.sqrt(downside_sq / count)
+            sharpe = np.where(std > 0, np.sqrt(TRADING_DAYS_PER_YEAR) * (mean - daily_rf) / std, np.nan)
+            sortino = np.where(downside > 0, np.sqrt(TRADING_DAYS_PER_YEAR) * (mean - daily_rf) / downside, np.nan)
+
+            start_value = gross[first]
+            total_return = np.where(start_value > 0, gross / start_value - 1, np.nan)
+            annualized = (1 + total_return) ** (TRADING_DAYS_PER_YEAR / days) - 1
+            max_drawdown = _max_drawdowns(gross, window)
+            calmar = np.where(max_drawdown < 0, annualized / np.abs(max_drawdown), np.nan)
+            hit_rate = hits / count
+            average_beta = beta_total / beta_count
+
+        var_95, var_99, es_95 = _tail_risk(returns * 100, window)
+
+        metrics = pd.DataFrame(
+            {
+                "days": days,
+                "total_return": total_return,
+                "annualized_return": annualized,
+                "volatility": std * np.sqrt(TRADING_DAYS_PER_YEAR),
+                "sharpe_ratio": sharpe,
+                "sortino_ratio": sortino,
+                "max_drawdown": max_drawdown,
+                "calmar_ratio": calmar,
+                "var_95": var_95,
+                "var_99": var_99,
+                "es_95": es_95,
+                "hit_rate": hit_rate,
+                "portfolio_beta": average_beta,
+                "beta_drift": beta - beta[first],
+            },
+            index=simulation_results.index,
+        )
+        return metrics[RISK_METRIC_COLUMNS]
+
+    except Exception as e:
+        logger.error(f"Error computing risk metrics: {str(e)}")
+        raise
+
+
+def _max_drawdowns(values: np.ndarray, window: Optional[int]) -> np.ndarray:
+    """Largest drop from a running peak within each window (NaN where no peak is positive)."""
+    peaks = np.maximum.accumulate(np.where(np.isnan(values), -np.inf, values))
+    drops = np.where(peaks > 0, values / peaks - 1, np.inf)
+    drawdowns = np.minimum.accumulate(np.where(np.isnan(drops), np.inf, drops))
+
+    if window is not None and window < len(values):
+        # Windows that have filled up restart their peak at the window start
+        windows = sliding_window_view(values, window)
+        step = max(1, _DRAWDOWN_BLOCK // window)
+        for start in range(0, len(windows), step):
+            block = windows[start:start + step]
+            block_peaks = np.fmax.accumulate(block, axis=1)
+            block_drops = np.where(block_peaks > 0, block / block_peaks - 1, np.inf)
+            block_drops[np.isnan(block_drops)] = np.inf
+            drawdowns[window - 1 + start:window - 1 + start + len(block)] = block_drops.min(axis=1)
+
+    drawdowns[np.isinf(drawdowns)] = np.nan
+    return drawdowns
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    """Percentile of sorted values with linear interpolation, as np.percentile."""
+    position = q / 100 * (len(ordered) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _tail_risk(returns: np.ndarray, window: Optional[int]):
+    """VaR (95%, 99%) and expected shortfall (95%) over a sorted sliding window."""
+    var_95 = np.full(len(returns), np.nan)
+    var_99 = np.full(len(returns), np.nan)
+    es_95 = np.full(len(returns), np.nan)
+
+    values = returns.tolist()
+    ordered: List[float] = []
+    for day, value in enumerate(values):
+        if window is not None and day >= window:
+            leaving = values[day - window]
+            if leaving == leaving:
+                del ordered[bisect.bisect_left(ordered, leaving)]
+        if value == value:
+            bisect.insort(ordered, value)
+        if len(ordered) < MIN_VAR_SAMPLES:
+            continue
+
+        var_95[day] = _percentile(ordered, 5)
+        var_99[day] = _percentile(ordered, 1)
+        tail = bisect.bisect_right(ordered, var_95[day])
+        es_95[day] = sum(ordered[:tail]) / tail
+
+    return var_95, var_99, es_95
+
+
+def calculate_portfolio_metrics(simulation_results: pd.DataFrame, market_data: pd.DataFrame) -> dict:
+    """
+    Calculate portfolio performance metrics from simulation results.
+
+    Args:
+        simulation_results (pd.DataFrame): Daily simulation results
+        market_data (pd.DataFrame): Market data for all tickers
+
+    Returns:
+        dict: Dictionary containing calculated metrics
+    """
+    try:
+        # Calculate basic metrics using gross exposure
+        initial_gross_exposure = simulation_results["gross_exposure_usd"].iloc[0]
+        final_gross_exposure = simulation_results["gross_exposure_usd"].iloc[-1]
+        initial_value_usd = simulation_results["portfolio_value_usd"].iloc[0]
+        final_value_usd = simulation_results["portfolio_value_usd"].iloc[-1]
+
+        # Whole-sample metrics are the last row of the expanding ones
+        risk = compute_risk_metrics(simulation_results).iloc[-1]
+
+        if initial_gross_exposure > 0:
+            logger.info(f"Total return based on gross exposure: {risk['total_return']:.2%}")
+        else:
+            logger.warning("Initial gross exposure is zero or negative")
+        if np.isnan(risk["sharpe_ratio"]):
+            logger.warning("Unable to calculate Sharpe ratio due to zero or undefined volatility")
+        if np.isnan(risk["var_95"]):
+            logger.warning("Insufficient data for reliable VaR calculation")
+
+        # Calculate fee metrics
+        total_management_fees = simulation_results["management_fee"].sum()
+        total_transaction_costs = simulation_results["transaction_costs"].sum()
+
+        # Calculate additional market-neutral specific metrics
+        avg_gross_exposure = simulation_results["gross_exposure_usd"].mean()
+        avg_net_exposure = simulation_results["portfolio_value_usd"].mean()
+        net_exposure_ratio = avg_net_exposure / avg_gross_exposure if avg_gross_exposure > 0 else float('nan')
+
+        return {
+            "initial_value_usd": initial_value_usd,
+            "final_value_usd": final_value_usd,
+            "initial_gross_exposure_usd": initial_gross_exposure,
+            "final_gross_exposure_usd": final_gross_exposure,
+            "total_return": risk["total_return"],
+            "annualized_return": risk["annualized_return"],
+            "volatility": risk["volatility"],
+            "sharpe_ratio": risk["sharpe_ratio"],
+            "sortino_ratio": risk["sortino_ratio"],
+            "max_drawdown": risk["max_drawdown"],
+            "calmar_ratio": risk["calmar_ratio"],
+            "hit_rate": risk["hit_rate"],
+            "portfolio_beta": risk["portfolio_beta"],
+            "beta_drift": risk["beta_drift"],
+            "var_95": risk["var_95"],
+            "var_99": risk["var_99"],
+            "es_95": risk["es_95"],
+            "total_management_fees": total_management_fees,
+            "total_transaction_costs": total_transaction_costs,
+            "avg_gross_exposure": avg_gross_exposure,
+            "avg_net_exposure": avg_net_exposure,
+            "net_exposure_ratio": net_exposure_ratio
+        }
+
+    except Exception as e:
+        logger.error(f"Error calculating portfolio metrics: {str(e)}")
+        raise
@@ -0,0 +1,244 @@
+"""
+Parameter sweep module for the hedge fund portfolio project.
+Runs the simulation for a grid of configurations in parallel, sharing one
+copy of the market data between all worker processes.
+"""
+
+import itertools
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Union
+
+import pandas as pd
+
+from .config import BETA_TOLERANCE, SIMULATION_ENGINE, TRANSACTION_FEE_PER_SHARE, load_config
+from .data_acquisition import (
+    download_market_data,
+    export_price_matrix,
+    get_exchange_rates,
+    get_month_window,
+    open_price_matrix,
+    validate_market_data,
+)
+from .performance import calculate_daily_returns, simulate_portfolio
+from .portfolio import compute_betas, compute_rolling_betas, initialize_portfolio
+from .providers import provider_from_config
+from .risk_metrics import calculate_portfolio_metrics
+from .trading_calendar import DEFAULT_CALENDAR
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Keys that change the market data or the betas, which are prepared once for
+# the whole grid, and therefore cannot vary within one sweep
+SHARED_KEYS = (
+    "analysis_year",
+    "analysis_month",
+    "market_index",
+    "data_path",
+    "trading_calendar",
+    "exchange_rates",
+    "beta_window",
+    "beta_halflife",
+)
+
+# Market data shared by the grid points run in the current process
+_worker_data: Dict[str, Any] = {}
+
+
+def expand_grid(grid: Union[Dict[str, List[Any]], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Expand a parameter grid into a list of configuration overrides.
+
+    Args:
+        grid: Either a mapping of config keys to lists of candidate values, whose
+            Cartesian product is taken, or an explicit list of override dicts
+
+    Returns:
+        List[Dict[str, Any]]: One override dict per grid point
+    """
+    if isinstance(grid, dict):
+        keys = list(grid.keys())
+        return [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+    return [dict(point) for point in grid]
+
+
+def run_parameter_sweep(
+    grid: Union[Dict[str, List[Any]], List[Dict[str, Any]]],
+    base_config: Optional[Dict[str, Any]] = None,
+    max_workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Run the simulation for every point of a parameter grid.
+
+    Market data for the union of all tickers is downloaded, validated and
+    turned into returns and betas once. The price panel is exported as a
+    memory-mapped matrix that every worker opens read-only, and each grid
+    point then runs initialize_portfolio, simulate_portfolio and
+    calculate_portfolio_metrics in a process pool.
+
+    Args:
+        grid: Grid of config overrides, see expand_grid. Typical keys are
+            target_portfolio_beta, beta_tolerance, transaction_fee,
+            tickers_long and tickers_short. The SHARED_KEYS cannot be swept.
+        base_config (Dict[str, Any], optional): Configuration the overrides are
+            applied to. Defaults to load_config(). Its beta_window or
+            beta_halflife selects rolling betas, as in run_simulation.
+        max_workers (int, optional): Number of worker processes. Defaults to the
+            number of CPUs; 1 runs every grid point in the current process.
+
+    Returns:
+        pd.DataFrame: One row per grid point with its parameters, the metrics
+                    from calculate_portfolio_metrics and the run time
+    """
+    try:
+        base_config = dict(base_config if base_config is not None else load_config())
+        points = expand_grid(grid)
+        if not points:
+            raise ValueError("Parameter grid is empty")
+
+        shared = {key for point in points for key in point if key in SHARED_KEYS}
+        if shared:
+            raise ValueError(f"Sweep parameters cannot vary {', '.join(sorted(shared))}")
+
+        configs = [{**base_config, **point} for point in points]
+        market_index = base_config["market_index"]
+        tickers = list(dict.fromkeys(
+            ticker
+            for config in configs
+            for ticker in config["tickers_long"] + config["tickers_short"]
+        ))
+
+        # Prepare market data once for the whole grid
+        calendar = base_config.get("trading_calendar", DEFAULT_CALENDAR)
+        start_date, end_date = get_month_window(
+            base_config.get("analysis_year", 2024), base_config.get("analysis_month", 1), calendar
+        )
+        provider = provider_from_config(base_config)
+        market_data = download_market_data(
+            tickers + [market_index], start_date, end_date, provider=provider, calendar=calendar
+        )
+        if not validate_market_data(market_data):
+            raise ValueError("Market data validation failed")
+        exchange_rates = get_exchange_rates(
+            start_date,
+            end_date,
+            simulation=base_config.get("exchange_rates", "simulated") != "market",
+            provider=provider,
+            dates=market_data.index,
+            calendar=calendar,
+        )
+        returns = calculate_daily_returns(market_data).iloc[1:][tickers + [market_index]]
+        if base_config.get("beta_window") or base_config.get("beta_halflife"):
+            betas = compute_rolling_betas(
+                returns,
+                market_index,
+                window=base_config.get("beta_window"),
+                halflife=base_config.get("beta_halflife"),
+            ).reindex(market_data.index)
+            # The portfolio is sized with the first complete row, as in run_simulation
+            complete_betas = betas.dropna()
+            if len(complete_betas):
+                initial_betas = complete_betas.iloc[0].to_dict()
+            else:
+                initial_betas = compute_betas(returns, market_index)["beta"].to_dict()
+        else:
+            betas = compute_betas(returns, market_index)["beta"].to_dict()
+            initial_betas = betas
+
+        logger.info(f"Running parameter sweep over {len(configs)} grid points...")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            matrix_path = export_price_matrix(market_data, os.path.join(temp_dir, "market_data"))
+            init_args = (matrix_path, exchange_rates, betas, initial_betas)
+
+            if max_workers == 1:
+                _init_worker(*init_args)
+                rows = [_run_grid_point(config) for config in configs]
+            else:
+                with ProcessPoolExecutor(
+                    max_workers=max_workers, initializer=_init_worker, initargs=init_args
+                ) as executor:
+                    workers = max_workers or os.cpu_count() or 1
+                    chunksize = max(1, len(configs) // (4 * workers))
+                    rows = list(executor.map(_run_grid_point, configs, chunksize=chunksize))
+
+        results = pd.DataFrame(
+            [{**point, **row} for point, row in zip(points, rows)],
+            index=pd.RangeIndex(len(points), name="grid_point"),
+        )
+        logger.info(f"Parameter sweep completed: {len(results)} grid points")
+        return results
+
+    except Exception as e:
+        logger.error(f"Error running parameter sweep: {str(e)}")
+        raise
+
+
+def _init_worker(
+    matrix_path: str,
+    exchange_rates: pd.Series,
+    betas: Union[Dict[str, float], pd.DataFrame],
+    initial_betas: Dict[str, float],
+) -> None:
+    """Open the shared price matrix once per worker process."""
+    _worker_data["market_data"] = open_price_matrix(matrix_path)
+    _worker_data["exchange_rates"] = exchange_rates
+    _worker_data["betas"] = betas
+    _worker_data["initial_betas"] = initial_betas
+
+
+def _run_grid_point(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Initialize and simulate the portfolio for one configuration."""
+    started = time.perf_counter()
+    market_data = _worker_data["market_data"]
+    betas = _worker_data["betas"]
+    transaction_fee = config.get("transaction_fee", TRANSACTION_FEE_PER_SHARE)
+    beta_tolerance = config.get("beta_tolerance", BETA_TOLERANCE)
+
+    tickers = config["tickers_long"] + config["tickers_short"]
+    prices = market_data[tickers]
+    portfolio, initial_cost, _ = initialize_portfolio(
+        config["initial_capital"],
+        prices.iloc[0].to_dict(),
+        config["tickers_long"],
+        config["tickers_short"],
+        _worker_data["initial_betas"],
+        prices.index[0],
+        transaction_fee=transaction_fee,
+    )
+    simulation_results, transaction_logs = simulate_portfolio(
+        prices,
+        portfolio,
+        betas,
+        _worker_data["exchange_rates"],
+        config.get("management_fee", 0.02),
+        config["target_portfolio_beta"],
+        engine=config.get("simulation_engine", SIMULATION_ENGINE),
+        beta_tolerance=beta_tolerance,
+        transaction_fee=transaction_fee,
+        rebalance_method=config.get("rebalance_method", "heuristic"),
+        initial_betas=_worker_data["initial_betas"],
+    )
+
+    metrics = calculate_portfolio_metrics(simulation_results, prices)
+    metrics["initial_transaction_costs"] = initial_cost
+    metrics["rebalances"] = int(simulation_results["rebalanced"].sum())
+    metrics["trades"] = len(transaction_logs)
+    metrics["run_seconds"] = time.perf_counter() - started
+    return metrics
+
+
+if __name__ == "__main__":
+    config = load_config()
+    if "sweep" not in config:
+        raise SystemExit("Add a 'sweep' grid to config.yaml to run a parameter sweep")
+    sweep_results = run_parameter_sweep(config.pop("sweep"), config)
+    os.makedirs("docs", exist_ok=True)
+    sweep_results.to_csv(os.path.join("docs", "parameter_sweep.csv"))
+    print(sweep_results.to_string())
@@ -0,0 +1,402 @@
+"""
+Trade ledger module for the hedge fund portfolio project.
+Stores transaction logs in typed columns instead of one dictionary per trade.
+"""
+
+import logging
+import os
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Columns of a transaction log, in the order they are exported
+TRADE_LOG_COLUMNS = ["date", "ticker", "shares_traded", "price", "portfolio_beta", "transaction_cost"]
+
+# Stored columns and their types; tickers are kept as ids into TradeLedger.tickers
+LEDGER_FIELDS = {
+    "date": "datetime64[ns]",
+    "ticker_id": np.int32,
+    "shares_traded": np.float64,
+    "price": np.float64,
+    "portfolio_beta": np.float64,
+    "transaction_cost": np.float64,
+}
+
+# Rows allocated by a new ledger; capacity doubles whenever it is full
+LEDGER_CAPACITY = 64
+
+# Rows kept in memory before a ledger with a spill directory writes them to Parquet
+SPILL_ROWS = 1_000_000
+
+
+class TradeLedger:
+    """
+    Append-only columnar store of transaction logs.
+
+    Each trade is one row of preallocated NumPy arrays (date, ticker id,
+    shares traded, price, portfolio beta and transaction cost) that grow
+    by doubling, so logging a rebalance is a few array copies and a run
+    with millions of trades holds six arrays instead of millions of
+    dictionaries. Aggregations per ticker and per day are vectorized.
+
+    With a spill directory, rows beyond spill_rows are written to Parquet
+    parts and their buffers are shrunk back to at most spill_rows rows;
+    aggregations, exports and iteration read the parts back one at a time.
+
+    The ledger still iterates as transaction log dictionaries with the keys
+    of TRADE_LOG_COLUMNS, compares equal to such a list, and is falsy when
+    empty, so code written for List[Dict] logs keeps working.
+    """
+
+    def __init__(
+        self,
+        tickers: Optional[List[str]] = None,
+        capacity: int = LEDGER_CAPACITY,
+        spill_dir: Optional[str] = None,
+        spill_rows: int = SPILL_ROWS,
+    ):
+        """
+        Args:
+            tickers (List[str], optional): Initial ticker ids; other tickers are added as they trade
+            capacity (int): Rows allocated up front
+            spill_dir (str, optional): Directory of the Parquet parts. Defaults to keeping
+                every row in memory.
+            spill_rows (int): Rows kept in memory before they are spilled
+        """
+        self.tickers = list(tickers) if tickers is not None else []
+        self._index: Optional[Dict[str, int]] = None
+        self._columns = self._allocate(capacity)
+        self._size = 0
+        self.spill_dir = spill_dir
+        self.spill_rows = spill_rows
+        self._parts: List[str] = []
+        self._spilled_rows = 0
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, **kwargs) -> "TradeLedger":
+        """Build a ledger from a DataFrame with the TRADE_LOG_COLUMNS columns."""
+        codes, tickers = pd.factorize(frame["ticker"], sort=False)
+        ledger = cls(list(tickers), capacity=len(frame), **kwargs)
+        ledger.append_many(
+            pd.to_datetime(frame["date"]).to_numpy(dtype="datetime64[ns]"),
+            codes,
+            frame["shares_traded"].to_numpy(dtype=np.float64),
+            frame["price"].to_numpy(dtype=np.float64),
+            frame["portfolio_beta"].to_numpy(dtype=np.float64),
+            frame["transaction_cost"].to_numpy(dtype=np.float64),
+        )
+        return ledger
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]], **kwargs) -> "TradeLedger":
+        """Build a ledger from transaction log dictionaries."""
+        return cls.from_frame(pd.DataFrame(list(records), columns=TRADE_LOG_COLUMNS), **kwargs)
+
+    @classmethod
+    def read_parquet(cls, path: str, **kwargs) -> "TradeLedger":
+        """Load a ledger written by to_parquet."""
+        return cls.from_frame(pd.read_parquet(path), **kwargs)
+
+    def ticker_id(self, ticker: str) -> int:
+        """Id of a ticker, adding it to the ledger's tickers if it is new."""
+        if self._index is None:
+            self._index = {name: i for i, name in enumerate(self.tickers)}
+        ticker_id = self._index.get(ticker)
+        if ticker_id is None:
+            ticker_id = self._index[ticker] = len(self.tickers)
+            self.tickers.append(ticker)
+        return ticker_id
+
+    def append(
+        self,
+        date,
+        ticker: str,
+        shares_traded: float,
+        price: float,
+        portfolio_beta: float,
+        transaction_cost: float,
+    ) -> None:
+        """Record one trade."""
+        self._reserve(1)
+        i = self._size
+        columns = self._columns
+        columns["date"][i] = pd.Timestamp(date).to_datetime64()
+        columns["ticker_id"][i] = self.ticker_id(ticker)
+        columns["shares_traded"][i] = shares_traded
+        columns["price"][i] = price
+        columns["portfolio_beta"][i] = portfolio_beta
+        columns["transaction_cost"][i] = transaction_cost
+        self._size += 1
+        self._maybe_spill()
+
+    def append_many(
+        self,
+        date,
+        ticker_ids,
+        shares_traded,
+        price,
+        portfolio_beta,
+        transaction_cost,
+    ) -> None:
+        """
+        Record a batch of trades.
+
+        Args:
+            date: Trade date, or an array of dates
+            ticker_ids: Ids into the ledger's tickers
+            shares_traded: Shares traded per trade
+            price: Price per trade
+            portfolio_beta: Portfolio beta, as a scalar or per trade
+            transaction_cost: Transaction cost per trade
+        """
+        ticker_ids = np.asarray(ticker_ids)
+        n = len(ticker_ids)
+        if n == 0:
+            return
+        if np.ndim(date) == 0:
+            date = pd.Timestamp(date).to_datetime64()
+        self._reserve(n)
+        rows = slice(self._size, self._size + n)
+        columns = self._columns
+        columns["date"][rows] = date
+        columns["ticker_id"][rows] = ticker_ids
+        columns["shares_traded"][rows] = shares_traded
+        columns["price"][rows] = price
+        columns["portfolio_beta"][rows] = portfolio_beta
+        columns["transaction_cost"][rows] = transaction_cost
+        self._size += n
+        self._maybe_spill()
+
+    def extend(self, other: "TradeLedger") -> "TradeLedger":
+        """Append the trades of another ledger (or a list of transaction logs) and return self."""
+        if not isinstance(other, TradeLedger):
+            other = TradeLedger.from_records(other)
+        if len(self) == 0 and not self.tickers:
+            self.tickers = list(other.tickers)
+            self._index = None
+        if other.tickers == self.tickers:
+            mapping = None
+        else:
+            mapping = np.array([self.ticker_id(ticker) for ticker in other.tickers], dtype=np.int32)
+        for chunk in other._chunks():
+            ids = chunk["ticker_id"] if mapping is None else mapping[chunk["ticker_id"]]
+            self.append_many(
+                chunk["date"], ids, chunk["shares_traded"], chunk["price"],
+                chunk["portfolio_beta"], chunk["transaction_cost"],
+            )
+        return self
+
+    def spill(self) -> None:
+        """Write the rows held in memory to a new Parquet part and free their buffers."""
+        if self.spill_dir is None:
+            raise ValueError("TradeLedger has no spill directory")
+        if self._size == 0:
+            return
+        os.makedirs(self.spill_dir, exist_ok=True)
+        # Uniquely named, so ledgers sharing a spill directory keep their own parts
+        handle, path = tempfile.mkstemp(prefix="trades-", suffix=".parquet", dir=self.spill_dir)
+        os.close(handle)
+        pd.DataFrame(self._memory_chunk()).to_parquet(path, index=False)
+        self._parts.append(path)
+        self._spilled_rows += self._size
+        self._size = 0
+        # Shrink the buffers if they have grown past spill_rows, e.g. for a large batch
+        if len(self._columns["ticker_id"]) > self.spill_rows:
+            self._columns = self._allocate(self.spill_rows)
+        logger.debug(f"Spilled trade ledger to {path} ({self._spilled_rows} rows on disk)")
+
+    def memory_usage(self) -> int:
+        """Bytes allocated for the rows kept in memory."""
+        return sum(values.nbytes for values in self._columns.values())
+
+    def column(self, name: str) -> np.ndarray:
+        """One column of the whole ledger, with tickers as names."""
+        if name == "ticker":
+            ids = self.column("ticker_id")
+            return np.asarray(self.tickers, dtype=object)[ids] if len(ids) else np.array([], dtype=object)
+        parts = [chunk[name] for chunk in self._chunks()]
+        if not parts:
+            return np.array([], dtype=LEDGER_FIELDS[name])
+        return parts[0].copy() if len(parts) == 1 else np.concatenate(parts)
+
+    def to_frame(self, start: int = 0) -> pd.DataFrame:
+        """
+        Trades as a DataFrame with the TRADE_LOG_COLUMNS columns.
+
+        Args:
+            start (int): Position of the first trade to include
+
+        Returns:
+            pd.DataFrame: One row per trade, tickers as a categorical column
+        """
+        frames = []
+        offset = 0
+        for chunk in self._chunks():
+            size = len(chunk["ticker_id"])
+            if offset + size > start:
+                skip = max(start - offset, 0)
+                frames.append(self._chunk_frame({name: values[skip:] for name, values in chunk.items()}))
+            offset += size
+        if not frames:
+            return self._chunk_frame({name: np.array([], dtype=dtype) for name, dtype in LEDGER_FIELDS.items()})
+        return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+    def to_parquet(self, path: str) -> str:
+        """Write the trades to one Parquet file, a row group per spilled part."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for chunk in self._chunks():
+                table = pa.Table.from_pandas(self._chunk_frame(chunk), preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+            if writer is None:
+                self.to_frame().to_parquet(path, index=False)
+        finally:
+            if writer is not None:
+                writer.close()
+        return path
+
+    def by_ticker(self) -> pd.DataFrame:
+        """
+        Trade count, shares traded, traded notional and transaction costs per ticker.
+
+        Returns:
+            pd.DataFrame: Indexed by ticker, for the tickers that traded
+        """
+        n = len(self.tickers)
+        totals = np.zeros((4, n))
+        for chunk in self._chunks():
+            ids = chunk["ticker_id"]
+            shares = np.abs(chunk["shares_traded"])
+            totals[0] += np.bincount(ids, minlength=n)
+            totals[1] += np.bincount(ids, weights=shares, minlength=n)
+            totals[2] += np.bincount(ids, weights=shares * chunk["price"], minlength=n)
+            totals[3] += np.bincount(ids, weights=chunk["transaction_cost"], minlength=n)
+        summary = pd.DataFrame(
+            {
+                "trades": totals[0].astype(np.int64),
+                "shares_traded": totals[1],
+                "notional": totals[2],
+                "transaction_cost": totals[3],
+            },
+            index=pd.Index(self.tickers, name="ticker"),
+        )
+        return summary[summary["trades"] > 0]
+
+    def by_day(self) -> pd.DataFrame:
+        """
+        Trade count, shares traded, traded notional and transaction costs per day.
+
+        Returns:
+            pd.DataFrame: Indexed by date, for the days with trades
+        """
+        frames = []
+        for chunk in self._chunks():
+            days, inverse = np.unique(chunk["date"], return_inverse=True)
+            shares = np.abs(chunk["shares_traded"])
+            frames.append(pd.DataFrame(
+                {
+                    "trades": np.bincount(inverse).astype(np.int64),
+                    "shares_traded": np.bincount(inverse, weights=shares),
+                    "notional": np.bincount(inverse, weights=shares * chunk["price"]),
+                    "transaction_cost": np.bincount(inverse, weights=chunk["transaction_cost"]),
+                },
+                index=pd.DatetimeIndex(days, name="date"),
+            ))
+        if not frames:
+            return pd.DataFrame(
+                {"trades": np.array([], dtype=np.int64), "shares_traded": [], "notional": [], "transaction_cost": []},
+                index=pd.DatetimeIndex([], name="date"),
+            )
+        # A day can be split across two spilled parts
+        return frames[0] if len(frames) == 1 else pd.concat(frames).groupby(level=0).sum()
+
+    def __len__(self) -> int:
+        return self._spilled_rows + self._size
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        names = np.asarray(self.tickers, dtype=object)
+        for chunk in self._chunks():
+            columns = zip(
+                pd.DatetimeIndex(chunk["date"]),
+                names[chunk["ticker_id"]].tolist() if len(names) else [],
+                chunk["shares_traded"].tolist(),
+                chunk["price"].tolist(),
+                chunk["portfolio_beta"].tolist(),
+                chunk["transaction_cost"].tolist(),
+            )
+            for row in columns:
+                yield dict(zip(TRADE_LOG_COLUMNS, row))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, list):
+            other = TradeLedger.from_records(other)
+        if not isinstance(other, TradeLedger):
+            return NotImplemented
+        if len(self) != len(other):
+            return False
+        return (
+            np.array_equal(self.column("date").view(np.int64), other.column("date").view(np.int64))
+            and np.array_equal(self.column("ticker"), other.column("ticker"))
+            and all(
+                np.array_equal(self.column(name), other.column(name), equal_nan=True)
+                for name in ("shares_traded", "price", "portfolio_beta", "transaction_cost")
+            )
+        )
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"TradeLedger({len(self)} trades, {len(self.tickers)} tickers)"
+
+    def _reserve(self, n: int) -> None:
+        """Grow the arrays to hold n more rows."""
+        capacity = len(self._columns["ticker_id"])
+        if self._size + n <= capacity:
+            return
+        capacity = max(2 * capacity, self._size + n)
+        for name, values in self._columns.items():
+            grown = np.empty(capacity, dtype=values.dtype)
+            grown[:self._size] = values[:self._size]
+            self._columns[name] = grown
+
+    @staticmethod
+    def _allocate(capacity: int) -> Dict[str, np.ndarray]:
+        return {name: np.empty(max(capacity, 1), dtype=dtype) for name, dtype in LEDGER_FIELDS.items()}
+
+    def _maybe_spill(self) -> None:
+        if self.spill_dir is not None and self._size >= self.spill_rows:
+            self.spill()
+
+    def _memory_chunk(self) -> Dict[str, np.ndarray]:
+        return {name: values[:self._size] for name, values in self._columns.items()}
+
+    def _chunks(self) -> Iterator[Dict[str, np.ndarray]]:
+        """Columns of each spilled part, then of the rows in memory."""
+        for path in self._parts:
+            part = pd.read_parquet(path)
+            yield {name: part[name].to_numpy(dtype=dtype) for name, dtype in LEDGER_FIELDS.items()}
+        if self._size:
+            yield self._memory_chunk()
+
+    def _chunk_frame(self, chunk: Dict[str, np.ndarray]) -> pd.DataFrame:
+        return pd.DataFrame({
+            "date": chunk["date"],
+            "ticker": pd.Categorical.from_codes(chunk["ticker_id"], categories=self.tickers),
+            "shares_traded": chunk["shares_traded"],
+            "price": chunk["price"],
+            "portfolio_beta": chunk["portfolio_beta"],
+            "transaction_cost": chunk["transaction_cost"],
+        })
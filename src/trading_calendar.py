@@ -0,0 +1,192 @@
+"""
+Trading calendar module for the hedge fund portfolio project.
+Provides the trading sessions of the NYSE and the TSX so date ranges,
+downloads and exchange rates only cover days the markets are open.
+"""
+
+import logging
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar,
+    GoodFriday,
+    Holiday,
+    USLaborDay,
+    USMemorialDay,
+    USPresidentsDay,
+    USThanksgivingDay,
+    nearest_workday,
+    next_monday,
+    next_monday_or_tuesday,
+    sunday_to_monday,
+)
+from pandas.tseries.offsets import DateOffset
+from dateutil.relativedelta import MO
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Calendar used when none is configured
+DEFAULT_CALENDAR = "NYSE"
+
+
+class NYSEHolidayCalendar(AbstractHolidayCalendar):
+    """Regular full-day holidays of the New York Stock Exchange."""
+
+    rules = [
+        Holiday("New Year's Day", month=1, day=1, observance=sunday_to_monday),
+        Holiday("Martin Luther King Jr. Day", start_date="1998-01-01", month=1, day=1,
+                offset=DateOffset(weekday=MO(3))),
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday("Juneteenth", start_date="2022-01-01", month=6, day=19, observance=nearest_workday),
+        Holiday("Independence Day", month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday("Christmas Day", month=12, day=25, observance=nearest_workday),
+    ]
+
+
+class TSXHolidayCalendar(AbstractHolidayCalendar):
+    """Regular full-day holidays of the Toronto Stock Exchange."""
+
+    rules = [
+        Holiday("New Year's Day", month=1, day=1, observance=next_monday),
+        Holiday("Family Day", start_date="2008-01-01", month=2, day=1, offset=DateOffset(weekday=MO(3))),
+        GoodFriday,
+        Holiday("Victoria Day", month=5, day=24, offset=DateOffset(weekday=MO(-1))),
+        Holiday("Canada Day", month=7, day=1, observance=next_monday),
+        Holiday("Civic Holiday", month=8, day=1, offset=DateOffset(weekday=MO(1))),
+        USLaborDay,
+        Holiday("Thanksgiving", month=10, day=1, offset=DateOffset(weekday=MO(2))),
+        Holiday("Christmas Day", month=12, day=25, observance=next_monday),
+        Holiday("Boxing Day", month=12, day=26, observance=next_monday_or_tuesday),
+    ]
+
+
+# One-off closures (national days of mourning, emergencies)
+SPECIAL_CLOSURES = {
+    "NYSE": [
+        "2001-09-11", "2001-09-12", "2001-09-13", "2001-09-14",
+        "2004-06-11", "2007-01-02", "2012-10-29", "2012-10-30",
+        "2018-12-05", "2025-01-09",
+    ],
+    "TSX": ["2001-09-11", "2001-09-12"],
+}
+
+CALENDARS = {"NYSE": NYSEHolidayCalendar, "TSX": TSXHolidayCalendar}
+
+
+@lru_cache(maxsize=None)
+def _year_sessions(exchange: str, year: int) -> np.ndarray:
+    """Sorted, read-only datetime64 array of one exchange's sessions in one year."""
+    if exchange not in CALENDARS:
+        raise ValueError(f"Unknown trading calendar: {exchange} (expected one of {', '.join(CALENDARS)})")
+    weekdays = pd.bdate_range(f"{year}-01-01", f"{year}-12-31")
+    closed = CALENDARS[exchange]().holidays(weekdays[0], weekdays[-1])
+    closed = closed.union(pd.DatetimeIndex(SPECIAL_CLOSURES.get(exchange, [])))
+    sessions = weekdays.difference(closed).to_numpy(dtype="datetime64[ns]")
+    sessions.setflags(write=False)
+    return sessions
+
+
+@lru_cache(maxsize=64)
+def _sessions(exchange: str, first_year: int, last_year: int) -> np.ndarray:
+    """Sessions of a span of years, concatenated from the per-year arrays."""
+    sessions = np.concatenate([_year_sessions(exchange, year) for year in range(first_year, last_year + 1)])
+    sessions.setflags(write=False)
+    return sessions
+
+
+def trading_sessions(
+    start_date: str, end_date: str, exchange: str = DEFAULT_CALENDAR
+) -> pd.DatetimeIndex:
+    """
+    Trading sessions between two dates.
+
+    Args:
+        start_date (str): Start date in 'YYYY-MM-DD' format
+        end_date (str): End date in 'YYYY-MM-DD' format (inclusive)
+        exchange (str): "NYSE" or "TSX"
+
+    Returns:
+        pd.DatetimeIndex: Sessions in [start_date, end_date], named "Date"
+    """
+    start = pd.Timestamp(start_date)
+    end = pd.Timestamp(end_date)
+    if end < start:
+        return pd.DatetimeIndex([], name="Date")
+    sessions = _sessions(exchange, start.year, end.year)
+    first = sessions.searchsorted(start.to_datetime64(), side="left")
+    last = sessions.searchsorted(end.to_datetime64(), side="right")
+    return pd.DatetimeIndex(sessions[first:last], name="Date")
+
+
+def is_trading_day(date, exchange: str = DEFAULT_CALENDAR) -> bool:
+    """
+    Whether the exchange is open on a date.
+
+    Args:
+        date: Date as a string or timestamp
+        exchange (str): "NYSE" or "TSX"
+
+    Returns:
+        bool: True if the date is a session
+    """
+    day = pd.Timestamp(date).normalize()
+    sessions = _year_sessions(exchange, day.year)
+    position = sessions.searchsorted(day.to_datetime64())
+    return bool(position < len(sessions) and sessions[position] == day.to_datetime64())
+
+
+def session_window(
+    start_date: str, end_date: str, exchange: str = DEFAULT_CALENDAR
+) -> Optional[Tuple[str, str]]:
+    """
+    Shrink a half-open date range to the sessions it contains.
+
+    Args:
+        start_date (str): Start date in 'YYYY-MM-DD' format
+        end_date (str): End date in 'YYYY-MM-DD' format (exclusive)
+        exchange (str): "NYSE" or "TSX"
+
+    Returns:
+        Optional[Tuple[str, str]]: First session and the day after the last
+            session, or None if the range has no sessions
+    """
+    last_day = pd.Timestamp(end_date) - pd.Timedelta(days=1)
+    sessions = trading_sessions(start_date, last_day, exchange)
+    if sessions.empty:
+        return None
+    return (
+        sessions[0].strftime("%Y-%m-%d"),
+        (sessions[-1] + pd.Timedelta(days=1)).strftime("%Y-%m-%d"),
+    )
+
+
+def offset_sessions(date, count: int, exchange: str = DEFAULT_CALENDAR) -> pd.Timestamp:
+    """
+    Session a number of sessions away from a date.
+
+    Args:
+        date: Date as a string or timestamp, need not be a session
+        count (int): Sessions to move; negative counts go back from the first
+            session on or after date, positive ones forward from it
+        exchange (str): "NYSE" or "TSX"
+
+    Returns:
+        pd.Timestamp: The session reached
+    """
+    day = pd.Timestamp(date).normalize()
+    # Enough years on either side to cover the move (about 250 sessions a year)
+    span = abs(count) // 240 + 1
+    sessions = _sessions(exchange, day.year - span, day.year + span)
+    position = sessions.searchsorted(day.to_datetime64()) + count
+    return pd.Timestamp(sessions[position])
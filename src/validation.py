@@ -0,0 +1,339 @@
+"""
+Market data validation module for the hedge fund portfolio project.
+Checks price panels for quality problems in a single vectorized pass and
+reports them per ticker, optionally only scanning newly appended rows.
+"""
+
+import logging
+import warnings
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Default thresholds
+MIN_TRADING_DAYS = 15
+JUMP_THRESHOLD = 0.25  # Absolute daily return treated as a price jump
+OUTLIER_ZSCORE = 8.0  # Robust z-score (median / MAD) treated as an outlier return
+STALE_DAYS = 5  # Consecutive unchanged closes treated as a stale price
+
+# Per-ticker columns of the report
+REPORT_COLUMNS = [
+    "observations",
+    "missing",
+    "non_positive",
+    "coverage",
+    "first_date",
+    "last_date",
+    "max_stale_run",
+    "stale",
+    "jumps",
+    "outliers",
+    "max_abs_return",
+]
+
+
+class ValidationReport:
+    """
+    Result of validating a price panel.
+
+    Errors make the data unusable for the simulation (missing or non-positive
+    prices, too few or out-of-order dates); warnings flag suspicious but usable
+    data (stale prices, jumps, outlier returns).
+
+    Attributes:
+        tickers (pd.DataFrame): One row per ticker with the REPORT_COLUMNS
+        rows (int): Number of dates validated
+        start (pd.Timestamp): First date, None if there are no rows
+        end (pd.Timestamp): Last date, None if there are no rows
+        duplicate_dates (int): Number of repeated dates
+        monotonic (bool): Whether dates never decrease
+        errors (List[str]): Problems that fail validation
+        warnings (List[str]): Problems worth a look that do not fail validation
+    """
+
+    def __init__(
+        self,
+        tickers: pd.DataFrame,
+        rows: int,
+        start: Optional[pd.Timestamp],
+        end: Optional[pd.Timestamp],
+        duplicate_dates: int,
+        monotonic: bool,
+        errors: List[str],
+        warnings: List[str],
+    ):
+        self.tickers = tickers
+        self.rows = rows
+        self.start = start
+        self.end = end
+        self.duplicate_dates = duplicate_dates
+        self.monotonic = monotonic
+        self.errors = errors
+        self.warnings = warnings
+
+    @property
+    def passed(self) -> bool:
+        """True if the data has no errors."""
+        return not self.errors
+
+    def __repr__(self) -> str:
+        status = "passed" if self.passed else f"{len(self.errors)} errors"
+        return (
+            f"ValidationReport({len(self.tickers)} tickers, {self.rows} rows, {status}, "
+            f"{len(self.warnings)} warnings)"
+        )
+
+
+class MarketDataValidator:
+    """
+    Single-pass quality checks for price panels.
+
+    validate scans a whole panel; update then scans only rows appended since,
+    carrying the last prices, stale runs and counts forward so the cumulative
+    report matches a full rescan. The outlier scale (median and MAD of each
+    ticker's returns) is fixed by the last full validation.
+
+    Args:
+        min_trading_days (int): Minimum number of dates
+        jump_threshold (float): Absolute daily return reported as a jump
+        outlier_zscore (float): Robust z-score reported as an outlier return
+        stale_days (int): Consecutive unchanged closes reported as stale
+    """
+
+    def __init__(
+        self,
+        min_trading_days: int = MIN_TRADING_DAYS,
+        jump_threshold: float = JUMP_THRESHOLD,
+        outlier_zscore: float = OUTLIER_ZSCORE,
+        stale_days: int = STALE_DAYS,
+    ):
+        self.min_trading_days = min_trading_days
+        self.jump_threshold = jump_threshold
+        self.outlier_zscore = outlier_zscore
+        self.stale_days = stale_days
+        self.report: Optional[ValidationReport] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self._columns: List[str] = []
+        self._counts: Optional[pd.DataFrame] = None
+        self._last_row: Optional[np.ndarray] = None
+        self._last_date: Optional[int] = None
+        self._stale_run: Optional[np.ndarray] = None
+        self._center: Optional[np.ndarray] = None
+        self._scale: Optional[np.ndarray] = None
+        self._rows = 0
+        self._start: Optional[pd.Timestamp] = None
+        self._duplicates = 0
+        self._monotonic = True
+
+    def validate(self, market_data: pd.DataFrame) -> ValidationReport:
+        """
+        Validate a whole price panel, replacing any state from earlier calls.
+
+        Args:
+            market_data (pd.DataFrame): Prices indexed by date, one column per ticker
+
+        Returns:
+            ValidationReport: Quality report for the panel
+        """
+        self._reset()
+        if market_data.empty:
+            self.report = ValidationReport(
+                pd.DataFrame(columns=REPORT_COLUMNS), 0, None, None, 0, True,
+                ["Market data is empty"], [],
+            )
+            return self.report
+
+        self._columns = list(market_data.columns)
+        values = market_data.to_numpy(dtype=np.float64)
+
+        # Outlier scale from this panel's returns, reused by later updates
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = values[1:] / values[:-1] - 1.0
+        returns[~np.isfinite(returns)] = np.nan
+        if len(returns):
+            # Tickers without any returns have no scale and are never outliers
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", category=RuntimeWarning)
+                median = np.nanmedian if np.isnan(returns).any() else np.median
+                # One contiguous row per ticker, so each median partitions a contiguous block
+                by_ticker = np.ascontiguousarray(returns.T)
+                self._center = median(by_ticker, axis=1)
+                self._scale = 1.4826 * median(np.abs(by_ticker - self._center[:, None]), axis=1)
+        else:
+            self._center = np.zeros(len(self._columns))
+            self._scale = np.zeros(len(self._columns))
+
+        self._scan(market_data.index, values, returns, duplicates=int(market_data.index.duplicated().sum()))
+        return self.report
+
+    def update(self, new_rows: pd.DataFrame) -> ValidationReport:
+        """
+        Validate rows appended to the panel passed to validate.
+
+        Only the new rows are scanned; the report covers the whole panel.
+
+        Args:
+            new_rows (pd.DataFrame): Rows dated after the ones already validated,
+                with the same columns
+
+        Returns:
+            ValidationReport: Quality report for all rows seen so far
+        """
+        if self._counts is None:
+            return self.validate(new_rows)
+        if new_rows.empty:
+            return self.report
+        if list(new_rows.columns) != self._columns:
+            raise ValueError("Appended rows must have the same columns as the validated panel")
+
+        values = new_rows.to_numpy(dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = values / np.vstack([self._last_row, values[:-1]]) - 1.0
+        returns[~np.isfinite(returns)] = np.nan
+
+        dates = pd.DatetimeIndex(new_rows.index).asi8
+        steps = np.diff(np.concatenate([[self._last_date], dates]))
+        self._scan(new_rows.index, values, returns, duplicates=int((steps == 0).sum()), first_step=steps[0])
+        return self.report
+
+    def _scan(
+        self,
+        index: pd.Index,
+        values: np.ndarray,
+        returns: np.ndarray,
+        duplicates: int,
+        first_step: Optional[int] = None,
+    ) -> None:
+        """Update the running counts with one block of rows and rebuild the report."""
+        dates = pd.DatetimeIndex(index)
+        valid = np.isfinite(values)
+        with np.errstate(invalid="ignore"):
+            non_positive = (values <= 0).sum(axis=0)
+
+            # Stale prices: runs of unchanged closes, continuing the run carried over
+            unchanged = returns == 0.0
+            if len(unchanged) < len(values):
+                unchanged = np.vstack([np.zeros((1, values.shape[1]), dtype=bool), unchanged])
+            carried = self._stale_run if self._stale_run is not None else np.zeros(values.shape[1], dtype=int)
+            max_stale_run = np.zeros(values.shape[1], dtype=int)
+            self._stale_run = np.zeros(values.shape[1], dtype=int)
+            active = unchanged.any(axis=0)
+            if active.any():
+                # Run lengths are the unchanged count minus the count at the last change
+                counts = np.cumsum(unchanged[:, active], axis=0) + carried[active]
+                resets = np.maximum.accumulate(np.where(unchanged[:, active], 0, counts), axis=0)
+                runs = counts - resets
+                max_stale_run[active] = runs.max(axis=0)
+                self._stale_run[active] = runs[-1]
+
+            magnitude = np.abs(returns)
+            jumps = (magnitude > self.jump_threshold).sum(axis=0)
+            scale = np.where(self._scale > 0, self._scale, np.nan)
+            outliers = (np.abs(returns - self._center) / scale > self.outlier_zscore).sum(axis=0)
+        max_abs = np.where(np.isnan(magnitude), -np.inf, magnitude).max(axis=0, initial=-np.inf)
+
+        steps = np.diff(dates.asi8)
+        monotonic = bool((steps >= 0).all()) and (first_step is None or first_step >= 0)
+
+        # First and last date with a price per ticker
+        has_any = valid.any(axis=0)
+        first = np.where(has_any, dates.values[valid.argmax(axis=0)], np.datetime64("NaT"))
+        last = np.where(has_any, dates.values[len(values) - 1 - valid[::-1].argmax(axis=0)], np.datetime64("NaT"))
+
+        block = pd.DataFrame(
+            {
+                "observations": valid.sum(axis=0),
+                "missing": (~valid).sum(axis=0),
+                "non_positive": non_positive,
+                "first_date": pd.to_datetime(first),
+                "last_date": pd.to_datetime(last),
+                "max_stale_run": max_stale_run,
+                "jumps": jumps,
+                "outliers": outliers,
+                "max_abs_return": max_abs,
+            },
+            index=pd.Index(self._columns, name="ticker"),
+        )
+
+        if self._counts is None:
+            self._counts = block
+            self._start = dates[0]
+        else:
+            previous = self._counts
+            merged = previous.copy()
+            for column in ("observations", "missing", "non_positive", "jumps", "outliers"):
+                merged[column] = previous[column] + block[column]
+            for column in ("max_stale_run", "max_abs_return"):
+                merged[column] = np.maximum(previous[column], block[column])
+            merged["first_date"] = previous["first_date"].fillna(block["first_date"])
+            merged["last_date"] = block["last_date"].fillna(previous["last_date"])
+            self._counts = merged
+
+        self._rows += len(values)
+        self._duplicates += duplicates
+        self._monotonic = self._monotonic and monotonic
+        self._last_row = values[-1]
+        self._last_date = dates.asi8[-1]
+        self.report = self._build_report(dates[-1])
+
+    def _build_report(self, end: pd.Timestamp) -> ValidationReport:
+        """Turn the running counts into a report with errors and warnings."""
+        tickers = self._counts.copy()
+        tickers["coverage"] = tickers["observations"] / self._rows
+        tickers["stale"] = tickers["max_stale_run"] >= self.stale_days
+        tickers["max_abs_return"] = tickers["max_abs_return"].where(np.isfinite(tickers["max_abs_return"]))
+        for column in ("observations", "missing", "non_positive", "max_stale_run", "jumps", "outliers"):
+            tickers[column] = tickers[column].astype(int)
+        tickers = tickers[REPORT_COLUMNS]
+
+        def listing(counts: pd.Series) -> str:
+            counts = counts[counts > 0]
+            return ", ".join(f"{ticker}: {count}" for ticker, count in counts.items())
+
+        errors = []
+        if tickers["missing"].any():
+            errors.append(f"Market data contains missing values ({listing(tickers['missing'])})")
+        if tickers["non_positive"].any():
+            errors.append(f"Market data contains zero or negative prices ({listing(tickers['non_positive'])})")
+        if self._rows < self.min_trading_days:
+            errors.append(f"Insufficient trading days: {self._rows} < {self.min_trading_days}")
+        if not self._monotonic:
+            errors.append("Market data dates are not monotonically increasing")
+        if self._duplicates:
+            errors.append(f"Market data contains {self._duplicates} duplicate dates")
+
+        cautions = []
+        if tickers["stale"].any():
+            stale_runs = tickers.loc[tickers["stale"], "max_stale_run"]
+            cautions.append(f"Stale prices, longest unchanged run in days ({listing(stale_runs)})")
+        if tickers["jumps"].any():
+            cautions.append(f"Daily moves above {self.jump_threshold:.0%} ({listing(tickers['jumps'])})")
+        if tickers["outliers"].any():
+            cautions.append(f"Outlier returns ({listing(tickers['outliers'])})")
+
+        return ValidationReport(
+            tickers, self._rows, self._start, end, self._duplicates, self._monotonic, errors, cautions
+        )
+
+
+def check_market_data(market_data: pd.DataFrame, **thresholds) -> ValidationReport:
+    """
+    Validate a price panel and return the detailed report.
+
+    Args:
+        market_data (pd.DataFrame): Prices indexed by date, one column per ticker
+        **thresholds: Overrides for the MarketDataValidator thresholds
+
+    Returns:
+        ValidationReport: Quality report for the panel
+    """
+    return MarketDataValidator(**thresholds).validate(market_data)
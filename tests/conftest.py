@@ -7,6 +7,14 @@ import pandas as pd
 import pytest
 
 
+@pytest.fixture(autouse=True)
+def isolated_price_store(tmp_path, monkeypatch):
+    """Keep the local price store of every test in its own temporary directory."""
+    store_dir = tmp_path / "price_store"
+    monkeypatch.setenv("PRICE_STORE_DIR", str(store_dir))
+    return store_dir
+
+
 @pytest.fixture
 def sample_price_data():
     """Fixture providing sample price data for testing."""
@@ -0,0 +1,99 @@
+"""
+Unit tests for the multi-period backtest module.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtest import iter_months, run_backtest
+from src.trading_calendar import trading_sessions
+
+
+@pytest.fixture
+def backtest_config():
+    """Configuration for backtest tests."""
+    return {
+        "tickers_long": ["AAPL", "MSFT"],
+        "tickers_short": ["TSLA", "META"],
+        "market_index": "^GSPC",
+        "initial_capital": 1000000,
+        "gross_exposure": 1.5,
+        "target_portfolio_beta": 0.0,
+        "transaction_fee": 0.01,
+        "management_fee": 0.02,
+    }
+
+
+@pytest.fixture
+def mock_history(monkeypatch):
+    """Patch downloads with slices of one synthetic price history."""
+    dates = pd.date_range(start="2023-09-01", end="2024-04-30", freq="B")
+    rng = np.random.default_rng(3)
+    tickers = ["AAPL", "MSFT", "TSLA", "META", "^GSPC"]
+    history = pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(0, 0.01, (len(dates), len(tickers))), axis=0)),
+        index=dates,
+        columns=tickers,
+    )
+    calls = []
+
+    def mock_download(tickers, start_date, end_date, calendar=None, **kwargs):
+        calls.append((start_date, end_date))
+        prices = history.loc[(history.index >= start_date) & (history.index < end_date), tickers]
+        # Like download_market_data, rows on non-trading days are dropped
+        if calendar is not None:
+            prices = prices[prices.index.isin(trading_sessions(start_date, end_date, calendar))]
+        return prices
+
+    monkeypatch.setattr("src.backtest.download_market_data", mock_download)
+    return history, calls
+
+
+def test_iter_months():
+    """Test month iteration across a year boundary."""
+    assert list(iter_months(2023, 11, 2024, 2)) == [(2023, 11), (2023, 12), (2024, 1), (2024, 2)]
+    with pytest.raises(ValueError):
+        list(iter_months(2024, 2, 2023, 11))
+
+
+def test_run_backtest(tmp_path, backtest_config, mock_history):
+    """Test that a backtest streams every month to disk and carries positions forward."""
+    history, calls = mock_history
+
+    summary = run_backtest(2023, 11, 2024, 2, config=backtest_config, output_dir=str(tmp_path), beta_lookback=20)
+
+    # One warm-up download followed by one download per month
+    assert len(calls) == 5
+    assert calls[0][1] == "2023-11-01"
+    assert calls[-1] == ("2024-02-01", "2024-03-01")
+
+    daily = pd.read_csv(summary["results_path"], index_col="Date", parse_dates=True)
+    expected_dates = trading_sessions("2023-11-01", "2024-02-29")
+    assert daily.index.equals(pd.DatetimeIndex(expected_dates, name="Date"))
+    assert summary["months"] == 4
+    assert summary["days"] == len(daily)
+    assert np.isclose(summary["total_management_fees"], daily["management_fee"].sum())
+
+    # Positions carry over, so month boundaries show a real return instead of zero
+    first_of_month = daily.loc["2023-12-01", "daily_return"]
+    assert first_of_month != 0.0
+
+    transactions = pd.read_csv(summary["transactions_path"])
+    assert len(transactions) >= 4
+    assert set(summary["final_portfolio"]) <= {"AAPL", "MSFT", "TSLA", "META"}
+
+
+def test_run_backtest_excel(tmp_path, backtest_config, mock_history):
+    """Test that a backtest can stream its daily results to Excel as it goes."""
+    excel_file = tmp_path / "backtest.xlsx"
+    summary = run_backtest(
+        2023, 11, 2024, 1, config=backtest_config, output_dir=str(tmp_path), beta_lookback=20,
+        excel_file=str(excel_file),
+    )
+
+    assert summary["excel_path"] == str(excel_file)
+    daily = pd.read_excel(excel_file, sheet_name="Daily Performance", index_col=0)
+    assert len(daily) == summary["days"]
+    stats = pd.read_excel(excel_file, sheet_name="Summary Statistics").set_index("Metric")["Value"]
+    assert stats["Number of Rebalances"] == summary["rebalances"]
@@ -0,0 +1,59 @@
+"""
+Unit tests for the benchmark suite.
+"""
+
+import pytest
+
+from benchmarks.pipeline import (
+    compare_to_baselines,
+    load_baselines,
+    make_price_panel,
+    missing_baselines,
+    run_benchmarks,
+    save_baselines,
+)
+
+
+def test_make_price_panel():
+    """Test the synthetic panel shape and contents."""
+    panel = make_price_panel(12, 30)
+
+    assert panel.shape == (30, 13)
+    assert panel.columns[-1] == "^GSPC"
+    assert (panel > 0).all().all()
+    assert panel.equals(make_price_panel(12, 30))
+
+
+def test_run_benchmarks():
+    """Test that stages are timed and their throughput and memory recorded."""
+    stages = ["calculate_daily_returns", "compute_betas", "simulate_portfolio[numpy]"]
+    records = run_benchmarks(sizes=[(10, 20)], stages=stages, repeat=1)
+
+    assert [record["stage"] for record in records] == stages
+    for record in records:
+        assert (record["tickers"], record["days"]) == (10, 20)
+        assert record["seconds"] > 0
+        assert record["throughput"] > 0
+        assert record["peak_memory_mb"] >= 0
+
+    with pytest.raises(ValueError):
+        run_benchmarks(sizes=[(10, 20)], stages=["not_a_stage"])
+
+
+def test_compare_to_baselines(tmp_path):
+    """Test baseline storage and regression detection."""
+    path = tmp_path / "baselines.json"
+    record = {"stage": "compute_betas", "tickers": 10, "days": 20,
+              "seconds": 0.010, "peak_memory_mb": 10.0, "throughput": 1000.0}
+    save_baselines([record, {"stage": "compute_beta", "tickers": 10, "days": 20, "error": "missing"}], path)
+    baselines = load_baselines(path)
+
+    assert list(baselines) == ["compute_betas@10x20"]
+    assert compare_to_baselines([record], baselines) == []
+    assert len(compare_to_baselines([{**record, "seconds": 0.020}], baselines)) == 1
+    assert len(compare_to_baselines([{**record, "peak_memory_mb": 20.0}], baselines)) == 1
+    # Stages without a baseline are reported separately, stages that could not run are not
+    assert compare_to_baselines([{**record, "tickers": 50}], baselines) == []
+    assert missing_baselines([record, {**record, "tickers": 50}], baselines) == ["compute_betas@50x20"]
+    assert missing_baselines([{"stage": "compute_beta", "tickers": 10, "days": 20, "error": "missing"}], baselines) == []
+    assert load_baselines(tmp_path / "missing.json") == {}
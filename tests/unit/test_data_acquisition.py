@@ -5,14 +5,19 @@ Unit tests for the data acquisition module.
 import numpy as np
 import pandas as pd
 import pytest
-import yfinance as yf
 
 from src.data_acquisition import (
     download_market_data,
+    export_price_matrix,
     get_date_range,
     get_exchange_rates,
+    get_month_window,
+    load_price_store,
+    open_price_matrix,
     validate_market_data,
 )
+from src.providers import InMemoryProvider, LocalFileProvider, set_default_provider
+from src.trading_calendar import trading_sessions
 
 
 def test_get_date_range():
@@ -34,38 +39,32 @@ def test_get_date_range():
     with pytest.raises(ValueError):
         get_date_range(2025, 0)
 
+    # With a calendar the range runs from the first to the last session
+    assert get_date_range(2025, 1, "NYSE") == ("2025-01-02", "2025-01-31")
+    assert get_date_range(2024, 3, "NYSE") == ("2024-03-01", "2024-03-28")
+    assert get_date_range(2024, 6, "TSX") == ("2024-06-03", "2024-06-28")
 
-def fake_yf_download(tickers, start, end, progress, group_by):
-    """
-    This fake function simulates downloading market data.
-    It returns a DataFrame similar to what yfinance.download would return.
-    """
-    # Generate a business day date range for given period
-    dates = pd.date_range(start=start, end=end, freq="B")
-
-    if isinstance(tickers, list) and len(tickers) > 1:
-        # Create a MultiIndex DataFrame for multiple tickers with 'Adj Close' information
-        data = {}
-        for ticker in tickers:
-            # Generate synthetic 'Adj Close' prices
-            prices = np.random.uniform(100, 200, size=len(dates))
-            data[(ticker, "Adj Close")] = pd.Series(prices, index=dates)
-        df = pd.DataFrame(data)
-        df.columns = pd.MultiIndex.from_tuples(df.columns, names=["Ticker", "Attribute"])
-    else:
-        # Single ticker returns a DataFrame with a single column
-        prices = np.random.uniform(100, 200, size=len(dates))
-        df = pd.DataFrame({"Adj Close": prices}, index=dates)
-
-    return df
+    # Month windows end the day after the last day (exclusive)
+    assert get_month_window(2025, 1) == ("2025-01-01", "2025-02-01")
+    assert get_month_window(2024, 12) == ("2024-12-01", "2025-01-01")
+    assert get_month_window(2024, 3, "NYSE") == ("2024-03-01", "2024-03-29")
 
 
 @pytest.fixture(autouse=True)
-def patch_yfinance_download(monkeypatch):
+def stand_in_provider():
     """
-    Automatically patch yf.download with fake_yf_download for these tests.
+    Serve synthetic prices from an offline provider for these tests.
     """
-    monkeypatch.setattr(yf, "download", fake_yf_download)
+    dates = pd.date_range(start="2023-01-01", end="2026-12-31", freq="B")
+    rng = np.random.default_rng(42)
+    tickers = ["AAPL", "MSFT", "^GSPC"]
+    prices = pd.DataFrame(
+        rng.uniform(100, 200, size=(len(dates), len(tickers))), index=dates, columns=tickers
+    )
+    provider = InMemoryProvider(prices)
+    previous = set_default_provider(provider)
+    yield provider
+    set_default_provider(previous)
 
 
 def test_download_market_data():
@@ -85,10 +84,102 @@ def test_download_market_data():
     assert isinstance(prices.index, pd.DatetimeIndex)
 
 
-def test_get_exchange_rates():
+def test_download_market_data_uses_price_store(stand_in_provider, isolated_price_store):
+    """Test that repeated downloads only fetch ranges missing from the price store."""
+    calls = stand_in_provider.calls
+    tickers = ["AAPL", "MSFT"]
+
+    # Requests start at the first session: 2024-01-01 is a holiday
+    first = download_market_data(tickers, "2024-01-01", "2024-01-20")
+    assert sorted(calls) == [("AAPL", "2024-01-02", "2024-01-20"), ("MSFT", "2024-01-02", "2024-01-20")]
+    assert list(first.columns) == tickers
+
+    # Fully covered: served from the store without any download
+    cached = download_market_data(tickers, "2024-01-05", "2024-01-15")
+    assert len(calls) == 2
+    pd.testing.assert_frame_equal(cached, first.loc["2024-01-05":"2024-01-12"], check_freq=False)
+
+    # Extending the range only fetches the missing tail, across a year boundary
+    extended = download_market_data(tickers, "2024-01-01", "2025-01-10")
+    # (the NYSE was closed on 2025-01-09, so the last session is 2025-01-08)
+    assert sorted(calls[2:]) == [("AAPL", "2024-01-22", "2025-01-09"), ("MSFT", "2024-01-22", "2025-01-09")]
+    assert extended.index.min() == pd.Timestamp("2024-01-02")
+    assert extended.index.max() == pd.Timestamp("2025-01-08")
+    assert (isolated_price_store / "AAPL" / "2025.parquet").exists()
+
+    # A new ticker is fetched on its own
+    download_market_data(tickers + ["^GSPC"], "2024-01-01", "2024-01-20")
+    assert calls[4:] == [("^GSPC", "2024-01-02", "2024-01-20")]
+
+    # Ranges without sessions are never requested
+    with pytest.raises(ValueError):
+        download_market_data(tickers, "2024-01-20", "2024-01-22")
+    assert len(calls) == 5
+    assert list(load_price_store(["^GSPC"], "2024-01-01", "2024-01-20").columns) == ["^GSPC"]
+
+
+def test_download_market_data_partial_results(stand_in_provider, monkeypatch):
+    """Test that failing tickers are retried and unknown tickers fail validation."""
+    monkeypatch.setattr("src.providers.time.sleep", lambda seconds: None)
+    stand_in_provider.failures = {"MSFT": 2}
+
+    prices = download_market_data(["AAPL", "MSFT", "NOPE"], "2024-01-01", "2024-01-20", use_store=False)
+
+    assert list(prices.columns) == ["AAPL", "MSFT", "NOPE"]
+    assert prices["NOPE"].isna().all()
+    assert not validate_market_data(prices)
+    assert [call[0] for call in stand_in_provider.calls].count("MSFT") == 3
+    # Rows on holidays (2024-01-01 and 2024-01-15) are dropped
+    sessions = trading_sessions("2024-01-01", "2024-01-19")
+    pd.testing.assert_series_equal(
+        prices["MSFT"], stand_in_provider.prices.loc[sessions, "MSFT"],
+        check_freq=False, check_names=False, check_index_type=False,
+    )
+
+    with pytest.raises(ValueError):
+        download_market_data(["NOPE"], "2024-01-01", "2024-01-20", use_store=False)
+
+    # The price store keeps the gap as well
+    stored = download_market_data(["AAPL", "NOPE"], "2024-01-01", "2024-01-20")
+    assert list(stored.columns) == ["AAPL", "NOPE"]
+    assert stored["NOPE"].isna().all()
+
+
+def test_download_market_data_from_local_files(tmp_path, stand_in_provider, isolated_price_store):
+    """Test running offline from a local panel without touching the price store."""
+    panel = stand_in_provider.prices.loc["2024-01-01":"2024-03-31"]
+    panel.rename_axis("Date").to_csv(tmp_path / "panel.csv")
+    provider = LocalFileProvider(str(tmp_path / "panel.csv"))
+
+    prices = download_market_data(["AAPL", "^GSPC"], "2024-01-01", "2024-02-01", provider=provider)
+
+    pd.testing.assert_frame_equal(
+        prices, panel.loc[trading_sessions("2024-01-01", "2024-01-31"), ["AAPL", "^GSPC"]],
+        check_freq=False, check_names=False,
+    )
+    assert stand_in_provider.calls == []
+    assert not (isolated_price_store / "AAPL").exists()
+
+
+def test_price_matrix_round_trip(tmp_path, sample_price_data):
+    """Test exporting and memory-mapping the cleaned price panel."""
+    base_path = export_price_matrix(sample_price_data, str(tmp_path / "market_data"))
+
+    prices = open_price_matrix(base_path)
+    pd.testing.assert_frame_equal(prices, sample_price_data, check_freq=False, check_names=False)
+
+    values, dates, tickers = open_price_matrix(base_path, as_frame=False)
+    assert isinstance(values, np.memmap)
+    assert values.dtype == np.float64
+    assert not values.flags.writeable
+    assert dates.equals(sample_price_data.index)
+    assert tickers == list(sample_price_data.columns)
+
+
+def test_get_exchange_rates(isolated_price_store):
     """Test exchange rate retrieval function."""
     start_date = "2025-01-01"
-    end_date = "2025-01-31"
+    end_date = "2025-02-01"
 
     # Test simulated rates
     rates = get_exchange_rates(start_date, end_date, simulation=True)
@@ -100,9 +191,32 @@ def test_get_exchange_rates():
     assert rates.name == "USD/CAD"
     assert all(rate > 0 for rate in rates)
 
-    # Test that non-simulation mode raises NotImplementedError
-    with pytest.raises(NotImplementedError):
-        get_exchange_rates(start_date, end_date, simulation=False)
+    # Test real rates, read through a provider (the end date is exclusive, as for prices)
+    # FX markets are closed on 2025-01-01 and 2025-01-20 in this series
+    dates = pd.date_range(start="2024-12-02", end="2025-02-28", freq="B")
+    dates = dates.drop(pd.DatetimeIndex(["2025-01-01", "2025-01-20"]))
+    fx = pd.DataFrame({"CAD=X": np.linspace(1.40, 1.45, len(dates))}, index=dates)
+    provider = InMemoryProvider(fx)
+    rates = get_exchange_rates(start_date, end_date, simulation=False, provider=provider)
+
+    assert rates.name == "USD/CAD"
+    assert rates.index.equals(trading_sessions(start_date, "2025-01-31"))
+    assert provider.calls == [("CAD=X", "2024-12-26", "2025-02-01")]
+
+    # Rates are cached in the price store and forward-filled onto the trading days
+    trading_days = pd.DatetimeIndex(["2025-01-01", "2025-01-02", "2025-01-20", "2025-01-21"])
+    aligned = get_exchange_rates(start_date, end_date, simulation=False, provider=provider, dates=trading_days)
+    assert len(provider.calls) == 1
+    assert aligned.index.equals(trading_days)
+    expected = fx.loc[["2024-12-31", "2025-01-02", "2025-01-17", "2025-01-21"], "CAD=X"]
+    assert aligned.tolist() == pytest.approx(expected.tolist())
+
+    simulated = get_exchange_rates(start_date, end_date, dates=trading_days)
+    assert simulated.index.equals(trading_days)
+
+    # The default stand-in has no exchange rates
+    with pytest.raises(ValueError):
+        get_exchange_rates(start_date, end_date, simulation=False, use_store=False)
 
 
 def test_validate_market_data():
@@ -0,0 +1,47 @@
+"""
+Unit tests for the download.py Excel export.
+"""
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from download import save_stock_data
+from src.providers import LocalFileProvider
+
+
+def test_save_stock_data(tmp_path):
+    """Test that the workbook has one formatted tab per ticker that LocalFileProvider can read."""
+    dates = pd.date_range(start="2024-01-02", periods=30, freq="B", tz="America/New_York", name="Date")
+    rng = np.random.default_rng(5)
+    data = {
+        symbol: pd.DataFrame(
+            {
+                "Open": rng.uniform(90, 110, len(dates)),
+                "High": rng.uniform(110, 120, len(dates)),
+                "Low": rng.uniform(80, 90, len(dates)),
+                "Close": rng.uniform(90, 110, len(dates)),
+                "Volume": rng.integers(1_000, 1_000_000, len(dates)),
+                "Dividends": 0.0,
+                "Stock Splits": 0.0,
+            },
+            index=dates,
+        )
+        for symbol in ["AAPL", "^GSPC"]
+    }
+    output_file = tmp_path / "stocks.xlsx"
+
+    save_stock_data(data, str(output_file))
+
+    workbook = load_workbook(output_file)
+    assert workbook.sheetnames == ["AAPL", "^GSPC"]
+    sheet = workbook["AAPL"]
+    assert [cell.value for cell in sheet[1]] == ["Date", "Open", "High", "Low", "Close", "Volume", "Dividends", "Stock Splits"]
+    assert sheet["A2"].number_format == "yyyy-mm-dd"
+    assert sheet["E2"].number_format == "#,##0.00"
+    assert sheet["F2"].number_format == "#,##0"
+    assert sheet.column_dimensions["A"].width == 12
+
+    close = LocalFileProvider(str(output_file)).fetch_history("^GSPC", "2024-01-01", "2024-03-01")
+    np.testing.assert_allclose(close.to_numpy(), data["^GSPC"]["Close"].to_numpy())
+    assert close.index[0] == pd.Timestamp("2024-01-02")
@@ -0,0 +1,131 @@
+"""
+Unit tests for the streaming Excel export module.
+"""
+
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+from src.excel_export import (
+    DailyResultsWriter,
+    iter_chunks,
+    stream_daily_results,
+    write_formatted_workbook,
+    write_sheets,
+)
+
+
+@pytest.fixture
+def daily_results():
+    """Fixture providing 300 days of simulation-shaped daily results."""
+    dates = pd.date_range(start="2023-01-02", periods=300, freq="B", name="Date")
+    rng = np.random.default_rng(11)
+    returns = rng.normal(0, 0.01, len(dates))
+    value = 1_000_000 * np.cumprod(1 + returns)
+    return pd.DataFrame(
+        {
+            "portfolio_value_usd": value,
+            "gross_exposure_usd": value * 1.5,
+            "portfolio_value_cad": value * 1.35,
+            "portfolio_beta": rng.normal(0, 0.05, len(dates)),
+            "daily_return": returns,
+            "management_fee": value * 1.5 * 0.02 / 252,
+            "transaction_costs": rng.uniform(0, 5, len(dates)),
+            "rebalanced": rng.random(len(dates)) < 0.1,
+            "exchange_rate": 1.35,
+        },
+        index=dates,
+    )
+
+
+def test_stream_daily_results(tmp_path, daily_results):
+    """Test that a chunked export writes every sheet and matches full-frame statistics."""
+    filename = tmp_path / "out" / "performance.xlsx"
+    summary = stream_daily_results(iter_chunks(daily_results, 64), str(filename))
+
+    values = summary.set_index("Metric")["Value"]
+    expected_return = (daily_results["portfolio_value_usd"].iloc[-1] / daily_results["portfolio_value_usd"].iloc[0] - 1) * 100
+    assert values["Total Return (%)"] == pytest.approx(expected_return)
+    assert values["Average Daily Return (%)"] == pytest.approx(daily_results["daily_return"].mean() * 100)
+    assert values["Return Volatility (%)"] == pytest.approx(daily_results["daily_return"].std() * 100)
+    assert values["Beta Volatility"] == pytest.approx(daily_results["portfolio_beta"].std())
+    assert values["Number of Rebalances"] == daily_results["rebalanced"].sum()
+    assert values["Total Transaction Costs"] == pytest.approx(daily_results["transaction_costs"].sum())
+
+    workbook = load_workbook(filename, read_only=True)
+    assert workbook.sheetnames == ["Daily Performance", "Rebalancing Events", "Summary Statistics"]
+    daily = pd.read_excel(filename, sheet_name="Daily Performance", index_col=0)
+    events = pd.read_excel(filename, sheet_name="Rebalancing Events", index_col=0)
+    assert len(daily) == len(daily_results)
+    assert list(daily.columns) == list(daily_results.columns)
+    assert daily.index[0] == daily_results.index[0]
+    assert len(events) == daily_results["rebalanced"].sum()
+    assert events["rebalanced"].all()
+
+    # One chunk or many gives the same summary
+    single = stream_daily_results([daily_results], str(tmp_path / "single.xlsx"))
+    pd.testing.assert_frame_equal(single, summary)
+
+
+def test_daily_results_writer_errors(tmp_path, monkeypatch, daily_results):
+    """Test that mismatched chunks are rejected and failed exports leave no file."""
+    scratch = tmp_path / "scratch"
+    scratch.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(scratch))
+    filename = tmp_path / "failed.xlsx"
+    with pytest.raises(ValueError):
+        with DailyResultsWriter(str(filename)) as writer:
+            writer.write(daily_results.iloc[:10])
+            writer.write(daily_results.iloc[10:20, :-1])
+    assert not filename.exists()
+    # The temporary files buffering the rows are removed too
+    assert not list(scratch.iterdir())
+
+    with pytest.raises(ValueError):
+        DailyResultsWriter(str(filename)).summary()
+
+
+def test_write_sheets(tmp_path, daily_results):
+    """Test writing several frames to a write-only workbook in chunks."""
+    filename = tmp_path / "report.xlsx"
+    metrics = pd.DataFrame({"Value": [0.1, 1.2]}, index=["total_return", "sharpe_ratio"])
+    write_sheets(str(filename), {"Portfolio Data": daily_results, "Performance Metrics": metrics}, chunk_size=50)
+
+    data = pd.read_excel(filename, sheet_name="Portfolio Data", index_col=0)
+    np.testing.assert_allclose(data["daily_return"], daily_results["daily_return"])
+    pd.testing.assert_frame_equal(pd.read_excel(filename, sheet_name="Performance Metrics", index_col=0), metrics)
+
+
+def test_write_formatted_workbook(tmp_path, daily_results):
+    """Test that formatted sheets keep their values, widths and number formats."""
+    filename = tmp_path / "formatted.xlsx"
+    frame = daily_results.tz_localize("America/New_York")
+    frame.iloc[3, 0] = np.nan
+    formats = {"Date": (12, "yyyy-mm-dd"), "portfolio_value_usd": (14, "#,##0.00")}
+    write_formatted_workbook(str(filename), {"^GSPC": frame, "Other": frame.iloc[:5]}, formats)
+
+    sheets = pd.read_excel(filename, sheet_name=None, index_col=0)
+    assert list(sheets) == ["^GSPC", "Other"]
+    read = sheets["^GSPC"]
+    assert read.index.equals(daily_results.index)
+    assert read.iloc[3, 0] != read.iloc[3, 0]
+    np.testing.assert_allclose(read["daily_return"], daily_results["daily_return"], rtol=1e-15)
+    assert read["rebalanced"].tolist() == daily_results["rebalanced"].tolist()
+
+    sheet = load_workbook(filename)["^GSPC"]
+    assert sheet["A1"].font.b
+    assert sheet["A2"].number_format == "yyyy-mm-dd"
+    assert sheet["B2"].number_format == "#,##0.00"
+    assert sheet["C2"].number_format == "General"
+    assert sheet.column_dimensions["B"].width == 14
+
+    # Control characters Excel cannot store are dropped instead of corrupting the file
+    notes = pd.DataFrame({"note": ["bad\x01char", None, "tab\tkept"]})
+    write_formatted_workbook(str(filename), {"Notes": notes}, index=False)
+    assert [row[0] for row in load_workbook(filename)["Notes"].values] == ["note", "badchar", None, "tab\tkept"]
+
+    with pytest.raises(ValueError):
+        write_formatted_workbook(str(filename), {"a/b": frame})
@@ -0,0 +1,150 @@
+"""
+Unit tests for the live book module.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.live import LiveBook, run_live_update, start_live_book
+from src.performance import calculate_daily_returns, simulate_portfolio
+from src.portfolio import compute_rolling_betas, initialize_portfolio
+
+
+@pytest.fixture
+def live_config():
+    """Configuration for live book tests."""
+    return {
+        "tickers_long": ["AAPL", "MSFT"],
+        "tickers_short": ["TSLA", "META"],
+        "market_index": "^GSPC",
+        "initial_capital": 10_000_000,
+        "gross_exposure": 1.5,
+        "target_portfolio_beta": 0.0,
+        "beta_tolerance": 0.05,
+        "transaction_fee": 0.01,
+        "management_fee": 0.02,
+    }
+
+
+@pytest.fixture
+def price_history():
+    """Fixture providing 200 days of prices driven by one market factor."""
+    rng = np.random.default_rng(3)
+    dates = pd.bdate_range("2024-01-01", periods=200)
+    market = rng.normal(0.0004, 0.01, len(dates))
+    betas = np.array([1.2, 0.8, 1.5, 0.6, 1.0])
+    noise = rng.normal(0, 0.012, (len(dates), 5)) * np.array([1, 1, 1, 1, 0])
+    return pd.DataFrame(
+        100 * np.cumprod(1 + market[:, None] * betas + noise, axis=0),
+        index=dates,
+        columns=["AAPL", "MSFT", "TSLA", "META", "^GSPC"],
+    )
+
+
+@pytest.mark.parametrize("halflife", [None, 20])
+def test_live_book_matches_full_simulation(tmp_path, live_config, price_history, halflife):
+    """Test that day-by-day updates reproduce a full re-run with running betas."""
+    live_config["beta_halflife"] = halflife
+    tickers = live_config["tickers_long"] + live_config["tickers_short"]
+    book, _ = start_live_book(price_history.iloc[:61], live_config)
+    start_betas = dict(zip(tickers, book.betas()))
+
+    rows = []
+    for date, prices in price_history.iloc[61:].iterrows():
+        row, _ = book.update(date, prices)
+        rows.append(row)
+        if len(rows) == 40:
+            # The state survives a save and reload
+            book.save(str(tmp_path / "state.json"))
+            book = LiveBook.load(str(tmp_path / "state.json"))
+    live = pd.DataFrame(rows).set_index("Date")
+
+    returns = calculate_daily_returns(price_history).iloc[1:]
+    betas = compute_rolling_betas(returns, "^GSPC", halflife=halflife)
+    prices = price_history[tickers].iloc[60:]
+    portfolio, _, _ = initialize_portfolio(
+        10_000_000, prices.iloc[0].to_dict(), live_config["tickers_long"],
+        live_config["tickers_short"], start_betas, prices.index[0],
+    )
+    expected, _ = simulate_portfolio(
+        prices, portfolio, betas, pd.Series(1.35, index=prices.index), 0.02, 0.0,
+        engine="numpy", beta_tolerance=0.05, transaction_fee=0.01,
+    )
+    expected = expected.iloc[1:]
+
+    pd.testing.assert_frame_equal(live[expected.columns], expected, check_freq=False, check_names=False)
+    np.testing.assert_allclose(book.betas(), betas.iloc[-1].to_numpy())
+    assert book.rebalances >= expected["rebalanced"].sum()
+
+    with pytest.raises(ValueError):
+        book.update(price_history.index[-1], price_history.iloc[-1])
+    with pytest.raises(ValueError):
+        book.update(price_history.index[-1] + pd.Timedelta(days=1), price_history.iloc[-1].drop("MSFT"))
+
+
+def test_run_live_update(tmp_path, monkeypatch, live_config, price_history):
+    """Test that each run only downloads and processes the days after the saved state."""
+    calls = []
+
+    def mock_download(tickers, start_date, end_date, **kwargs):
+        calls.append((start_date, end_date))
+        rows = price_history.loc[(price_history.index >= start_date) & (price_history.index < end_date), tickers]
+        if rows.empty:
+            raise ValueError("No valid price data found for any ticker")
+        return rows
+
+    monkeypatch.setattr("src.live.download_market_data", mock_download)
+    output_dir = str(tmp_path / "live")
+
+    started = run_live_update(live_config, output_dir, as_of="2024-04-01", beta_lookback=40)
+    assert started["new_days"] == 0
+    assert started["last_date"] == pd.Timestamp("2024-04-01")
+
+    first = run_live_update(live_config, output_dir, as_of="2024-04-05")
+    assert calls[-1] == ("2024-04-02", "2024-04-06")
+    assert first["new_days"] == 4
+    second = run_live_update(live_config, output_dir, as_of="2024-04-12")
+    assert calls[-1] == ("2024-04-06", "2024-04-13")
+    assert second["new_days"] == 5
+    assert run_live_update(live_config, output_dir, as_of="2024-04-12")["new_days"] == 0
+
+    daily = pd.read_csv(tmp_path / "live" / "live_daily.csv", index_col="Date", parse_dates=True)
+    assert len(daily) == 9
+    assert daily.index.is_monotonic_increasing
+    assert second["total_management_fees"] == pytest.approx(daily["management_fee"].sum())
+    assert second["days"] == 9
+
+
+def test_run_live_update_after_crash(tmp_path, monkeypatch, live_config, price_history):
+    """Test that rows appended by a run that stopped before saving its state are not written twice."""
+    def mock_download(tickers, start_date, end_date, **kwargs):
+        rows = price_history.loc[(price_history.index >= start_date) & (price_history.index < end_date), tickers]
+        if rows.empty:
+            raise ValueError("No valid price data found for any ticker")
+        return rows
+
+    monkeypatch.setattr("src.live.download_market_data", mock_download)
+    clean_dir, crashed_dir = tmp_path / "clean", tmp_path / "crashed"
+    for output_dir in (clean_dir, crashed_dir):
+        run_live_update(live_config, str(output_dir), as_of="2024-04-01", beta_lookback=40)
+    run_live_update(live_config, str(clean_dir), as_of="2024-04-12")
+
+    # Stop on the third day, after its rows are appended but before the state is saved
+    save = LiveBook.save
+    saves = []
+
+    def failing_save(book, path):
+        saves.append(book.last_date)
+        if len(saves) == 3:
+            raise OSError("disk full")
+        save(book, path)
+
+    monkeypatch.setattr(LiveBook, "save", failing_save)
+    with pytest.raises(OSError):
+        run_live_update(live_config, str(crashed_dir), as_of="2024-04-12")
+    monkeypatch.setattr(LiveBook, "save", save)
+    assert run_live_update(live_config, str(crashed_dir), as_of="2024-04-12")["new_days"] == 7
+
+    for name in ("live_daily.csv", "live_transactions.csv"):
+        assert (crashed_dir / name).read_text() == (clean_dir / name).read_text()
@@ -5,12 +5,16 @@ Tests the integration of all components and the main execution workflow.
 
 import logging
 import os
+import subprocess
+import sys
 
 import numpy as np
 import pandas as pd
 import pytest
 
-from src.main import run_simulation, setup_logging
+from src.config import CONFIG_CHOICES, check_config
+from src.main import HEAVY_MODULES, IMPORT_TIME_BUDGET, main, run_simulation, setup_logging
+from src.trading_calendar import CALENDARS
 
 
 @pytest.fixture
@@ -185,3 +189,97 @@ def test_run_simulation_report_error(tmp_path, monkeypatch, mock_market_data, mo
     with open("hedge_fund_simulation.log") as f:
         log_content = f.read()
         assert "Error during simulation" in log_content
+
+
+def test_run_simulation_rolling_betas_skip_first_day(tmp_path, monkeypatch, mock_market_data, mock_exchange_rates):
+    """Test that rolling betas ignore the first day and seed the portfolio with complete betas."""
+    import src.performance
+    import src.portfolio
+
+    prices = 100 * np.exp(mock_market_data.cumsum() / 100)
+    captured = {}
+
+    def mock_load_config(*args, **kwargs):
+        return {
+            "tickers_long": ["AAPL", "MSFT"],
+            "tickers_short": ["TSLA", "META"],
+            "market_index": "^GSPC",
+            "initial_capital": 1000000,
+            "gross_exposure": 1.5,
+            "target_portfolio_beta": 0.0,
+            "transaction_fee": 0.001,
+            "management_fee": 0.02,
+            "beta_window": 5,
+        }
+
+    def capture(module, name):
+        original = getattr(module, name)
+
+        def stage(*args, **kwargs):
+            captured[name] = (args, kwargs)
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(module, name, stage)
+
+    monkeypatch.setattr("src.main.load_config", mock_load_config)
+    monkeypatch.setattr("src.main.download_market_data", lambda *args, **kwargs: prices)
+    monkeypatch.setattr("src.main.get_exchange_rates", lambda *args, **kwargs: mock_exchange_rates)
+    monkeypatch.setattr("src.main.validate_market_data", lambda *args, **kwargs: True)
+    monkeypatch.setattr("src.main.generate_monthly_report", lambda *args, **kwargs: None)
+    capture(src.portfolio, "initialize_portfolio")
+    capture(src.performance, "simulate_portfolio")
+    monkeypatch.chdir(tmp_path)
+
+    run_simulation()
+
+    expected = src.portfolio.compute_rolling_betas(
+        src.performance.calculate_daily_returns(prices).iloc[1:], "^GSPC", window=5
+    )
+    initial_betas = captured["initialize_portfolio"][0][4]
+    assert initial_betas == expected.dropna().iloc[0].to_dict()
+
+    args, kwargs = captured["simulate_portfolio"]
+    pd.testing.assert_frame_equal(args[2].iloc[1:], expected)
+    assert args[2].iloc[0].isna().all()
+    assert args[4] == 0.02
+    assert kwargs["transaction_fee"] == 0.001
+
+
+def test_import_time_budget():
+    """Test that importing src.main stays within budget and loads no heavy dependency."""
+    script = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import src.main\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(elapsed, *[name for name in {HEAVY_MODULES!r} if name in sys.modules])"
+    )
+    root = os.path.join(os.path.dirname(__file__), "..", "..")
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=root, capture_output=True, text=True, check=True
+    ).stdout.split()
+
+    assert output[1:] == []
+    assert float(output[0]) < IMPORT_TIME_BUDGET
+
+
+def test_check_config_and_dry_run(capsys):
+    """Test the configuration check and dry run commands."""
+    assert main(["--check-config"]) == 0
+    assert "Configuration OK" in capsys.readouterr().out
+
+    assert main(["--dry-run"]) == 0
+    output = capsys.readouterr().out
+    # The first of January is a holiday, so the period starts on the first session
+    assert "analysis_period: 2024-01-02 to 2024-01-31 (21 NYSE sessions)" in output
+    assert "tickers_short: TSLA, META" in output
+
+    problems = check_config(
+        {"tickers_long": ["AAPL"], "tickers_short": ["AAPL"], "initial_capital": 0,
+         "analysis_month": 13, "trading_calendar": "LSE"}
+    )
+    assert len(problems) == 7
+    assert "Tickers both long and short: AAPL" in problems
+
+    # The accepted calendars are those trading_calendar implements
+    assert set(CONFIG_CHOICES["trading_calendar"]) == set(CALENDARS)
@@ -0,0 +1,101 @@
+"""
+Unit tests for the Monte Carlo module.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.monte_carlo import (
+    SCENARIO_COLUMNS,
+    generate_scenarios,
+    run_monte_carlo,
+    simulate_paths,
+    summarize_monte_carlo,
+)
+from src.performance import simulate_portfolio
+
+
+@pytest.fixture
+def market_data():
+    """Fixture providing 300 days of prices driven by one market factor."""
+    rng = np.random.default_rng(3)
+    dates = pd.bdate_range("2024-01-01", periods=300)
+    market = rng.normal(0.0004, 0.01, len(dates))
+    betas = np.array([1.2, 0.8, 1.5, 0.6, 1.0])
+    noise = rng.normal(0, 0.01, (len(dates), 5)) * np.array([1, 1, 1, 1, 0])
+    returns = market[:, None] * betas + noise
+    return pd.DataFrame(
+        100 * np.cumprod(1 + returns, axis=0), index=dates, columns=["AAPL", "MSFT", "TSLA", "META", "^GSPC"]
+    )
+
+
+@pytest.fixture
+def portfolio():
+    """Fixture providing a dollar-neutral book of shares."""
+    return {"AAPL": 20000.0, "MSFT": 30000.0, "TSLA": -16000.0, "META": -40000.0}
+
+
+@pytest.fixture
+def betas():
+    """Fixture providing static betas."""
+    return {"AAPL": 1.2, "MSFT": 0.8, "TSLA": 1.5, "META": 0.6}
+
+
+@pytest.mark.parametrize("method", ["heuristic", "optimize"])
+def test_simulate_paths_matches_simulate_portfolio(market_data, portfolio, betas, method):
+    """Test that every batched path follows the rebalancing of simulate_portfolio."""
+    tickers = list(portfolio)
+    history = market_data.pct_change().dropna().to_numpy()
+    path_returns = generate_scenarios(history, 3, 60, rng=np.random.default_rng(1))[:, :, :4]
+    start_prices = market_data[tickers].iloc[-1].to_numpy()
+    results = simulate_paths(
+        start_prices, path_returns, np.array(list(portfolio.values())), np.array(list(betas.values())),
+        0.02, 0.0, beta_tolerance=0.05, transaction_fee=0.01, rebalance_method=method,
+    )
+
+    for path in range(3):
+        growth = np.vstack([np.ones(4), np.cumprod(1 + path_returns[path], axis=0)])
+        prices = pd.DataFrame(start_prices * growth, index=pd.bdate_range("2025-01-01", periods=61), columns=tickers)
+        daily, _ = simulate_portfolio(
+            prices, portfolio, betas, pd.Series(1.35, index=prices.index), 0.02, 0.0,
+            engine="numpy", beta_tolerance=0.05, transaction_fee=0.01, rebalance_method=method,
+        )
+        value = daily["portfolio_value_usd"]
+        assert results["pnl_usd"][path] == pytest.approx(value.iloc[-1] - value.iloc[0])
+        assert results["transaction_costs"][path] == pytest.approx(daily["transaction_costs"].sum())
+        assert results["management_fees"][path] == pytest.approx(daily["management_fee"].sum())
+        assert results["rebalances"][path] == daily["rebalanced"].sum()
+        assert results["final_beta"][path] == pytest.approx(daily["portfolio_beta"].iloc[-1])
+
+
+def test_factor_scenarios_follow_covariance(market_data):
+    """Test that factor-model paths keep the betas and volatilities of the history."""
+    history = market_data.pct_change().dropna().to_numpy()
+    paths = generate_scenarios(history, 400, 252, method="factor", rng=np.random.default_rng(2))
+    simulated = paths.reshape(-1, history.shape[1])
+
+    np.testing.assert_allclose(simulated.std(axis=0), history.std(axis=0), rtol=0.05)
+    # Correlations with the market are kept, residuals are independent
+    np.testing.assert_allclose(np.corrcoef(simulated.T)[-1], np.corrcoef(history.T)[-1], atol=0.02)
+
+    with pytest.raises(ValueError):
+        generate_scenarios(history, 10, 10, method="normal")
+
+
+def test_run_monte_carlo(market_data, portfolio, betas):
+    """Test that chunked runs are reproducible whatever the number of workers."""
+    kwargs = dict(n_paths=250, horizon=40, market_index="^GSPC", chunk_size=60, seed=7)
+    serial = run_monte_carlo(market_data, portfolio, betas, 0.02, 0.0, max_workers=1, **kwargs)
+    parallel = run_monte_carlo(market_data, portfolio, betas, 0.02, 0.0, max_workers=2, **kwargs)
+
+    assert len(serial) == 250
+    assert list(serial.columns) == SCENARIO_COLUMNS + ["market_return"]
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert (serial["net_pnl_usd"] <= serial["pnl_usd"]).all()
+
+    summary = summarize_monte_carlo(serial)
+    assert summary.loc["pnl_usd", "50%"] == pytest.approx(serial["pnl_usd"].median())
+
+    with pytest.raises(ValueError):
+        run_monte_carlo(market_data, portfolio, betas, 0.02, 0.0, method="factor", max_workers=1)
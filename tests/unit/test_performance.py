@@ -6,8 +6,11 @@ import numpy as np
 import pandas as pd
 import pytest
 
+import src.performance
+
 from src.config import BETA_TOLERANCE, MANAGEMENT_FEE_ANNUAL
-from src.performance import calculate_daily_returns, simulate_portfolio
+from src.performance import calculate_daily_returns, resume_simulation, simulate_portfolio
+from src.portfolio import PortfolioState
 
 
 @pytest.fixture
@@ -175,3 +178,236 @@ def test_simulate_portfolio_with_target_beta(
     for beta, rebalanced in zip(results["portfolio_beta"], results["rebalanced"]):
         if abs(beta - target_beta) > BETA_TOLERANCE:
             assert rebalanced
+
+
+def test_simulate_portfolio_numpy_engine_matches_pandas(
+    sample_price_data, sample_portfolio, sample_betas, sample_exchange_rates
+):
+    """Test that the vectorized engine reproduces the day-by-day loop."""
+    for target_beta in (0.0, 0.2):
+        expected, expected_logs = simulate_portfolio(
+            sample_price_data, sample_portfolio, sample_betas, sample_exchange_rates,
+            0.02, target_beta=target_beta,
+        )
+        results, logs = simulate_portfolio(
+            sample_price_data, sample_portfolio, sample_betas, sample_exchange_rates,
+            0.02, target_beta=target_beta, engine="numpy",
+        )
+
+        pd.testing.assert_frame_equal(results, expected)
+        assert logs == expected_logs
+
+
+def test_simulate_portfolio_exchange_rates_on_another_calendar(
+    sample_price_data, sample_portfolio, sample_betas, sample_exchange_rates
+):
+    """Test that rates missing on some trading days are carried forward."""
+    # No rate on the first or third trading day, plus a Saturday rate that is never used
+    rates = sample_exchange_rates.drop(sample_price_data.index[[0, 2]])
+    rates[pd.Timestamp("2025-01-04")] = 1.5
+    rates = rates.sort_index()
+    expected_rates = [rates.iloc[0]] * 3 + rates.loc["2025-01-06":].tolist()
+
+    for engine in ("pandas", "numpy"):
+        results, _ = simulate_portfolio(
+            sample_price_data, sample_portfolio, sample_betas, rates,
+            0.02, target_beta=0.0, engine=engine,
+        )
+        assert results["exchange_rate"].tolist() == pytest.approx(expected_rates)
+        np.testing.assert_allclose(
+            results["portfolio_value_cad"], results["portfolio_value_usd"] * results["exchange_rate"]
+        )
+
+
+def test_simulate_portfolio_unknown_engine(
+    sample_price_data, sample_portfolio, sample_betas, sample_exchange_rates
+):
+    """Test that an unknown simulation engine is rejected."""
+    with pytest.raises(ValueError):
+        simulate_portfolio(
+            sample_price_data, sample_portfolio, sample_betas, sample_exchange_rates,
+            0.02, target_beta=0, engine="fortran",
+        )
+
+
+def test_simulate_portfolio_with_beta_matrix(
+    sample_price_data, sample_portfolio, sample_betas, sample_exchange_rates
+):
+    """Test that a dates x tickers beta matrix is looked up row by row."""
+    beta_matrix = pd.DataFrame(
+        [sample_betas] * len(sample_price_data), index=sample_price_data.index
+    )
+    beta_matrix.iloc[4:] *= 1.5
+
+    for engine in ("pandas", "numpy"):
+        results, _ = simulate_portfolio(
+            sample_price_data, sample_portfolio, beta_matrix, sample_exchange_rates,
+            0.02, target_beta=0.2, engine=engine,
+        )
+        static, _ = simulate_portfolio(
+            sample_price_data.iloc[:4], sample_portfolio, sample_betas,
+            sample_exchange_rates, 0.02, target_beta=0.2, engine=engine,
+        )
+
+        # Before the betas change the results match the static simulation
+        pd.testing.assert_frame_equal(results.iloc[:4], static)
+        assert len(results) == len(sample_price_data)
+
+    pandas_results, pandas_logs = simulate_portfolio(
+        sample_price_data, sample_portfolio, beta_matrix, sample_exchange_rates,
+        0.02, target_beta=0.2,
+    )
+    numpy_results, numpy_logs = simulate_portfolio(
+        sample_price_data, sample_portfolio, beta_matrix, sample_exchange_rates,
+        0.02, target_beta=0.2, engine="numpy",
+    )
+    pd.testing.assert_frame_equal(numpy_results, pandas_results)
+    assert numpy_logs == pandas_logs
+
+
+def test_simulate_portfolio_beta_matrix_warm_up(
+    sample_price_data, sample_portfolio, sample_betas, sample_exchange_rates
+):
+    """Test that warm-up rows without betas use the initial betas, not zero."""
+    beta_matrix = pd.DataFrame(
+        [sample_betas] * len(sample_price_data), index=sample_price_data.index
+    )
+    beta_matrix.iloc[:3] = np.nan
+    beta_matrix.iloc[5, 0] = np.nan
+
+    for engine in ("pandas", "numpy"):
+        results, _ = simulate_portfolio(
+            sample_price_data, sample_portfolio, beta_matrix, sample_exchange_rates,
+            0.02, target_beta=0.2, engine=engine, initial_betas=sample_betas,
+        )
+        static, _ = simulate_portfolio(
+            sample_price_data, sample_portfolio, sample_betas, sample_exchange_rates,
+            0.02, target_beta=0.2, engine=engine,
+        )
+        pd.testing.assert_frame_equal(results, static)
+
+
+def test_simulate_portfolio_previous_prices(
+    sample_price_data, sample_portfolio, sample_betas, sample_exchange_rates
+):
+    """Test that a run continued from the previous close matches one unbroken run."""
+    for engine in ("pandas", "numpy"):
+        expected, _ = simulate_portfolio(
+            sample_price_data, sample_portfolio, sample_betas, sample_exchange_rates,
+            0.02, target_beta=0.2, engine=engine,
+        )
+        _, _, carried = simulate_portfolio(
+            sample_price_data.iloc[:3], sample_portfolio, sample_betas, sample_exchange_rates,
+            0.02, target_beta=0.2, engine=engine, return_portfolio=True,
+        )
+        results, _ = simulate_portfolio(
+            sample_price_data.iloc[3:], carried, sample_betas, sample_exchange_rates,
+            0.02, target_beta=0.2, engine=engine, previous_prices=sample_price_data.iloc[2],
+        )
+
+        # The first day rebalances and is still measured against the post-trade holdings
+        assert results["rebalanced"].iloc[0]
+        pd.testing.assert_frame_equal(results, expected.iloc[3:])
+
+
+def test_simulate_portfolio_with_portfolio_state(
+    sample_price_data, sample_portfolio, sample_betas, sample_exchange_rates
+):
+    """Test that a PortfolioState is simulated like the equivalent dictionary."""
+    for engine in ("pandas", "numpy"):
+        expected, expected_logs, expected_final = simulate_portfolio(
+            sample_price_data, sample_portfolio, sample_betas, sample_exchange_rates,
+            0.02, target_beta=0.2, engine=engine, return_portfolio=True,
+        )
+        results, logs, final = simulate_portfolio(
+            sample_price_data, PortfolioState.from_dict(sample_portfolio), sample_betas,
+            sample_exchange_rates, 0.02, target_beta=0.2, engine=engine, return_portfolio=True,
+        )
+
+        pd.testing.assert_frame_equal(results, expected)
+        assert len(logs) == len(expected_logs)
+        assert isinstance(final, PortfolioState)
+        assert final == expected_final
+
+
+def test_simulate_portfolio_optimized_rebalancing(
+    sample_price_data, sample_portfolio, sample_betas, sample_exchange_rates
+):
+    """Test that the optimizing rebalancer trades less than the heuristic."""
+    heuristic, heuristic_logs = simulate_portfolio(
+        sample_price_data, sample_portfolio, sample_betas, sample_exchange_rates,
+        0.02, target_beta=0.2,
+    )
+    heuristic_trades = heuristic_logs.to_frame()
+    heuristic_turnover = (heuristic_trades["shares_traded"].abs() * heuristic_trades["price"]).sum()
+    for engine in ("pandas", "numpy"):
+        results, logs = simulate_portfolio(
+            sample_price_data, sample_portfolio, sample_betas, sample_exchange_rates,
+            0.02, target_beta=0.2, engine=engine, rebalance_method="optimize",
+        )
+
+        # A single rebalance on the first day brings the beta inside tolerance
+        assert results["rebalanced"].iloc[0]
+        assert (abs(results["portfolio_beta"].iloc[1:] - 0.2) <= BETA_TOLERANCE).all()
+        assert results["rebalanced"].sum() < heuristic["rebalanced"].sum()
+        trades = logs.to_frame()
+        assert 0 < (trades["shares_traded"].abs() * trades["price"]).sum() <= heuristic_turnover
+
+
+def test_simulate_portfolio_checkpoint_resume(tmp_path, monkeypatch, sample_portfolio, sample_betas):
+    """Test that a failed checkpointed run resumes to the same results as a clean run."""
+    dates = pd.date_range(start="2024-01-01", end="2024-12-31", freq="B")
+    rng = np.random.default_rng(3)
+    prices = pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(0, 0.01, (len(dates), 4)), axis=0)),
+        index=dates,
+        columns=list(sample_portfolio),
+    )
+    rates = pd.Series(1.35, index=dates)
+    kwargs = dict(engine="numpy", target_beta=0.0, rebalance_method="optimize")
+
+    expected, expected_logs = simulate_portfolio(prices, sample_portfolio, sample_betas, rates, 0.02, **kwargs)
+    results, logs = simulate_portfolio(
+        prices, sample_portfolio, sample_betas, rates, 0.02, checkpoint_dir=str(tmp_path), **kwargs
+    )
+    pd.testing.assert_frame_equal(results, expected)
+    assert logs == expected_logs
+
+    # Fail on the first rebalance after June, as a missing price would
+    failure_date = expected.index[expected["rebalanced"] & (expected.index >= "2024-07-01")][0]
+    rebalance = src.performance.rebalance_portfolio
+
+    def failing_rebalance(portfolio, day_prices, betas, target_beta, current_date, **kw):
+        if current_date >= failure_date:
+            raise KeyError("META")
+        return rebalance(portfolio, day_prices, betas, target_beta, current_date, **kw)
+
+    monkeypatch.setattr("src.performance.rebalance_portfolio", failing_rebalance)
+    with pytest.raises(KeyError):
+        simulate_portfolio(prices, sample_portfolio, sample_betas, rates, 0.02, checkpoint_dir=str(tmp_path), **kwargs)
+    monkeypatch.setattr("src.performance.rebalance_portfolio", rebalance)
+
+    resumed, resumed_logs, final = resume_simulation(str(tmp_path), prices, sample_betas, rates, return_portfolio=True)
+    pd.testing.assert_frame_equal(resumed, expected, check_freq=False)
+    assert resumed_logs == expected_logs
+    assert final == simulate_portfolio(
+        prices, sample_portfolio, sample_betas, rates, 0.02, return_portfolio=True, **kwargs
+    )[2]
+
+    # A run that fails before its first checkpoint resumes from the first day
+    monkeypatch.setattr("src.performance.rebalance_portfolio", failing_rebalance)
+    with pytest.raises(KeyError):
+        simulate_portfolio(
+            prices, sample_portfolio, sample_betas, rates, 0.02,
+            checkpoint_dir=str(tmp_path), checkpoint_frequency="Y", **kwargs
+        )
+    monkeypatch.setattr("src.performance.rebalance_portfolio", rebalance)
+
+    resumed, resumed_logs = resume_simulation(str(tmp_path), prices, sample_betas, rates)
+    pd.testing.assert_frame_equal(resumed, expected, check_freq=False)
+    assert resumed_logs == expected_logs
+
+    with pytest.raises(ValueError):
+        simulate_portfolio(
+            prices, sample_portfolio, sample_betas, rates, 0.02, 0.0, engine="pandas", checkpoint_dir=str(tmp_path)
+        )
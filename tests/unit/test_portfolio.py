@@ -6,10 +6,15 @@ import numpy as np
 import pandas as pd
 import pytest
 
+from src import config
 from src.portfolio import (
+    PortfolioState,
     compute_beta,
+    compute_betas,
+    compute_rolling_betas,
     compute_portfolio_beta,
     initialize_portfolio,
+    optimize_rebalance_trades,
     rebalance_portfolio,
 )
 
@@ -54,6 +59,60 @@ def test_compute_beta(sample_returns_data):
     assert -5 < beta < 5  # Beta should be in a reasonable range
 
 
+def test_compute_betas_matches_ols(sample_returns_data):
+    """Test that batch betas match the per-ticker statsmodels regression."""
+    import statsmodels.api as sm
+
+    stock_returns, market_returns = sample_returns_data
+    returns = pd.DataFrame(
+        {
+            "AAPL": stock_returns,
+            "MSFT": 0.8 * market_returns + np.random.normal(0, 0.005, len(market_returns)),
+            "^GSPC": market_returns,
+        }
+    )
+
+    stats = compute_betas(returns, "^GSPC")
+
+    assert list(stats.index) == ["AAPL", "MSFT"]
+    assert list(stats.columns) == ["beta", "alpha", "r_squared", "std_err"]
+    for ticker in stats.index:
+        fit = sm.OLS(returns[ticker], sm.add_constant(returns["^GSPC"])).fit()
+        assert np.isclose(stats.loc[ticker, "beta"], fit.params.iloc[1])
+        assert np.isclose(stats.loc[ticker, "alpha"], fit.params.iloc[0])
+        assert np.isclose(stats.loc[ticker, "r_squared"], fit.rsquared)
+        assert np.isclose(stats.loc[ticker, "std_err"], fit.bse.iloc[1])
+
+
+def test_compute_rolling_betas(sample_returns_data):
+    """Test rolling and EWMA beta matrices against pandas estimators."""
+    stock_returns, market_returns = sample_returns_data
+    returns = pd.DataFrame({"AAPL": stock_returns, "^GSPC": market_returns})
+    market = returns["^GSPC"]
+
+    rolling = compute_rolling_betas(returns, "^GSPC", window=5)
+    expected = returns["AAPL"].rolling(5, min_periods=2).cov(market) / market.rolling(
+        5, min_periods=2
+    ).var()
+    assert list(rolling.columns) == ["AAPL"]
+    assert rolling.index.equals(returns.index)
+    assert np.isnan(rolling["AAPL"].iloc[0])
+    assert np.allclose(rolling["AAPL"].iloc[1:], expected.iloc[1:])
+
+    ewma = compute_rolling_betas(returns, "^GSPC", halflife=5)
+    expected = returns["AAPL"].ewm(halflife=5, adjust=False).cov(market, bias=True) / market.ewm(
+        halflife=5, adjust=False
+    ).var(bias=True)
+    assert np.allclose(ewma["AAPL"].iloc[1:], expected.iloc[1:])
+
+    # An expanding window ends at the full-sample estimate
+    expanding = compute_rolling_betas(returns, "^GSPC")
+    assert np.isclose(expanding["AAPL"].iloc[-1], compute_betas(returns, "^GSPC").loc["AAPL", "beta"])
+
+    with pytest.raises(ValueError):
+        compute_rolling_betas(returns, "^GSPC", window=5, halflife=5)
+
+
 def test_compute_portfolio_beta():
     """Test portfolio beta calculation."""
     positions = {"AAPL": 1000000, "MSFT": 1000000, "TSLA": -1000000, "META": -1000000}
@@ -70,6 +129,116 @@ def test_compute_portfolio_beta():
         compute_portfolio_beta({"AAPL": 0}, {"AAPL": 1.0})
 
 
+def test_portfolio_state():
+    """Test array-backed portfolio valuation against the dictionary helpers."""
+    prices = {"AAPL": 180.0, "MSFT": 390.0, "TSLA": 220.0, "META": 370.0}
+    betas = {"AAPL": 1.2, "MSFT": 1.1, "TSLA": 1.5, "META": 1.3}
+    portfolio = {"AAPL": 1000, "MSFT": 500, "TSLA": -800, "META": -400}
+
+    state = PortfolioState.from_dict(portfolio, pd.Series(prices), betas)
+    positions = {ticker: shares * prices[ticker] for ticker, shares in portfolio.items()}
+
+    assert state.tickers == list(portfolio)
+    assert state.net_value() == pytest.approx(sum(positions.values()))
+    assert state.gross_value() == pytest.approx(sum(abs(value) for value in positions.values()))
+    assert state.long_value() == pytest.approx(positions["AAPL"] + positions["MSFT"])
+    assert state.short_value() == pytest.approx(positions["TSLA"] + positions["META"])
+    assert state.beta() == pytest.approx(compute_portfolio_beta(positions, betas))
+    assert state.long_beta() + state.short_beta() == pytest.approx(state.beta())
+
+    # Behaves like the dictionary it was built from
+    assert state == portfolio
+    assert dict(state.items()) == portfolio
+    assert state["TSLA"] == -800
+    assert "NVDA" not in state
+
+    with pytest.raises(ValueError):
+        PortfolioState(["AAPL", "AAPL"])
+    with pytest.raises(ValueError):
+        PortfolioState.from_dict({"AAPL": 0}, {"AAPL": 180.0}).beta()
+
+
+def test_rebalance_portfolio_state_matches_dict():
+    """Test that rebalancing a PortfolioState reproduces the dictionary path."""
+    day_prices = pd.Series({"AAPL": 180.0, "MSFT": 390.0, "TSLA": 220.0, "META": 370.0})
+    betas = {"AAPL": 1.2, "MSFT": 1.1, "TSLA": 1.5, "META": 1.3}
+    portfolio = {"AAPL": 1000, "MSFT": 500, "TSLA": -800, "META": -400}
+
+    for target_beta in (0.0, 0.5):
+        expected, expected_cost, expected_logs = rebalance_portfolio(
+            portfolio, day_prices, betas, target_beta=target_beta, beta_tolerance=0.01
+        )
+        state, cost, logs = rebalance_portfolio(
+            PortfolioState.from_dict(portfolio), day_prices, betas,
+            target_beta=target_beta, beta_tolerance=0.01,
+        )
+
+        assert isinstance(state, PortfolioState)
+        assert state == expected
+        assert cost == pytest.approx(expected_cost)
+        assert [log["ticker"] for log in logs] == [log["ticker"] for log in expected_logs]
+        assert [log["shares_traded"] for log in logs] == [log["shares_traded"] for log in expected_logs]
+        assert state.beta() == pytest.approx(compute_portfolio_beta(
+            {ticker: shares * day_prices[ticker] for ticker, shares in expected.items()}, betas
+        ))
+
+
+def test_rebalance_portfolio_optimize():
+    """Test that the optimizing rebalancer reaches the target in a single pass."""
+    rng = np.random.default_rng(7)
+    n = 2000
+    tickers = [f"T{i}" for i in range(n)]
+    prices = rng.uniform(10, 500, n)
+    betas = rng.uniform(0.3, 2.0, n)
+    betas[: n // 2] *= 1.4  # Long book carries more beta than the short book
+    shares = np.rint(5000 / prices) * np.where(np.arange(n) < n // 2, 1, -1)
+    state = PortfolioState(tickers, shares, prices, betas)
+    assert state.beta() > 0.1
+
+    for target_beta in (0.0, 0.1):
+        new_state, costs, logs = rebalance_portfolio(
+            state, prices, betas, target_beta=target_beta, method="optimize"
+        )
+
+        # The beta lands just inside the near edge of the tolerance band
+        assert abs(new_state.beta() - target_beta) <= config.BETA_TOLERANCE
+        assert new_state.beta() - target_beta > config.BETA_TOLERANCE / 2
+        assert abs(new_state.net_value()) < 0.001 * state.gross_value()
+        assert new_state.gross_value() == pytest.approx(state.gross_value(), rel=1e-3)
+        # Whole-share trades that never flip a position
+        assert np.array_equal(new_state.shares, np.rint(new_state.shares))
+        assert np.all(np.sign(new_state.shares) == np.sign(shares))
+        assert costs == pytest.approx(sum(log["transaction_cost"] for log in logs))
+
+    # Dictionary portfolios get the same trades
+    portfolio = dict(zip(tickers, shares.tolist()))
+    new_portfolio, _, _ = rebalance_portfolio(
+        portfolio, dict(zip(tickers, prices)), dict(zip(tickers, betas)), method="optimize"
+    )
+    expected = shares + optimize_rebalance_trades(shares, prices, betas)
+    assert list(new_portfolio.values()) == expected.tolist()
+
+    # A wider band needs less turnover, and a book inside it is not traded
+    turnover = [
+        np.abs(optimize_rebalance_trades(shares, prices, betas, beta_tolerance=tolerance)) @ prices
+        for tolerance in (0.01, config.BETA_TOLERANCE, 0.2)
+    ]
+    assert turnover[0] > turnover[1] > turnover[2]
+    assert not optimize_rebalance_trades(shares, prices, betas, beta_tolerance=0.5).any()
+
+    # Books too small to round into the band fall back to the heuristic
+    small = {"AAPL": 3, "TSLA": -2}
+    small_prices, small_betas = {"AAPL": 100.0, "TSLA": 100.0}, {"AAPL": 2.0, "TSLA": 0.5}
+    with pytest.raises(ValueError):
+        optimize_rebalance_trades([3, -2], [100.0, 100.0], [2.0, 0.5])
+    assert rebalance_portfolio(small, small_prices, small_betas, method="optimize") == rebalance_portfolio(
+        small, small_prices, small_betas, method="heuristic"
+    )
+
+    with pytest.raises(ValueError):
+        rebalance_portfolio(portfolio, dict(zip(tickers, prices)), {}, method="simplex")
+
+
 def test_initialize_portfolio(sample_prices_data):
     """Test portfolio initialization."""
     initial_capital = 10_000_000
@@ -0,0 +1,150 @@
+"""
+Unit tests for the market data providers.
+"""
+
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.providers import InMemoryProvider, LocalFileProvider, NoDataError, YahooFinanceProvider, fetch_many
+
+
+@pytest.fixture
+def provider_prices():
+    """Fixture providing a synthetic price panel for 40 tickers."""
+    dates = pd.date_range(start="2024-01-01", end="2024-03-29", freq="B")
+    rng = np.random.default_rng(0)
+    tickers = [f"T{i:02d}" for i in range(40)]
+    return pd.DataFrame(rng.uniform(50, 150, (len(dates), len(tickers))), index=dates, columns=tickers)
+
+
+def test_in_memory_provider(provider_prices):
+    """Test range slicing of the offline provider."""
+    provider = InMemoryProvider(provider_prices)
+
+    prices = provider.fetch_history("T00", "2024-01-08", "2024-01-15")
+
+    assert prices.name == "T00"
+    assert prices.index.min() == pd.Timestamp("2024-01-08")
+    assert prices.index.max() == pd.Timestamp("2024-01-12")
+    with pytest.raises(NoDataError):
+        provider.fetch_history("MISSING", "2024-01-08", "2024-01-15")
+    with pytest.raises(NoDataError):
+        provider.fetch_history("T00", "2025-01-01", "2025-02-01")
+
+
+def test_yahoo_finance_provider_raises_missing_data(monkeypatch):
+    """Test that Yahoo Finance errors become NoDataError without deprecated arguments."""
+    import yfinance
+    from yfinance.exceptions import YFPricesMissingError
+
+    class StandInTicker:
+        def __init__(self, ticker):
+            self.ticker = ticker
+
+        def history(self, **kwargs):
+            assert "raise_errors" not in kwargs
+            if not yfinance.config.debug.hide_exceptions and self.ticker == "NOPE":
+                raise YFPricesMissingError(self.ticker, "")
+            dates = pd.DatetimeIndex(["2024-01-02", "2024-01-03"], tz="America/New_York")
+            return pd.DataFrame({"Close": [1.0, 2.0]}, index=dates)
+
+    monkeypatch.setattr(yfinance, "Ticker", StandInTicker)
+    monkeypatch.setattr(yfinance.config.debug, "hide_exceptions", True)
+    provider = YahooFinanceProvider()
+    assert yfinance.config.debug.hide_exceptions is False
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        prices = provider.fetch_history("AAPL", "2024-01-02", "2024-01-04")
+    assert list(prices.index) == [pd.Timestamp("2024-01-02"), pd.Timestamp("2024-01-03")]
+
+    with pytest.raises(NoDataError):
+        provider.fetch_history("NOPE", "2024-01-02", "2024-01-04")
+
+    # Fetching leaves the process-wide setting alone
+    yfinance.config.debug.hide_exceptions = True
+    provider.fetch_history("AAPL", "2024-01-02", "2024-01-04")
+    assert yfinance.config.debug.hide_exceptions is True
+
+
+def test_local_file_provider(tmp_path, provider_prices):
+    """Test reading wide panels, per-ticker workbooks and directories of files."""
+    panel = provider_prices.rename_axis("Date")
+    panel.to_parquet(tmp_path / "panel.parquet")
+    expected = panel.loc["2024-02-01":"2024-02-29", "T03"]
+
+    # Wide Parquet panel: only the ticker's column is read
+    provider = LocalFileProvider(str(tmp_path / "panel.parquet"))
+    prices = provider.fetch_history("T03", "2024-02-01", "2024-03-01")
+    pd.testing.assert_series_equal(prices, expected, check_freq=False)
+    assert list(provider.fetch_frame("T03", "2024-02-01", "2024-03-01").columns) == ["T03"]
+    with pytest.raises(NoDataError):
+        provider.fetch_history("MISSING", "2024-02-01", "2024-03-01")
+
+    # Workbook with one OHLCV sheet per ticker, as written by download.py
+    def ohlcv(ticker):
+        close = panel[ticker]
+        return pd.DataFrame({"Date": close.index, "Open": close - 1, "High": close + 1,
+                             "Low": close - 2, "Close": close, "Volume": 1000.0})
+
+    with pd.ExcelWriter(tmp_path / "stocks.xlsx") as writer:
+        for ticker in ("T03", "T04"):
+            ohlcv(ticker).to_excel(writer, sheet_name=ticker, index=False)
+    provider = LocalFileProvider(str(tmp_path / "stocks.xlsx"), columns=["Open", "Close"])
+    prices = provider.fetch_history("T03", "2024-02-01", "2024-03-01")
+    pd.testing.assert_series_equal(prices, expected, check_freq=False)
+    frame = provider.fetch_frame("T04", "2024-02-01", "2024-03-01", columns=["Open"])
+    assert list(frame.columns) == ["Open"]
+    assert frame.index.equals(expected.index)
+    with pytest.raises(ValueError):
+        provider.fetch_frame("T04", "2024-02-01", "2024-03-01", columns=["Volume"])
+
+    # Directory with one file per ticker
+    (tmp_path / "tickers").mkdir()
+    ohlcv("T03").to_csv(tmp_path / "tickers" / "T03.csv", index=False)
+    ohlcv("T04").set_index("Date").to_parquet(tmp_path / "tickers" / "T04.parquet")
+    provider = LocalFileProvider(str(tmp_path / "tickers"), price_column="Close")
+    results, errors = fetch_many(
+        [(ticker, "2024-02-01", "2024-03-01") for ticker in ("T03", "T04", "T05")], provider
+    )
+    pd.testing.assert_series_equal(results[("T03", "2024-02-01", "2024-03-01")], expected, check_freq=False)
+    assert len(results[("T04", "2024-02-01", "2024-03-01")]) == len(expected)
+    assert list(errors) == [("T05", "2024-02-01", "2024-03-01")]
+
+
+def test_fetch_many_runs_concurrently(provider_prices):
+    """Test that requests overlap instead of running one after another."""
+    provider = InMemoryProvider(provider_prices, latency=0.05)
+    requests = [(ticker, "2024-01-01", "2024-02-01") for ticker in provider_prices.columns]
+
+    started = time.perf_counter()
+    results, errors = fetch_many(requests, provider, max_workers=20)
+    elapsed = time.perf_counter() - started
+
+    assert errors == {}
+    assert set(results) == set(requests)
+    assert elapsed < len(requests) * 0.05 / 4
+
+
+def test_fetch_many_retries_and_partial_results(provider_prices):
+    """Test per-ticker retries, exhausted retries and permanent failures."""
+    provider = InMemoryProvider(provider_prices, failures={"T01": 2, "T02": 5})
+    requests = [(ticker, "2024-01-01", "2024-02-01") for ticker in ("T00", "T01", "T02", "MISSING")]
+    completed = []
+
+    results, errors = fetch_many(
+        requests, provider, retries=2, backoff=0.0, on_complete=completed.append
+    )
+
+    assert set(results) == {requests[0], requests[1]}
+    assert set(errors) == {requests[2], requests[3]}
+    assert sorted(completed) == sorted(requests)
+    calls = [call[0] for call in provider.calls]
+    assert calls.count("T01") == 3
+    assert calls.count("T02") == 3
+    # Missing data is not retried
+    assert calls.count("MISSING") == 1
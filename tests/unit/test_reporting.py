@@ -7,7 +7,7 @@ import numpy as np
 import pandas as pd
 from pathlib import Path
 
-from src.reporting import generate_monthly_report
+from src.reporting import PDFRenderer, build_monthly_report, generate_batch_reports, generate_monthly_report
 
 
 def test_generate_monthly_report(tmp_path):
@@ -78,3 +78,92 @@ def test_generate_monthly_report(tmp_path):
         assert "Fee Summary" in content
         assert "Initial Portfolio Composition" in content
         assert "Final Portfolio Composition" in content
+
+
+def test_pdf_renderer_skips_unchanged_content(tmp_path, monkeypatch):
+    """Test that a PDF is only rendered again when its markdown changes."""
+    rendered = []
+
+    class FakeHTML:
+        def __init__(self, string):
+            self.string = string
+
+        def write_pdf(self, target, **kwargs):
+            rendered.append(kwargs["stylesheets"][0])
+            Path(target).write_bytes(b"%PDF")
+
+    monkeypatch.setattr("src.reporting.HTML", FakeHTML)
+    renderer = PDFRenderer()
+    pdf_path = str(tmp_path / "report.pdf")
+
+    assert renderer.render("# Report\n\n* Return: 1.00%", pdf_path)
+    assert not renderer.render("# Report\n\n* Return: 1.00%", pdf_path)
+    assert renderer.render("# Report\n\n* Return: 1.25%", pdf_path)
+    assert renderer.render("# Report\n\n* Return: 1.25%", pdf_path, force=True)
+
+    # The stylesheet is compiled once and shared by every render
+    assert len(rendered) == 3
+    assert rendered[0] is rendered[-1]
+
+    os.remove(pdf_path)
+    assert renderer.render("# Report\n\n* Return: 1.25%", pdf_path)
+
+
+def test_generate_batch_reports(tmp_path):
+    """Test that a batch writes uniquely named reports and a manifest."""
+    dates = pd.date_range(start="2025-01-01", end="2025-01-10", freq="B")
+    rng = np.random.default_rng(1)
+    market_data = pd.DataFrame(
+        rng.uniform(100, 200, (len(dates), 4)), index=dates, columns=["AAPL", "MSFT", "TSLA", "META"]
+    )
+    simulation_results = pd.DataFrame(
+        {
+            "portfolio_value_usd": rng.uniform(9500000, 10500000, len(dates)),
+            "gross_exposure_usd": rng.uniform(14000000, 15000000, len(dates)),
+            "portfolio_value_cad": rng.uniform(12000000, 13000000, len(dates)),
+            "portfolio_beta": rng.normal(0, 0.1, len(dates)),
+            "daily_return": rng.normal(0.001, 0.02, len(dates)),
+            "management_fee": rng.uniform(500, 1000, len(dates)),
+            "transaction_costs": rng.uniform(0, 2000, len(dates)),
+            "rebalanced": False,
+            "exchange_rate": 1.35,
+        },
+        index=dates,
+    )
+    config = {
+        "tickers_long": ["AAPL", "MSFT"],
+        "tickers_short": ["TSLA", "META"],
+        "initial_capital": 10000000,
+        "management_fee": 0.02,
+        "target_portfolio_beta": 0.0,
+        "gross_exposure": 1.5,
+        "transaction_fee": 0.01,
+    }
+    bundle = {
+        "simulation_results": simulation_results,
+        "market_data": market_data,
+        "portfolio": {"AAPL": 1000, "MSFT": 500, "TSLA": -800, "META": -400},
+        "config": config,
+        "transaction_logs": [],
+    }
+    bundles = [
+        {**bundle, "name": "Sleeve A"},
+        {**bundle, "name": "Sleeve A"},
+        {**bundle, "config": {**config, "name": "growth/sleeve"}},
+        {**bundle, "portfolio": {"UNKNOWN": 10}},
+    ]
+
+    manifest = generate_batch_reports(bundles, str(tmp_path), max_workers=2)
+
+    assert manifest["name"].tolist() == ["Sleeve_A", "Sleeve_A_2", "growth_sleeve", "report_004"]
+    assert manifest["status"].tolist() == ["rendered", "rendered", "rendered", "failed"]
+    assert manifest.loc[3, "error"]
+    for path in manifest["pdf_path"].iloc[:3]:
+        assert Path(path).exists()
+    assert (tmp_path / "manifest.csv").exists()
+
+    rerun = generate_batch_reports(bundles[:1], str(tmp_path), max_workers=1)
+    assert rerun["status"].tolist() == ["unchanged"]
+    # Reports are dated by their last simulated day, not by the day they are built
+    report = build_monthly_report(**bundle)
+    assert "## Report Date: 2025-01-10" in report
@@ -0,0 +1,87 @@
+"""
+Unit tests for the risk metrics module.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.risk_metrics import (
+    RISK_FREE_RATE,
+    RISK_METRIC_COLUMNS,
+    TRADING_DAYS_PER_YEAR,
+    compute_risk_metrics,
+)
+
+
+@pytest.fixture
+def simulation_results():
+    """Fixture providing 120 days of simulation-shaped daily results."""
+    dates = pd.date_range(start="2023-01-02", periods=120, freq="B")
+    rng = np.random.default_rng(5)
+    returns = rng.normal(0.0005, 0.01, len(dates))
+    returns[0] = np.nan
+    gross = 1_500_000 * np.cumprod(1 + np.nan_to_num(returns))
+    return pd.DataFrame(
+        {
+            "gross_exposure_usd": gross,
+            "daily_return": returns,
+            "portfolio_beta": rng.normal(0, 0.05, len(dates)),
+        },
+        index=dates,
+    )
+
+
+def _window_metrics(frame: pd.DataFrame) -> dict:
+    """Metrics of one window computed directly with pandas and numpy."""
+    returns = frame["daily_return"].dropna()
+    gross = frame["gross_exposure_usd"]
+    daily_rf = RISK_FREE_RATE / TRADING_DAYS_PER_YEAR
+    total_return = gross.iloc[-1] / gross.iloc[0] - 1
+    annualized = (1 + total_return) ** (TRADING_DAYS_PER_YEAR / len(frame)) - 1
+    max_drawdown = (gross / gross.cummax() - 1).min()
+    downside = np.sqrt((np.minimum(returns - daily_rf, 0) ** 2).mean())
+    var_95 = np.percentile(returns * 100, 5)
+    return {
+        "total_return": total_return,
+        "volatility": returns.std() * np.sqrt(TRADING_DAYS_PER_YEAR),
+        "sharpe_ratio": np.sqrt(TRADING_DAYS_PER_YEAR) * (returns.mean() - daily_rf) / returns.std(),
+        "sortino_ratio": np.sqrt(TRADING_DAYS_PER_YEAR) * (returns.mean() - daily_rf) / downside,
+        "max_drawdown": max_drawdown,
+        "calmar_ratio": annualized / abs(max_drawdown),
+        "var_95": var_95,
+        "var_99": np.percentile(returns * 100, 1),
+        "es_95": (returns * 100)[returns * 100 <= var_95].mean(),
+        "hit_rate": (returns > 0).sum() / len(returns),
+        "portfolio_beta": frame["portfolio_beta"].mean(),
+        "beta_drift": frame["portfolio_beta"].iloc[-1] - frame["portfolio_beta"].iloc[0],
+    }
+
+
+def test_expanding_metrics(simulation_results):
+    """Test that the last expanding row matches whole-sample metrics."""
+    metrics = compute_risk_metrics(simulation_results)
+
+    assert list(metrics.columns) == RISK_METRIC_COLUMNS
+    assert metrics.index.equals(simulation_results.index)
+    assert metrics["var_95"].iloc[:15].isna().all()
+    last = metrics.iloc[-1]
+    for name, value in _window_metrics(simulation_results).items():
+        assert last[name] == pytest.approx(value), name
+
+
+def test_rolling_metrics(simulation_results):
+    """Test that each rolling row matches its window computed directly."""
+    window = 40
+    rolling = compute_risk_metrics(simulation_results, window=window)
+    expanding = compute_risk_metrics(simulation_results)
+
+    pd.testing.assert_frame_equal(rolling.iloc[:window], expanding.iloc[:window])
+    assert (rolling["days"].iloc[window:] == window).all()
+    for day in (window, 77, len(simulation_results) - 1):
+        expected = _window_metrics(simulation_results.iloc[day - window + 1:day + 1])
+        for name, value in expected.items():
+            assert rolling[name].iloc[day] == pytest.approx(value), (day, name)
+
+    with pytest.raises(ValueError):
+        compute_risk_metrics(simulation_results, window=1)
@@ -0,0 +1,104 @@
+"""
+Unit tests for the parameter sweep module.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.sweep import SHARED_KEYS, expand_grid, run_parameter_sweep
+
+
+@pytest.fixture
+def sweep_config():
+    """Base configuration for sweep tests."""
+    return {
+        "tickers_long": ["AAPL", "MSFT"],
+        "tickers_short": ["TSLA", "META"],
+        "market_index": "^GSPC",
+        "initial_capital": 1000000,
+        "gross_exposure": 1.5,
+        "target_portfolio_beta": 0.0,
+        "transaction_fee": 0.01,
+        "management_fee": 0.02,
+        "analysis_year": 2024,
+        "analysis_month": 1,
+    }
+
+
+@pytest.fixture
+def mock_sweep_data(monkeypatch):
+    """Patch data acquisition so the sweep runs offline."""
+    dates = pd.date_range(start="2024-01-01", end="2024-01-31", freq="B")
+    rng = np.random.default_rng(7)
+    tickers = ["AAPL", "MSFT", "TSLA", "META", "NVDA", "^GSPC"]
+    market_data = pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(0, 0.01, (len(dates), len(tickers))), axis=0)),
+        index=dates,
+        columns=tickers,
+    )
+    calls = []
+
+    def mock_download(tickers, start_date, end_date, **kwargs):
+        calls.append(list(tickers))
+        return market_data[tickers]
+
+    monkeypatch.setattr("src.sweep.download_market_data", mock_download)
+    monkeypatch.setattr(
+        "src.sweep.get_exchange_rates",
+        lambda *args, **kwargs: pd.Series(1.35, index=dates),
+    )
+    monkeypatch.setattr("src.sweep.validate_market_data", lambda *args, **kwargs: True)
+    return calls
+
+
+def test_expand_grid():
+    """Test expansion of a parameter grid into override dicts."""
+    points = expand_grid({"target_portfolio_beta": [0.0, 0.1], "beta_tolerance": [0.05, 0.1, 0.2]})
+    assert len(points) == 6
+    assert points[0] == {"target_portfolio_beta": 0.0, "beta_tolerance": 0.05}
+
+    explicit = [{"transaction_fee": 0.005}, {"transaction_fee": 0.01}]
+    assert expand_grid(explicit) == explicit
+
+
+def test_run_parameter_sweep(sweep_config, mock_sweep_data):
+    """Test that a sweep downloads once and returns one row of metrics per grid point."""
+    grid = {
+        "beta_tolerance": [0.05, 10.0],
+        "tickers_short": [["TSLA", "META"], ["TSLA", "NVDA"]],
+    }
+
+    results = run_parameter_sweep(grid, sweep_config, max_workers=1)
+
+    assert len(mock_sweep_data) == 1
+    assert set(mock_sweep_data[0]) == {"AAPL", "MSFT", "TSLA", "META", "NVDA", "^GSPC"}
+    assert len(results) == 4
+    for column in ["beta_tolerance", "tickers_short", "total_return", "sharpe_ratio", "rebalances"]:
+        assert column in results.columns
+
+    # A very wide tolerance never triggers a rebalance
+    assert (results.loc[results["beta_tolerance"] == 10.0, "rebalances"] == 0).all()
+
+    parallel = run_parameter_sweep(grid, sweep_config, max_workers=2)
+    pd.testing.assert_frame_equal(
+        parallel.drop(columns="run_seconds"), results.drop(columns="run_seconds")
+    )
+
+
+def test_run_parameter_sweep_rejects_shared_keys(sweep_config, mock_sweep_data):
+    """Test that parameters changing the market data or the betas cannot be swept."""
+    for key in SHARED_KEYS:
+        with pytest.raises(ValueError, match=key):
+            run_parameter_sweep({key: [1, 2]}, sweep_config, max_workers=1)
+    assert not mock_sweep_data
+
+
+def test_run_parameter_sweep_rolling_betas(sweep_config, mock_sweep_data):
+    """Test that beta_window in the base configuration gives rolling betas."""
+    grid = {"beta_tolerance": [0.01]}
+    static = run_parameter_sweep(grid, sweep_config, max_workers=1)
+    rolling = run_parameter_sweep(grid, {**sweep_config, "beta_window": 5}, max_workers=1)
+
+    assert len(rolling) == 1
+    assert rolling["rebalances"].iloc[0] != static["rebalances"].iloc[0]
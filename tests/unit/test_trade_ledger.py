@@ -0,0 +1,116 @@
+"""
+Unit tests for the trade ledger module.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.trade_ledger import LEDGER_FIELDS, TRADE_LOG_COLUMNS, TradeLedger
+
+
+@pytest.fixture
+def trade_records():
+    """Fixture providing transaction logs over three days and three tickers."""
+    rng = np.random.default_rng(11)
+    dates = pd.date_range(start="2024-03-01", periods=3, freq="B")
+    return [
+        {
+            "date": date,
+            "ticker": ticker,
+            "shares_traded": float(rng.integers(1, 500)),
+            "price": float(rng.uniform(50, 400)),
+            "portfolio_beta": float(rng.normal(0, 0.1)),
+            "transaction_cost": float(rng.uniform(0, 5)),
+        }
+        for date in dates
+        for ticker in ("AAPL", "TSLA", "MSFT")[: 1 + dates.get_loc(date)]
+    ]
+
+
+def test_trade_ledger_matches_records(trade_records):
+    """Test that a ledger grown past its capacity keeps every trade in order."""
+    ledger = TradeLedger(capacity=1)
+    for record in trade_records:
+        ledger.append(**record)
+
+    assert len(ledger) == len(trade_records)
+    assert ledger.tickers == ["AAPL", "TSLA", "MSFT"]
+    assert list(ledger) == trade_records
+    assert ledger == trade_records
+    assert not TradeLedger()
+
+    frame = ledger.to_frame()
+    assert list(frame.columns) == TRADE_LOG_COLUMNS
+    pd.testing.assert_frame_equal(
+        frame.astype({"ticker": str}), pd.DataFrame(trade_records)
+    )
+    assert TradeLedger.from_frame(frame) == ledger
+    assert len(ledger.to_frame(start=4)) == len(trade_records) - 4
+
+    # Extending remaps ticker ids between ledgers with different tickers
+    other = TradeLedger(["MSFT", "AAPL"])
+    other.append_many(trade_records[0]["date"], [1, 0], [10.0, 20.0], [1.0, 2.0], 0.1, [0.1, 0.2])
+    combined = TradeLedger.from_records(trade_records).extend(other)
+    assert list(combined.column("ticker")[-2:]) == ["AAPL", "MSFT"]
+    assert combined == trade_records + list(other)
+
+
+def test_trade_ledger_aggregations(trade_records):
+    """Test the per-ticker and per-day aggregations against pandas groupby."""
+    ledger = TradeLedger.from_records(trade_records)
+    frame = pd.DataFrame(trade_records)
+    frame["notional"] = frame["shares_traded"].abs() * frame["price"]
+
+    for key, summary, index_name in (
+        ("ticker", ledger.by_ticker(), "ticker"),
+        ("date", ledger.by_day(), "date"),
+    ):
+        expected = frame.groupby(key).agg(
+            trades=("shares_traded", "size"),
+            shares_traded=("shares_traded", "sum"),
+            notional=("notional", "sum"),
+            transaction_cost=("transaction_cost", "sum"),
+        )
+        expected.index.name = index_name
+        pd.testing.assert_frame_equal(
+            summary.sort_index(), expected.sort_index(), check_dtype=False, check_freq=False
+        )
+
+
+def test_trade_ledger_spills_to_parquet(tmp_path, trade_records):
+    """Test that a spilling ledger keeps at most spill_rows trades in memory."""
+    ledger = TradeLedger(spill_dir=str(tmp_path / "spill"), spill_rows=2)
+    for record in trade_records:
+        ledger.append(**record)
+
+    assert len(list((tmp_path / "spill").glob("*.parquet"))) == len(trade_records) // 2
+
+    # A large batch is spilled at once and its buffers are released
+    batch = TradeLedger(spill_dir=str(tmp_path / "batch"), spill_rows=2)
+    batch.extend(TradeLedger.from_records(trade_records))
+    assert len(batch) == len(trade_records)
+    assert batch.memory_usage() <= 2 * sum(np.dtype(dtype).itemsize for dtype in LEDGER_FIELDS.values())
+
+    # Buffers that grew up to spill_rows are kept for the next rows instead of
+    # being reallocated at the initial capacity
+    row_bytes = sum(np.dtype(dtype).itemsize for dtype in LEDGER_FIELDS.values())
+    grown = TradeLedger(capacity=1, spill_dir=str(tmp_path / "grown"), spill_rows=4)
+    for record in trade_records[:4]:
+        grown.append(**record)
+    assert grown.memory_usage() == 4 * row_bytes
+    assert ledger == trade_records
+    pd.testing.assert_frame_equal(ledger.by_day(), TradeLedger.from_records(trade_records).by_day())
+
+    path = ledger.to_parquet(str(tmp_path / "trades.parquet"))
+    assert TradeLedger.read_parquet(path) == trade_records
+
+    # Ledgers sharing a spill directory do not overwrite each other's parts
+    other = TradeLedger(spill_dir=str(tmp_path / "spill"), spill_rows=2)
+    for record in reversed(trade_records):
+        other.append(**record)
+    assert ledger == trade_records
+    assert other == list(reversed(trade_records))
+
+    with pytest.raises(ValueError):
+        TradeLedger().spill()
@@ -0,0 +1,51 @@
+"""
+Unit tests for the trading calendar module.
+"""
+
+import pandas as pd
+import pytest
+
+from src.trading_calendar import (
+    is_trading_day,
+    offset_sessions,
+    session_window,
+    trading_sessions,
+)
+
+
+def test_trading_sessions():
+    """Test NYSE and TSX sessions against their 2024 holidays."""
+    weekdays = pd.bdate_range("2024-01-01", "2024-12-31")
+
+    nyse = trading_sessions("2024-01-01", "2024-12-31")
+    assert len(nyse) == 252
+    assert list(weekdays.difference(nyse).strftime("%m-%d")) == [
+        "01-01", "01-15", "02-19", "03-29", "05-27", "06-19", "07-04", "09-02", "11-28", "12-25",
+    ]
+
+    tsx = trading_sessions("2024-01-01", "2024-12-31", exchange="TSX")
+    assert list(weekdays.difference(tsx).strftime("%m-%d")) == [
+        "01-01", "02-19", "03-29", "05-20", "07-01", "08-05", "09-02", "10-14", "12-25", "12-26",
+    ]
+
+    # Both ends are inclusive, and weekend-observed holidays move to a weekday
+    assert list(trading_sessions("2021-12-23", "2021-12-27").strftime("%m-%d")) == ["12-23", "12-27"]
+    assert trading_sessions("2024-01-06", "2024-01-07").empty
+
+    with pytest.raises(ValueError):
+        trading_sessions("2024-01-01", "2024-01-31", exchange="LSE")
+
+
+def test_session_helpers():
+    """Test session lookups, range trimming and session offsets."""
+    assert is_trading_day("2025-01-08")
+    assert not is_trading_day("2025-01-09")  # National day of mourning
+    assert not is_trading_day("2025-01-11")
+
+    assert session_window("2024-12-24", "2025-01-03") == ("2024-12-24", "2025-01-03")
+    assert session_window("2024-12-25", "2024-12-26") is None
+    assert session_window("2024-06-29", "2024-07-06") == ("2024-07-01", "2024-07-06")
+
+    assert offset_sessions("2025-01-02", -1) == pd.Timestamp("2024-12-31")
+    assert offset_sessions("2025-01-04", 0) == pd.Timestamp("2025-01-06")
+    assert offset_sessions("2024-01-02", 252) == pd.Timestamp("2025-01-02")
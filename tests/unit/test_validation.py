@@ -0,0 +1,81 @@
+"""
+Unit tests for the market data validation module.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.validation import MarketDataValidator, check_market_data
+
+
+@pytest.fixture
+def quality_prices():
+    """Fixture providing a 60-day panel with one of each quality problem."""
+    dates = pd.date_range(start="2024-01-01", periods=60, freq="B")
+    rng = np.random.default_rng(7)
+    returns = rng.normal(0, 0.01, size=(len(dates), 4))
+    prices = pd.DataFrame(
+        100 * np.exp(np.cumsum(returns, axis=0)), index=dates, columns=["AAA", "BBB", "CCC", "DDD"]
+    )
+    prices.iloc[10:17, 1] = prices.iloc[10, 1]  # BBB unchanged for 7 days
+    prices.iloc[30:, 2] *= 1.5  # CCC jumps 50%
+    prices.iloc[:20, 3] = np.nan  # DDD only starts trading on day 21
+    return prices
+
+
+def test_check_market_data_report(quality_prices):
+    """Test the per-ticker report of a panel with stale prices, a jump and a late listing."""
+    report = check_market_data(quality_prices)
+    tickers = report.tickers
+
+    assert report.rows == 60
+    assert report.start == quality_prices.index[0]
+    assert report.end == quality_prices.index[-1]
+    assert list(tickers.index) == ["AAA", "BBB", "CCC", "DDD"]
+
+    assert tickers.loc["BBB", "max_stale_run"] == 6
+    assert tickers["stale"].tolist() == [False, True, False, False]
+    assert tickers.loc["CCC", "jumps"] == 1
+    assert tickers.loc["CCC", "outliers"] == 1
+    assert tickers.loc["CCC", "max_abs_return"] == pytest.approx(0.5, abs=0.05)
+    assert tickers.loc["DDD", "missing"] == 20
+    assert tickers.loc["DDD", "coverage"] == pytest.approx(40 / 60)
+    assert tickers.loc["DDD", "first_date"] == quality_prices.index[20]
+
+    # Missing prices fail validation, stale prices and jumps are only warnings
+    assert not report.passed
+    assert report.errors == ["Market data contains missing values (DDD: 20)"]
+    assert len(report.warnings) == 3
+
+    clean = check_market_data(quality_prices[["AAA", "BBB", "CCC"]])
+    assert clean.passed
+    assert clean.warnings
+
+    duplicated = check_market_data(pd.concat([quality_prices.iloc[:30], quality_prices.iloc[29:]]))
+    assert duplicated.duplicate_dates == 1
+    assert not duplicated.passed
+
+    assert check_market_data(pd.DataFrame()).errors == ["Market data is empty"]
+
+
+def test_market_data_validator_incremental(quality_prices):
+    """Test that validating appended rows only matches a full rescan."""
+    full = check_market_data(quality_prices)
+
+    validator = MarketDataValidator()
+    validator.validate(quality_prices.iloc[:12])
+    validator.update(quality_prices.iloc[12:35])
+    report = validator.update(quality_prices.iloc[35:])
+
+    pd.testing.assert_frame_equal(report.tickers, full.tickers)
+    assert report.rows == full.rows
+    assert report.errors == full.errors
+    assert report.warnings == full.warnings
+
+    # Rows that do not come after the validated ones are caught
+    report = validator.update(quality_prices.iloc[-1:])
+    assert report.duplicate_dates == 1
+    assert not report.passed
+    with pytest.raises(ValueError):
+        validator.update(quality_prices.iloc[-1:, :2])